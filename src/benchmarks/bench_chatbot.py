@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from modules.chatbot.chatbot import ChatBot
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from utilities.path_finder import PathFinder
+
+# the legacy .pth models, the converted ones and the BERT models whose weights are present
+SHIPPED_MODELS = sorted(file for file in os.listdir(PathFinder.get_complet_path("ressources/models"))
+                        if file.endswith(".pth") or ModelArtifact.exists(file) or os.path.isfile(
+                            PathFinder.get_complet_path(f"ressources/models/{file}/model.safetensors")))
+
+SMALL_TALK = "Hello! How are you? Can you tell me a joke."
+
+
+@pytest.fixture(scope="module", params=SHIPPED_MODELS)
+def chatbot(request):
+    return ChatBot(model_file=request.param)
+
+
+@pytest.mark.benchmark(group="chatbot-load")
+@pytest.mark.parametrize("model_file", SHIPPED_MODELS)
+def bench_load(benchmark, model_file):
+    benchmark.pedantic(ChatBot, args=(model_file,), rounds=5, iterations=1)
+
+
+@pytest.mark.benchmark(group="chatbot-small-talk")
+def bench_get_response(benchmark, chatbot):
+    benchmark(chatbot.get_response, SMALL_TALK)
+
+
+@pytest.mark.benchmark(group="chatbot-code")
+def bench_get_response_with_code(benchmark, chatbot):
+    with open(PathFinder.get_complet_path("ressources/dialog_files/dialog_with_code.txt"), "r") as file:
+        dialog = file.read()
+    benchmark(chatbot.get_response, dialog)
+
+
+@pytest.mark.benchmark(group="chatbot-pattern-lookup")
+def bench_predict_pattern(benchmark, chatbot):
+    benchmark(chatbot.predict_tag, "Hello!")
+
+
+@pytest.mark.benchmark(group="chatbot-prediction-cache")
+def bench_predict_cached(benchmark, chatbot):
+    chatbot.predict_tag("Could you tell me a funny joke")
+    benchmark(chatbot.predict_tag, "could you TELL me funny jokes?")
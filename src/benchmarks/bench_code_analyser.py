@@ -0,0 +1,38 @@
+import pytest
+
+from modules.code_analyser.code_analyser import CodeAnalyser, MAX_CODE_BYTES
+from utilities.path_finder import PathFinder
+
+LANGUAGES = ["python", "java", "c"]
+FILES = ["code_with_errors", "code_with_cc", "code_without_errors"]
+
+
+def read_code(language: str, file: str) -> str:
+    with open(PathFinder.get_complet_path(f"ressources/{language}_files/{file}.txt"), "r") as code_file:
+        return code_file.read()
+
+
+@pytest.mark.benchmark(group="code-analyser")
+@pytest.mark.parametrize("file", FILES)
+@pytest.mark.parametrize("language", LANGUAGES)
+def bench_analyse(benchmark, language, file):
+    code_analyser = CodeAnalyser()
+    benchmark(code_analyser.analyse, read_code(language, file), language)
+
+
+@pytest.mark.benchmark(group="code-analyser-detection")
+@pytest.mark.parametrize("language", LANGUAGES)
+def bench_analyse_without_language(benchmark, language):
+    code = read_code(language, "code_with_errors")
+    # a new analyser per round, as in ChatBot.get_response
+    benchmark(lambda: CodeAnalyser().analyse(code, ""))
+
+
+@pytest.mark.benchmark(group="code-analyser-hostile")
+@pytest.mark.parametrize("language", ["python", ""])
+def bench_analyse_hostile(benchmark, language):
+    # Unclosed brackets on every line, just under the size limit: the worst case still served by the analyser
+    line = "def function(value:\n    return [value +\n"
+    code = line * (MAX_CODE_BYTES // len(line))
+    code_analyser = CodeAnalyser()
+    benchmark.pedantic(code_analyser.analyse, args=(code, language), rounds=3)
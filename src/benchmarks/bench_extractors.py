@@ -0,0 +1,47 @@
+import glob
+import os
+
+import pytest
+
+from modules.NLP.features_extractor.extractor import Extractor
+from utilities.path_finder import PathFinder
+
+EXTRACTORS = ["BagOfWords", "TFIDF", "Word2Vec_CBOW", "Word2Vec_GRAM"]
+
+
+@pytest.fixture(scope="module")
+def extractors(corpus, scale):
+    """
+    Builds every extractor on the synthetic corpus, the Word2Vec ones being trained under a temporary model name
+    whose files are removed afterwards.
+    """
+    model_name = f"benchmark_x{scale}"
+    built = {name: Extractor(preprocessor=corpus["preprocessor"], extractor_name=name, vocab=corpus["vocab"],
+                             tags=corpus["tags"], docs=corpus["docs"], window=5, vector_size=100,
+                             model_name=f"{model_name}_{name}", is_training=True)
+             for name in EXTRACTORS}
+    yield built
+    for file in glob.glob(PathFinder.get_complet_path(f"ressources/extractors/{model_name}_*")):
+        os.remove(file)
+
+
+@pytest.mark.benchmark(group="extractor")
+@pytest.mark.parametrize("extractor_name", EXTRACTORS)
+def bench_extract_features(benchmark, extractors, corpus, extractor_name):
+    extractor = extractors[extractor_name]
+    sentences = corpus["patterns"][:200]
+    benchmark(lambda: [extractor.extract_features(sentence) for sentence in sentences])
+
+
+@pytest.mark.benchmark(group="extractor-sparse")
+@pytest.mark.parametrize("extractor_name", ["BagOfWords", "TFIDF"])
+def bench_extract_sparse_features(benchmark, extractors, corpus, extractor_name):
+    extractor = extractors[extractor_name]
+    sentences = corpus["patterns"][:200]
+    benchmark(lambda: [extractor.extract_sparse_features(sentence) for sentence in sentences])
+
+
+@pytest.mark.benchmark(group="extractor-init")
+def bench_tf_idf_init(benchmark, corpus):
+    benchmark(Extractor, preprocessor=corpus["preprocessor"], extractor_name="TFIDF", vocab=corpus["vocab"],
+              tags=corpus["tags"], docs=corpus["docs"])
@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pytest
+import torch
+
+from modules.NLP.features_extractor.extractor import Extractor
+from modules.NLP.modeling.modeling import Modeling
+from utilities.path_finder import PathFinder
+
+HIDDEN_SIZE = 64
+BATCH_SIZE = 16
+
+
+@pytest.fixture(scope="module")
+def bag_of_words(corpus):
+    return Extractor(preprocessor=corpus["preprocessor"], extractor_name="BagOfWords", vocab=corpus["vocab"],
+                     tags=corpus["tags"], docs=corpus["docs"])
+
+
+@pytest.mark.benchmark(group="model-forward")
+@pytest.mark.parametrize("batch_size", [1, BATCH_SIZE])
+def bench_neural_net(benchmark, bag_of_words, corpus, batch_size):
+    model = Modeling.select_model(modeling_name="NeuralNet", input_size=len(corpus["vocab"]), hidden_size=HIDDEN_SIZE,
+                                  num_classes=len(corpus["tags"]), device=torch.device("cpu")).eval()
+    features = torch.from_numpy(bag_of_words.extract_batch_features(corpus["patterns"][:batch_size])).float()
+    with torch.no_grad():
+        benchmark(model, features)
+
+
+@pytest.mark.benchmark(group="model-forward")
+@pytest.mark.parametrize("batch_size", [1, BATCH_SIZE])
+def bench_sparse_neural_net(benchmark, bag_of_words, corpus, batch_size):
+    model = Modeling.select_model(modeling_name="SparseNeuralNet", input_size=len(corpus["vocab"]),
+                                  hidden_size=HIDDEN_SIZE, num_classes=len(corpus["tags"]),
+                                  device=torch.device("cpu")).eval()
+    features = [bag_of_words.extract_sparse_features(pattern) for pattern in corpus["patterns"][:batch_size]]
+    indices = torch.from_numpy(np.concatenate([indices for indices, _ in features]))
+    weights = torch.from_numpy(np.concatenate([weights for _, weights in features]))
+    offsets = torch.tensor([0] + [len(indices) for indices, _ in features[:-1]]).cumsum(dim=0)
+    with torch.no_grad():
+        benchmark(model, indices, offsets, weights)
+
+
+@pytest.mark.benchmark(group="model-forward")
+@pytest.mark.parametrize("batch_size", [1, BATCH_SIZE])
+def bench_bert(benchmark, patterns, batch_size):
+    from transformers import BertForSequenceClassification, BertTokenizer
+
+    model_path = PathFinder.get_complet_path("ressources/models/bert_intent_classificator")
+    if not os.path.isfile(os.path.join(model_path, "model.safetensors")):
+        pytest.skip("the weights of the BERT model are not shipped")
+    model = BertForSequenceClassification.from_pretrained(model_path).eval()
+    tokenizer = BertTokenizer.from_pretrained(
+        PathFinder.get_complet_path("ressources/tokenizers/bert_intent_classificator_T"))
+    inputs = tokenizer(patterns[:batch_size], return_tensors="pt", truncation=True, padding=True, max_length=512)
+    with torch.no_grad():
+        benchmark(lambda: model(**inputs))
+
+
+@pytest.fixture(scope="module")
+def retrieval(bag_of_words, corpus):
+    from modules.NLP.modeling.retrieval_classifier import RetrievalClassifier
+
+    classifier = RetrievalClassifier(tags=corpus["tags"])
+    # The labels of the patterns do not change the cost of a vote
+    classifier.add(vectors=np.stack([bag_of_words.features_from_tokens(tokens) for tokens in corpus["docs"]]),
+                   labels=np.zeros(len(corpus["docs"]), dtype=np.int64))
+    return classifier
+
+
+@pytest.mark.benchmark(group="model-forward")
+@pytest.mark.parametrize("batch_size", [1, BATCH_SIZE])
+def bench_retrieval(benchmark, retrieval, bag_of_words, corpus, batch_size):
+    features = bag_of_words.extract_batch_features(corpus["patterns"][:batch_size])
+    benchmark(retrieval.vote, features)
+
+
+@pytest.mark.benchmark(group="retrieval-insert")
+def bench_retrieval_insert(benchmark, retrieval, bag_of_words, corpus):
+    features = bag_of_words.extract_batch_features(corpus["patterns"][:1])
+    benchmark(retrieval.add, features, [0])
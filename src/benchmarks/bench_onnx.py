@@ -0,0 +1,89 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+import torch
+
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.modeling import Modeling
+from modules.NLP.modeling.onnx_backend import OnnxExporter, OnnxPredictor, onnxruntime
+from utilities.path_finder import PathFinder
+
+pytestmark = pytest.mark.skipif(onnxruntime is None, reason="onnxruntime is not installed")
+
+MODELS = ["bow_stemmer.pth", "tfidf_stemmer.pth", "wvc_stemmer.pth"]
+BERT_MODEL = "bert_intent_classificator"
+
+
+@pytest.fixture(scope="module", params=MODELS)
+def neural_net(request):
+    """
+    Copies a shipped model under a temporary name and exports it to ONNX, so the shipped model is left untouched.
+
+    Returns:
+        tuple: The PyTorch model, the ONNX predictor and its input size.
+    """
+    model_name = f"benchmark_onnx_{request.param.removesuffix('.pth')}"
+    data = torch.load(PathFinder.get_complet_path(f"ressources/models/{request.param}"), map_location="cpu")
+    ModelArtifact.save(model_name=model_name, model_state=data["model_state"], vocab=data["vocab"],
+                       manifest={key: value for key, value in data.items()
+                                 if key not in ["model_state", "vocab", "docs"]})
+    OnnxExporter.export_neural_net(model_file=model_name)
+
+    model = Modeling.select_model(modeling_name="NeuralNet", input_size=data["input_size"],
+                                  hidden_size=data["hidden_size"], num_classes=data["output_size"],
+                                  device=torch.device("cpu"))
+    model.load_state_dict(data["model_state"])
+    yield model.eval(), OnnxPredictor(model_path=ModelArtifact.get_path(model_name)), data["input_size"]
+    shutil.rmtree(ModelArtifact.get_path(model_name), ignore_errors=True)
+
+
+@pytest.mark.benchmark(group="onnx-neural-net")
+@pytest.mark.parametrize("batch_size", [1, 16])
+def bench_neural_net_torch(benchmark, neural_net, batch_size):
+    model, _, input_size = neural_net
+    features = torch.rand(batch_size, input_size)
+    with torch.no_grad():
+        benchmark(model, features)
+
+
+@pytest.mark.benchmark(group="onnx-neural-net")
+@pytest.mark.parametrize("batch_size", [1, 16])
+def bench_neural_net_onnx(benchmark, neural_net, batch_size):
+    _, predictor, input_size = neural_net
+    features = np.random.default_rng(0).random((batch_size, input_size), dtype=np.float32)
+    benchmark(predictor.run, features=features)
+
+
+@pytest.fixture(scope="module")
+def bert_inputs(patterns):
+    from transformers import BertTokenizer
+
+    model_path = ModelArtifact.get_path(BERT_MODEL)
+    if not os.path.isfile(os.path.join(model_path, "model.safetensors")):
+        pytest.skip("the weights of the BERT model are not shipped")
+    if not OnnxPredictor.is_available(model_path):
+        OnnxExporter.export_bert(model_name=BERT_MODEL)
+    tokenizer = BertTokenizer.from_pretrained(PathFinder.get_complet_path(f"ressources/tokenizers/{BERT_MODEL}_T"))
+    return {batch_size: tokenizer(patterns[:batch_size], return_tensors="np", padding=True, truncation=True)
+            for batch_size in [1, 16]}
+
+
+@pytest.mark.benchmark(group="onnx-bert")
+@pytest.mark.parametrize("batch_size", [1, 16])
+def bench_bert_torch(benchmark, bert_inputs, batch_size):
+    from transformers import BertForSequenceClassification
+
+    model = BertForSequenceClassification.from_pretrained(ModelArtifact.get_path(BERT_MODEL)).eval()
+    inputs = {name: torch.from_numpy(array) for name, array in bert_inputs[batch_size].items()}
+    with torch.no_grad():
+        benchmark(lambda: model(**inputs))
+
+
+@pytest.mark.benchmark(group="onnx-bert")
+@pytest.mark.parametrize("batch_size", [1, 16])
+def bench_bert_onnx(benchmark, bert_inputs, batch_size):
+    predictor = OnnxPredictor(model_path=ModelArtifact.get_path(BERT_MODEL))
+    inputs = {name: array.astype(np.int64) for name, array in bert_inputs[batch_size].items()}
+    benchmark(predictor.run, **inputs)
@@ -0,0 +1,64 @@
+import pytest
+
+from modules.NLP.preprocessing.lemmatizer import Lemmatizer
+from modules.NLP.preprocessing.sentence_segmenter import segment_sentences
+from modules.NLP.preprocessing.stemmer import Stemmer
+from modules.NLP.preprocessing.tokenizer import Tokenizer
+from utilities.path_finder import PathFinder
+
+
+@pytest.mark.benchmark(group="segment_sentences")
+def bench_segment_sentences(benchmark):
+    with open(PathFinder.get_complet_path("ressources/dialog_files/dialog_with_code.txt"), "r") as file:
+        dialog = file.read()
+    benchmark(segment_sentences, dialog)
+
+
+@pytest.mark.benchmark(group="tokenizer")
+@pytest.mark.parametrize("remove_stopwords", [False, True])
+def bench_tokenizer(benchmark, patterns, remove_stopwords):
+    tokenizer = Tokenizer(remove_stopwords=remove_stopwords)
+    benchmark(lambda: [tokenizer.tokenize_and_filter_sentence(pattern) for pattern in patterns])
+
+
+@pytest.mark.benchmark(group="stemmer")
+def bench_stemmer(benchmark, patterns):
+    tokens = [Tokenizer(remove_stopwords=False).tokenize_and_filter_sentence(pattern) for pattern in patterns]
+    stemmer = Stemmer()
+    benchmark(lambda: [stemmer.preprocess_text(sentence_tokens) for sentence_tokens in tokens])
+
+
+@pytest.mark.benchmark(group="lemmatizer")
+def bench_lemmatizer(benchmark, patterns):
+    tokens = [Tokenizer(remove_stopwords=False).tokenize_and_filter_sentence(pattern) for pattern in patterns]
+    lemmatizer = Lemmatizer()
+    benchmark(lambda: [lemmatizer.preprocess_text(sentence_tokens) for sentence_tokens in tokens])
+
+
+@pytest.mark.benchmark(group="tokenizer_throughput")
+@pytest.mark.parametrize("remove_stopwords", [False, True])
+def bench_tokenizer_throughput(benchmark, corpus, remove_stopwords):
+    # Tokenizes the patterns of the synthetic intents files and reports the throughput in tokens per second
+    tokenizer = Tokenizer(remove_stopwords=remove_stopwords)
+    patterns = corpus["patterns"]
+    tokens = benchmark(lambda: sum(len(tokenizer.tokenize_and_filter_sentence(pattern)) for pattern in patterns))
+    benchmark.extra_info["tokens"] = tokens
+    benchmark.extra_info["tokens_per_second"] = round(tokens / benchmark.stats.stats.mean)
+
+
+@pytest.mark.benchmark(group="tokenizer_construction")
+def bench_tokenizer_construction(benchmark):
+    # The stop words are loaded once per process, so building a Tokenizer costs no file read
+    benchmark(Tokenizer)
+
+
+@pytest.mark.benchmark(group="preprocess_corpus")
+@pytest.mark.parametrize("batched", [False, True], ids=["per_text", "corpus"])
+def bench_preprocess_corpus(benchmark, corpus, batched):
+    # Preprocesses the patterns of the synthetic intents files one by one or with preprocess_corpus
+    preprocessor = corpus["preprocessor"]
+    patterns = corpus["patterns"]
+    if batched:
+        benchmark(preprocessor.preprocess_corpus, patterns)
+    else:
+        benchmark(lambda: [preprocessor.preprocess_text(pattern) for pattern in patterns])
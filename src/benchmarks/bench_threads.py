@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pytest
+import torch
+from gensim.models import Word2Vec as GensimWord2Vec
+
+from modules.chatbot.chatbot import ChatBot
+from modules.NLP.features_extractor.extractor import Extractor
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.modeling import Modeling
+from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
+
+# The thread counts swept, up to the number of CPUs
+THREAD_COUNTS = sorted({count for count in [1, 2, 4, 8, 16, os.cpu_count() or 1] if count <= (os.cpu_count() or 1)})
+# A shipped model of every type, as loaded by the chatbot
+SERVING_MODELS = {"SparseNeuralNet": "bow_stemmer.pth", "NeuralNet": "wvc_stemmer.pth",
+                  "BERT": "bert_intent_classificator"}
+BATCH_SIZE = 16
+TRAINING_EPOCHS = 5
+
+
+@pytest.fixture(scope="module")
+def chatbots():
+    """
+    The chatbots of the swept models, without the pattern lookup and the prediction cache so that every sentence
+    runs the model, loaded on first use.
+    """
+    loaded = {}
+    yield loaded
+    RuntimeConfig.reset()
+
+
+def get_chatbot(chatbots: dict, modeling_name: str) -> ChatBot:
+    model_file = SERVING_MODELS[modeling_name]
+    if not (os.path.isfile(PathFinder.get_complet_path(f"ressources/models/{model_file}"))
+            or ModelArtifact.exists(model_file)
+            or os.path.isfile(PathFinder.get_complet_path(f"ressources/models/{model_file}/model.safetensors"))):
+        pytest.skip(f"the {model_file} model is not shipped")
+    if modeling_name not in chatbots:
+        chatbots[modeling_name] = ChatBot(model_file=model_file, pattern_lookup=False, cache_size=0)
+    return chatbots[modeling_name]
+
+
+@pytest.mark.parametrize("threads", THREAD_COUNTS)
+@pytest.mark.parametrize("batch_size", [1, BATCH_SIZE])
+@pytest.mark.parametrize("modeling_name", list(SERVING_MODELS))
+def bench_serving_threads(benchmark, chatbots, thread_sweep, patterns, modeling_name, batch_size, threads):
+    chatbot = get_chatbot(chatbots, modeling_name)
+    RuntimeConfig.override("serving", intra_op_threads=threads)
+    benchmark.group = f"threads-serving-{modeling_name}-batch{batch_size}"
+    benchmark(chatbot.predict_tags, patterns[:batch_size])
+    if batch_size == 1:
+        # A chat message is predicted alone
+        thread_sweep.setdefault(("serving", modeling_name, "intra_op_threads"), {}).setdefault(1, {})[threads] = \
+            benchmark.stats.stats.median
+
+
+@pytest.mark.parametrize("threads", THREAD_COUNTS)
+def bench_training_threads(benchmark, thread_sweep, corpus, scale, threads):
+    extractor = Extractor(preprocessor=corpus["preprocessor"], extractor_name="BagOfWords", vocab=corpus["vocab"],
+                          tags=corpus["tags"], docs=corpus["docs"])
+    features = torch.from_numpy(np.array([extractor.features_from_tokens(doc) for doc in corpus["docs"]])).float()
+    labels = torch.tensor([index for index, intent_patterns in enumerate(
+        np.array_split(np.arange(len(corpus["docs"])), len(corpus["tags"]))) for _ in intent_patterns])
+
+    def train():
+        model = Modeling.select_model(modeling_name="NeuralNet", input_size=len(corpus["vocab"]), hidden_size=64,
+                                      num_classes=len(corpus["tags"]), device=torch.device("cpu"))
+        optimizer = torch.optim.Adam(model.parameters(), lr=1e-3)
+        for _ in range(TRAINING_EPOCHS):
+            for start in range(0, len(features), BATCH_SIZE):
+                loss = torch.nn.functional.cross_entropy(model(features[start:start + BATCH_SIZE]),
+                                                         labels[start:start + BATCH_SIZE])
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+
+    RuntimeConfig.override("training", intra_op_threads=threads)
+    RuntimeConfig.use("training", "NeuralNet")
+    benchmark.group = f"threads-training-NeuralNet-x{scale}"
+    benchmark.pedantic(train, rounds=3, iterations=1)
+    thread_sweep.setdefault(("training", None, "intra_op_threads"), {}).setdefault(scale, {})[threads] = \
+        benchmark.stats.stats.median
+    RuntimeConfig.reset()
+
+
+@pytest.mark.parametrize("workers", THREAD_COUNTS)
+def bench_gensim_workers(benchmark, thread_sweep, corpus, scale, workers):
+    benchmark.group = f"threads-training-Word2Vec-x{scale}"
+    benchmark.pedantic(GensimWord2Vec, args=(corpus["docs"],),
+                       kwargs={"vector_size": 100, "window": 5, "min_count": 1, "workers": workers},
+                       rounds=3, iterations=1)
+    thread_sweep.setdefault(("training", None, "gensim_workers"), {}).setdefault(scale, {})[workers] = \
+        benchmark.stats.stats.median
@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.NLP.preprocessing.preprocessor import Preprocessor  # noqa: E402
+from utilities.path_finder import PathFinder  # noqa: E402
+
+SCALES = [1, 10, 100]
+
+
+def load_intents() -> dict:
+    """
+    Loads the shipped intents file.
+
+    Returns:
+        dict: The content of ressources/json_files/intents.json.
+    """
+    with open(PathFinder.get_complet_path("ressources/json_files/intents.json"), "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def make_synthetic_intents(scale: int) -> dict:
+    """
+    Builds an intents file `scale` times bigger than the shipped one. Each copy of an intent gets its own tag and
+    its patterns get a copy-specific word, so the number of tags, the number of patterns and the vocabulary all grow
+    with the scale.
+
+    Parameters:
+        scale (int): How many copies of every intent to make.
+
+    Returns:
+        dict: The synthetic intents, in the format of intents.json.
+    """
+    intents = load_intents()["intents"]
+    if scale == 1:
+        return {"intents": intents}
+    return {"intents": [{**intent, "tag": f"{intent['tag']}_{copy}",
+                         "patterns": [f"{pattern} synth{copy}x" for pattern in intent["patterns"]]}
+                        for copy in range(scale) for intent in intents]}
+
+
+@pytest.fixture(scope="session")
+def patterns() -> list:
+    """
+    The patterns of the shipped intents file, used as the input sentences of the stage benchmarks.
+    """
+    return [pattern for intent in load_intents()["intents"] for pattern in intent["patterns"]]
+
+
+@pytest.fixture(scope="session", params=SCALES, ids=[f"x{scale}" for scale in SCALES])
+def scale(request) -> int:
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def intents_file(scale, tmp_path_factory) -> str:
+    """
+    Writes the synthetic intents file of the requested scale and returns its path.
+    """
+    path = tmp_path_factory.mktemp("intents") / f"intents_x{scale}.json"
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(make_synthetic_intents(scale), file)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def corpus(intents_file) -> dict:
+    """
+    Preprocesses a synthetic intents file the way Extractor does, with the stemmer.
+
+    Returns:
+        dict: The "tags", "docs", "vocab" and "patterns" of the corpus, and the "preprocessor" used.
+    """
+    preprocessor = Preprocessor(preprocessor_name="Stemmer")
+    with open(intents_file, "r", encoding="utf-8") as file:
+        intents = json.load(file)["intents"]
+
+    vocab = {}
+    docs = []
+    for intent in intents:
+        for pattern in intent["patterns"]:
+            docs.append(preprocessor.preprocess_text(pattern))
+            vocab.update(dict.fromkeys(docs[-1]))
+    return {"tags": [intent["tag"] for intent in intents], "docs": docs, "vocab": list(vocab),
+            "patterns": [pattern for intent in intents for pattern in intent["patterns"]],
+            "preprocessor": preprocessor}
+
+
+@pytest.fixture(scope="session")
+def thread_sweep(request) -> dict:
+    """
+    The median duration of every value of the settings swept by the thread benchmarks, by (pool, type of model or
+    None for the whole pool, setting) and by scale of the corpus, to report the best values at the end of the run.
+    """
+    request.config.thread_sweep = {}
+    return request.config.thread_sweep
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config) -> None:
+    """
+    Reports the fastest value of every setting swept by the thread benchmarks, on the largest corpus swept, in the
+    layout of ressources/config/runtime.json.
+    """
+    sweep = getattr(config, "thread_sweep", None)
+    if not sweep:
+        return
+    terminalreporter.section("best thread settings")
+    best = {}
+    for (pool, modeling_name, setting), scales in sorted(sweep.items(), key=str):
+        scale = max(scales)
+        medians = scales[scale]
+        value = min(medians, key=medians.get)
+        pool_settings = best.setdefault(pool, {})
+        if modeling_name is not None:
+            pool_settings = pool_settings.setdefault("models", {}).setdefault(modeling_name, {})
+        pool_settings[setting] = value
+        terminalreporter.write_line(f"{pool:<10}{modeling_name or '':<18}{setting:<18}x{scale:<5}best {value:<4}"
+                                    + "  ".join(f"{count}: {median * 1000:.3f} ms"
+                                                for count, median in sorted(medians.items())))
+    terminalreporter.write_line(json.dumps(best, indent=4))
@@ -1,4 +1,9 @@
-from user_interface.gui import ChatInterface
+from modules.NLP.modeling.pretrained_resolver import PretrainedResolver
+
+# Before anything imports the Hugging Face libraries, which read the offline flags on import
+PretrainedResolver.enable_offline_mode()
+
+from user_interface.gui import ChatInterface  # noqa: E402
 
 if __name__ == '__main__':
     ChatInterface()
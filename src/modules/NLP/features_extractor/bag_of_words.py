@@ -12,6 +12,7 @@ class BagOfWords:
     Attributes:
         __preprocessor (Preprocessor): An instance of the Preprocessor class used for tokenizing and normalizing text.
         __vocab (list): A list of unique words that forms the vocabulary of the corpus.
+        __vocab_index (dict): A mapping of each word of the vocabulary to its index.
     """
 
     def __init__(self, preprocessor: Preprocessor, vocab: list):
@@ -25,6 +26,7 @@ class BagOfWords:
 
         self.__preprocessor = preprocessor
         self.__vocab = vocab
+        self.__vocab_index = {word: index for index, word in enumerate(vocab)}
 
     def extract_features(self, sentence: str) -> np.ndarray:
         """
@@ -37,13 +39,58 @@ class BagOfWords:
             np.ndarray: A numpy array representing the sentence as a vector of word frequencies.
         """
 
+        return self.features_from_tokens(tokens=self.__preprocessor.preprocess_text(text=sentence))
+
+    def features_from_tokens(self, tokens: list) -> np.ndarray:
+        """
+        Converts an already preprocessed sentence into a bag-of-words vector using the class's vocabulary.
+
+        Parameters:
+            tokens (list): The preprocessed tokens of the sentence.
+
+        Returns:
+            np.ndarray: A numpy array representing the sentence as a vector of word frequencies.
+        """
+
         bow_representation = np.zeros(len(self.__vocab))
-        for word in self.__preprocessor.preprocess_text(text=sentence):
-            if word in self.__vocab:
-                index = self.__vocab.index(word)
+        for word in tokens:
+            index = self.__vocab_index.get(word)
+            if index is not None:
                 bow_representation[index] += 1
         return bow_representation
 
+    def extract_sparse_features(self, sentence: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Converts a sentence into the sparse form of its bag-of-words vector: only the indices of the words of the
+        vocabulary present in the sentence and their frequencies.
+
+        Parameters:
+            sentence (str): The sentence to convert into a bag-of-words representation.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The vocabulary indices of the nonzero entries and their values.
+        """
+
+        return self.sparse_features_from_tokens(tokens=self.__preprocessor.preprocess_text(text=sentence))
+
+    def sparse_features_from_tokens(self, tokens: list) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Converts an already preprocessed sentence into the sparse form of its bag-of-words vector.
+
+        Parameters:
+            tokens (list): The preprocessed tokens of the sentence.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The vocabulary indices of the nonzero entries and their values.
+        """
+
+        counts = {}
+        for word in tokens:
+            index = self.__vocab_index.get(word)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        return np.fromiter(counts.keys(), dtype=np.int64), np.fromiter(counts.values(), dtype=np.float32)
+
     @property
     def extractor_name(self) -> str:
         """
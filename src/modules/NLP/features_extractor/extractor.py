@@ -7,6 +7,7 @@ from modules.NLP.features_extractor.tf_idf import TFIDF
 from modules.NLP.features_extractor.word2vec import Word2Vec
 from modules.NLP.preprocessing.preprocessor import Preprocessor
 from utilities.path_finder import PathFinder
+from utilities.tracing import Tracer
 
 
 class Extractor:
@@ -26,7 +27,7 @@ class Extractor:
 
     def __init__(self, preprocessor: Preprocessor, extractor_name: str = "BagOfWords", vocab: list = None,
                  tags: list = None, docs: list = None, window: int = None, vector_size: int = None,
-                 model_name: str = None, is_training: bool = False):
+                 model_name: str = None, is_training: bool = False, idf: np.ndarray = None, processes: int = None):
         """
         Initializes the Extractor class with specified configurations for text preprocessing and feature extraction.
 
@@ -38,14 +39,21 @@ class Extractor:
             docs (list): A list of documents or sentences used primarily with Word2Vec.
             window (int): The maximum distance between the current and predicted word in a Word2Vec model.
             vector_size (int): The dimensionality of the word vectors in a Word2Vec model.
+            model_name (str): The name of the model, used to save or load the Word2Vec vectors.
+            is_training (bool): Whether the Word2Vec model must be trained rather than loaded.
+            idf (np.ndarray): The precomputed inverse document frequencies used by TFIDF instead of the docs.
+            processes (int): The number of processes to preprocess a large corpus with. Defaults to None, which
+                             preprocesses it in the current process.
         """
 
         self.__vocab = vocab
+        self.__idf = idf
         self.__docs = docs
         self.__tags = tags
         self.__preprocessor = preprocessor
         self.__extractor = None
         self.__is_training = is_training
+        self.__processes = processes
         self.__select_extractor(preprocessor=preprocessor, extractor_name=extractor_name,
                                 window=window, vector_size=vector_size, model_name=model_name)
 
@@ -60,7 +68,96 @@ class Extractor:
             list: A list of features extracted from the sentence.
         """
 
-        return self.__extractor.extract_features(sentence)
+        with Tracer.span("feature_extraction"):
+            return self.__extractor.extract_features(sentence)
+
+    def extract_batch_features(self, sentences: list) -> np.ndarray:
+        """
+        Extracts features from several sentences at once, using the vectorized batch extraction of the selected
+        feature extractor when it has one.
+
+        Parameters:
+            sentences (list): The sentences from which to extract features.
+
+        Returns:
+            np.ndarray: A matrix with the features of one sentence per row.
+        """
+
+        with Tracer.span("feature_extraction"):
+            if isinstance(self.__extractor, Word2Vec):
+                return self.__extractor.extract_batch_features(sentences)
+            return np.array([self.__extractor.features_from_tokens(tokens)
+                             for tokens in self.__preprocessor.preprocess_corpus(texts=sentences)])
+
+    def batch_features_from_tokens(self, token_lists: list) -> np.ndarray:
+        """
+        Extracts features from several already preprocessed sentences at once, like extract_batch_features.
+
+        Parameters:
+            token_lists (list): The preprocessed tokens of every sentence.
+
+        Returns:
+            np.ndarray: A matrix with the features of one sentence per row.
+        """
+
+        with Tracer.span("feature_extraction"):
+            if isinstance(self.__extractor, Word2Vec):
+                return self.__extractor.batch_features_from_tokens(token_lists)
+            return np.array([self.__extractor.features_from_tokens(tokens) for tokens in token_lists])
+
+    def features_from_tokens(self, tokens: list) -> np.ndarray:
+        """
+        Extracts features from an already preprocessed sentence, e.g. one of the docs of the corpus.
+
+        Parameters:
+            tokens (list): The preprocessed tokens of the sentence.
+
+        Returns:
+            np.ndarray: The features of the sentence.
+        """
+
+        with Tracer.span("feature_extraction"):
+            return self.__extractor.features_from_tokens(tokens)
+
+    def sparse_features_from_tokens(self, tokens: list) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts the sparse form of the features of an already preprocessed sentence. Only the BagOfWords and
+        TFIDF extractors support it.
+
+        Parameters:
+            tokens (list): The preprocessed tokens of the sentence.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The vocabulary indices of the nonzero features and their values.
+
+        Raises:
+            ValueError: If the selected extractor produces dense features.
+        """
+
+        if isinstance(self.__extractor, Word2Vec):
+            raise ValueError(f"The {self.extractor_name} extractor produces dense features only.")
+        with Tracer.span("feature_extraction"):
+            return self.__extractor.sparse_features_from_tokens(tokens)
+
+    def extract_sparse_features(self, sentence: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts the sparse form of the features of a sentence, as the indices and the values of its nonzero
+        entries. Only the BagOfWords and TFIDF extractors, whose vectors are indexed by the vocabulary, support it.
+
+        Parameters:
+            sentence (str): The sentence from which to extract features.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The vocabulary indices of the nonzero features and their values.
+
+        Raises:
+            ValueError: If the selected extractor produces dense features.
+        """
+
+        if isinstance(self.__extractor, Word2Vec):
+            raise ValueError(f"The {self.extractor_name} extractor produces dense features only.")
+        with Tracer.span("feature_extraction"):
+            return self.__extractor.extract_sparse_features(sentence)
 
     def __select_extractor(self, preprocessor, extractor_name, window, vector_size, model_name) -> None:
         """
@@ -81,7 +178,7 @@ class Extractor:
             self.__extractor = BagOfWords(preprocessor=preprocessor, vocab=self.__vocab)
 
         elif extractor_name == "TFIDF":
-            self.__extractor = TFIDF(preprocessor=preprocessor, vocab=self.__vocab, docs=self.__docs)
+            self.__extractor = TFIDF(preprocessor=preprocessor, vocab=self.__vocab, docs=self.__docs, idf=self.__idf)
 
         elif extractor_name in ["Word2Vec_CBOW", "Word2Vec_GRAM"]:
             sg = 0 if extractor_name == "Word2Vec_CBOW" else 1
@@ -97,23 +194,19 @@ class Extractor:
     def __load_corpus(self):
         """
         Loads the corpus data from a JSON file and extracts vocabulary, documents, and tags to be used in the model.
+        The patterns are preprocessed together, and the docs are in the order of the patterns in the file.
         """
 
-        self.__tags = []
-        self.__docs = []
-        self.__vocab = []
         file_path = PathFinder.get_complet_path('ressources/json_files/intents.json')
         with open(file_path, 'r', encoding='utf-8') as file:
             intents_data = json.load(file)
 
-        for intent in intents_data["intents"]:
-            self.__tags.append(intent["tag"])
-            for text in intent["patterns"]:
-                preprocessed_text = self.__preprocessor.preprocess_text(text)
-                self.__docs.append(preprocessed_text)
-                for word in preprocessed_text:
-                    if word not in self.__vocab:
-                        self.__vocab.append(word)
+        self.__tags = [intent["tag"] for intent in intents_data["intents"]]
+        self.__docs = self.__preprocessor.preprocess_corpus(
+            texts=[text for intent in intents_data["intents"] for text in intent["patterns"]],
+            processes=self.__processes)
+        # The words in the order of their first occurrence
+        self.__vocab = list(dict.fromkeys(word for doc in self.__docs for word in doc))
 
     @property
     def vocab(self) -> list:
@@ -148,6 +241,17 @@ class Extractor:
 
         return self.__docs
 
+    @property
+    def idf(self) -> np.ndarray | None:
+        """
+        Accesses the inverse document frequencies of the vocabulary when the TFIDF extractor is used.
+
+        Returns:
+            np.ndarray | None: The inverse document frequencies, or None for the other extractors.
+        """
+
+        return self.__extractor.idf if isinstance(self.__extractor, TFIDF) else None
+
     @property
     def extractor_name(self) -> str:
         """
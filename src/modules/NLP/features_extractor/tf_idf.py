@@ -16,30 +16,35 @@ class TFIDF:
     Attributes:
         __preprocessor (Preprocessor): An instance of the Preprocessor class used for tokenizing and normalizing text.
         __vocab (list): A list of unique words that forms the vocabulary of the corpus.
-        __docs (list): A list of preprocessed documents or sentences.
-        __doc_freq (defaultdict[int]): A dictionary storing the document frequency of each word in the vocabulary.
+        __vocab_index (dict): A mapping of each word of the vocabulary to its index.
+        __idf (np.ndarray): The inverse document frequency of each word of the vocabulary.
 
     Methods:
         extract_features(sentence: str) -> list:
             Converts a sentence into a vector of TF-IDF scores using the class's vocabulary and document frequencies.
+        extract_sparse_features(sentence: str) -> tuple:
+            Converts a sentence into the indices and values of the nonzero TF-IDF scores.
+        compute_idf(vocab: list, docs: list) -> np.ndarray:
+            Computes the inverse document frequency of each word of a vocabulary over preprocessed documents.
     """
 
-    def __init__(self, preprocessor: Preprocessor, vocab: list, docs: list):
+    def __init__(self, preprocessor: Preprocessor, vocab: list, docs: list = None, idf: np.ndarray = None):
 
         """
-        Initializes the TFIDF class with a specified preprocessor, vocabulary, and a list of preprocessed documents.
+        Initializes the TFIDF class with a specified preprocessor, vocabulary, and either a list of preprocessed
+        documents or the inverse document frequencies already computed from them.
 
         Parameters:
             preprocessor (Preprocessor): The preprocessor instance to use for text preprocessing.
             vocab (list): The vocabulary list, each word of which will be assessed in the documents.
-            docs (list): A list of preprocessed documents, which are used to calculate document frequency.
+            docs (list, optional): A list of preprocessed documents, which are used to calculate document frequency.
+            idf (np.ndarray, optional): The precomputed inverse document frequency of each word of the vocabulary.
         """
 
         self.__preprocessor = preprocessor
         self.__vocab = vocab
-        self.__docs = docs  # Store preprocessed documents
-        self.__doc_freq = defaultdict(int)  # Document frequency for each word
-        self.__calculate_doc_freq()
+        self.__vocab_index = {word: index for index, word in enumerate(vocab)}
+        self.__idf = idf if idf is not None else TFIDF.compute_idf(vocab=vocab, docs=docs)
 
     def extract_features(self, sentence: str) -> np.ndarray:
         """
@@ -52,27 +57,82 @@ class TFIDF:
             list: A list of TF-IDF scores corresponding to the vocabulary indices.
         """
 
-        # Preprocess the sentence
-        preprocessed_sentence = self.__preprocessor.preprocess_text(sentence)
+        return self.features_from_tokens(tokens=self.__preprocessor.preprocess_text(sentence))
+
+    def features_from_tokens(self, tokens: list) -> np.ndarray:
+        """
+        Extracts the TF-IDF vector of an already preprocessed sentence.
+
+        Parameters:
+            tokens (list): The preprocessed tokens of the sentence.
+
+        Returns:
+            np.ndarray: The TF-IDF scores corresponding to the vocabulary indices.
+        """
+
         # Calculate TF-IDF for each word in the sentence
         tf_idf_vector = np.zeros(len(self.__vocab))
-        for word in preprocessed_sentence:
-            if word in self.__vocab:
-                tf = preprocessed_sentence.count(word) / len(preprocessed_sentence)
-                idf = math.log(len(self.__docs) / (1 + self.__doc_freq[word]))
-                tf_idf_vector[self.__vocab.index(word)] = tf * idf
+        for word in tokens:
+            index = self.__vocab_index.get(word)
+            if index is not None:
+                tf = tokens.count(word) / len(tokens)
+                tf_idf_vector[index] = tf * self.__idf[index]
         return tf_idf_vector
 
-    def __calculate_doc_freq(self) -> None:
+    def extract_sparse_features(self, sentence: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts the sparse form of the TF-IDF vector of a sentence: only the indices of the words of the vocabulary
+        present in the sentence and their TF-IDF scores.
+
+        Parameters:
+            sentence (str): The sentence to convert into a TF-IDF vector.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The vocabulary indices of the nonzero entries and their values.
         """
-        Calculates the document frequency for each word in the vocabulary based on the provided documents.
-        Document frequency is incremented once for each word per document if the word is present.
+
+        return self.sparse_features_from_tokens(tokens=self.__preprocessor.preprocess_text(sentence))
+
+    def sparse_features_from_tokens(self, tokens: list) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Extracts the sparse form of the TF-IDF vector of an already preprocessed sentence.
+
+        Parameters:
+            tokens (list): The preprocessed tokens of the sentence.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The vocabulary indices of the nonzero entries and their values.
+        """
+
+        counts = {}
+        for word in tokens:
+            index = self.__vocab_index.get(word)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        indices = np.fromiter(counts.keys(), dtype=np.int64)
+        tf = np.fromiter(counts.values(), dtype=np.float64) / max(len(tokens), 1)
+        return indices, (tf * self.__idf[indices]).astype(np.float32)
+
+    @staticmethod
+    def compute_idf(vocab: list, docs: list) -> np.ndarray:
+        """
+        Computes the inverse document frequency of each word of the vocabulary. Document frequency is incremented
+        once for each word per document if the word is present.
+
+        Parameters:
+            vocab (list): The vocabulary list.
+            docs (list): A list of preprocessed documents.
+
+        Returns:
+            np.ndarray: The inverse document frequency of each word of the vocabulary, in the vocabulary order.
         """
 
         # Calculate document frequency for each word in the vocabulary
-        for doc in self.__docs:
+        doc_freq = defaultdict(int)
+        for doc in docs:
             for word in doc:
-                self.__doc_freq[word] += 1
+                doc_freq[word] += 1
+        return np.array([math.log(len(docs) / (1 + doc_freq[word])) for word in vocab])
 
     @property
     def extractor_name(self) -> str:
@@ -85,6 +145,17 @@ class TFIDF:
 
         return "TFIDF"
 
+    @property
+    def idf(self) -> np.ndarray:
+        """
+        Accesses the inverse document frequency of each word of the vocabulary.
+
+        Returns:
+            np.ndarray: The inverse document frequencies, in the vocabulary order.
+        """
+
+        return self.__idf
+
     @property
     def preprocessor(self) -> Preprocessor:
         """
@@ -1,8 +1,12 @@
+import os
+
 import numpy as np
 
+from gensim.models import KeyedVectors
 from gensim.models import Word2Vec as GensimWord2Vec
 from modules.NLP.preprocessing.preprocessor import Preprocessor
 from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
 
 
 class Word2Vec:
@@ -11,13 +15,18 @@ class Word2Vec:
     This model transforms text into vectors using a neural network architecture that learns to predict
     context words from target words or vice versa.
 
+    At inference time only the word vectors are needed, so they are saved next to the full model as a gensim
+    KeyedVectors file whose matrix is memory-mapped on load, without the training state.
+
     Attributes:
         __preprocessor (Preprocessor): An instance of the Preprocessor class used for tokenizing and normalizing text.
-        __model (GensimWord2Vec): A Gensim Word2Vec model instance.
+        __model (GensimWord2Vec): A Gensim Word2Vec model instance, only set when the model is trained.
+        __vectors (np.ndarray): The word vectors matrix, one row per word of the vocabulary.
+        __key_to_index (dict): A mapping of each word of the vocabulary to its row in the vectors matrix.
     """
 
     def __init__(self, preprocessor: Preprocessor, docs: list, vector_size: int = 100, window: int = 5,
-                 min_count: int = 1, workers: int = 4, sg: int = 0):
+                 min_count: int = 1, workers: int = None, sg: int = 0):
         """
         Initializes the Word2Vec class with a specified preprocessor and parameters for the Word2Vec model construction.
 
@@ -27,17 +36,20 @@ class Word2Vec:
             vector_size (int): Dimensionality of the word vectors.
             window (int): Maximum distance between the current and predicted word within a sentence.
             min_count (int): Ignores all words with total frequency lower than this.
-            workers (int): Number of worker threads to train the model.
+            workers (int): Number of worker threads to train the model. Defaults to the gensim_workers of the
+                           training pool of the RuntimeConfig.
             sg (int): Training algorithm: 1 for skip-gram; otherwise CBOW.
         """
 
         self.__preprocessor = preprocessor
         self.__model = None
+        self.__vectors = None
+        self.__key_to_index = {}
         self.__docs = docs
         self.__vector_size = vector_size
         self.__window = window
         self.__min_count = min_count
-        self.__workers = workers
+        self.__workers = workers or RuntimeConfig.get("training")["gensim_workers"]
         self.__sg = sg
 
     def extract_features(self, sentence: str) -> np.ndarray:
@@ -51,27 +63,70 @@ class Word2Vec:
             np.ndarray: A numpy array representing the sentence as a vector, averaging the vectors of the words in the sentence.
         """
 
-        words = self.__preprocessor.preprocess_text(text=sentence)
-        sentence_vector = np.zeros(self.__vector_size)
-        for word in words:
-            if word in self.__model.wv:
-                sentence_vector += self.__model.wv[word]
-        if len(words) != 0:
-            sentence_vector /= len(words)
+        return self.features_from_tokens(tokens=self.__preprocessor.preprocess_text(text=sentence))
+
+    def features_from_tokens(self, tokens: list) -> np.ndarray:
+        """
+        Converts an already preprocessed sentence into the average of the vectors of its words.
+
+        Parameters:
+            tokens (list): The preprocessed tokens of the sentence.
+
+        Returns:
+            np.ndarray: A numpy array representing the sentence as a vector.
+        """
+
+        indices = [self.__key_to_index[word] for word in tokens if word in self.__key_to_index]
+        sentence_vector = self.__vectors[indices].sum(axis=0, dtype=np.float64) if indices else np.zeros(
+            self.__vector_size)
+        if len(tokens) != 0:
+            sentence_vector /= len(tokens)
         return sentence_vector
 
-    def __get_word_vector(self, word: str) -> np.ndarray:
+    def extract_batch_features(self, sentences: list) -> np.ndarray:
         """
-        Retrieves the vector representation of a word from the model's vocabulary.
+        Converts several sentences at once, gathering the vectors of all their known words in a single indexing
+        operation and summing them per sentence.
 
         Parameters:
-            word (str): The word for which to retrieve the vector.
+            sentences (list): The sentences to convert.
 
         Returns:
-            np.ndarray: The vector representation of the word, or a zero vector if the word is not in the vocabulary.
+            np.ndarray: A matrix with one averaged sentence vector per row.
         """
 
-        return self.__model.wv[word] if word in self.__model.wv else np.zeros(self.__model.vector_size)
+        return self.batch_features_from_tokens(token_lists=self.__preprocessor.preprocess_corpus(texts=sentences))
+
+    def batch_features_from_tokens(self, token_lists: list) -> np.ndarray:
+        """
+        Converts several already preprocessed sentences at once, like extract_batch_features.
+
+        Parameters:
+            token_lists (list): The preprocessed tokens of each sentence.
+
+        Returns:
+            np.ndarray: A matrix with one averaged sentence vector per row.
+        """
+
+        sentence_vectors = np.zeros((len(token_lists), self.__vector_size))
+        indices = []
+        rows = []
+        lengths = np.zeros(len(token_lists))
+        for row, words in enumerate(token_lists):
+            lengths[row] = len(words)
+            for word in words:
+                index = self.__key_to_index.get(word)
+                if index is not None:
+                    indices.append(index)
+                    rows.append(row)
+
+        if indices:
+            rows = np.array(rows)
+            starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            sentence_vectors[rows[starts]] = np.add.reduceat(self.__vectors[indices], starts, axis=0, dtype=np.float64)
+        non_empty = lengths != 0
+        sentence_vectors[non_empty] /= lengths[non_empty, np.newaxis]
+        return sentence_vectors
 
     def train(self, model_name: str) -> None:
         """
@@ -83,12 +138,13 @@ class Word2Vec:
 
         self.__model = GensimWord2Vec(self.__docs, vector_size=self.__vector_size, window=self.__window,
                                       min_count=self.__min_count, workers=self.__workers, sg=self.__sg)
+        self.__set_vectors(keyed_vectors=self.__model.wv)
 
         self.__save_model(model_name)
 
     def __save_model(self, model_name: str) -> None:
         """
-        Saves the trained Word2Vec model to the specified file path.
+        Saves the trained Word2Vec model to the specified file path, along with its word vectors alone.
 
         Parameters:
             model_name (str): The name of the model to be saved.
@@ -96,17 +152,75 @@ class Word2Vec:
 
         file_path = PathFinder.get_complet_path(f"ressources/extractors/{model_name}_E.pth")
         self.__model.save(file_path)
+        self.__save_vectors(keyed_vectors=self.__model.wv, model_name=model_name)
+
+    @staticmethod
+    def __save_vectors(keyed_vectors: KeyedVectors, model_name: str) -> None:
+        """
+        Saves the word vectors in a KeyedVectors file, storing the matrix in a separate .npy file so it can be
+        memory-mapped on load.
+
+        Parameters:
+            keyed_vectors (KeyedVectors): The word vectors to save.
+            model_name (str): The name of the model the vectors belong to.
+        """
+
+        file_path = PathFinder.get_complet_path(f"ressources/extractors/{model_name}_E.kv")
+        keyed_vectors.save(file_path, separately=["vectors"])
 
     def load_model(self, model_name: str) -> None:
         """
-        Loads a Word2Vec model from the specified file path.
+        Loads the word vectors of a Word2Vec model from the specified file path. Models saved before the vectors
+        were stored on their own are loaded in full, without writing anything, see convert_model.
 
         Parameters:
             model_name (str): The name of the model to be loaded.
         """
         model_name = model_name.replace(".pth", "")
-        file_path = PathFinder.get_complet_path(f"ressources/extractors/{model_name}_E.pth")
-        self.__model = GensimWord2Vec.load(file_path)
+        file_path = PathFinder.get_complet_path(f"ressources/extractors/{model_name}_E.kv")
+        if os.path.exists(file_path):
+            self.__set_vectors(keyed_vectors=KeyedVectors.load(file_path, mmap="r"))
+        else:
+            model = GensimWord2Vec.load(PathFinder.get_complet_path(f"ressources/extractors/{model_name}_E.pth"))
+            self.__set_vectors(keyed_vectors=model.wv)
+
+    @staticmethod
+    def convert_model(file_name: str) -> str | None:
+        """
+        Saves the word vectors of an extractor saved before they were stored on their own, so that the next loads
+        memory-map them instead of loading the full model.
+
+        Parameters:
+            file_name (str): The name of the extractor file in ressources/extractors, ending with "_E.pth".
+
+        Returns:
+            str | None: The path of the KeyedVectors file, or None if the vectors were already saved on their own.
+
+        Raises:
+            ValueError: If the file is not named like an extractor.
+            AttributeError: If the file holds another model than a Word2Vec one.
+        """
+        if not file_name.endswith("_E.pth"):
+            raise ValueError(f"{file_name} is not the file of an extractor")
+        model_name = file_name[:-len("_E.pth")]
+        file_path = PathFinder.get_complet_path(f"ressources/extractors/{model_name}_E.kv")
+        if os.path.exists(file_path):
+            return None
+        model = GensimWord2Vec.load(PathFinder.get_complet_path(f"ressources/extractors/{file_name}"))
+        Word2Vec.__save_vectors(keyed_vectors=model.wv, model_name=model_name)
+        return file_path
+
+    def __set_vectors(self, keyed_vectors: KeyedVectors) -> None:
+        """
+        Keeps the vectors matrix and the word to row index used for the features extraction.
+
+        Parameters:
+            keyed_vectors (KeyedVectors): The word vectors of the model.
+        """
+
+        self.__vectors = keyed_vectors.vectors
+        self.__key_to_index = keyed_vectors.key_to_index
+        self.__vector_size = keyed_vectors.vector_size
 
     @property
     def extractor_name(self) -> str:
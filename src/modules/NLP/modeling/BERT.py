@@ -1,26 +1,82 @@
 import json
+import os
+import re
+import threading
 
+import numpy as np
 import torch
 from matplotlib import pyplot as plt
-from transformers import BertTokenizer, BertForSequenceClassification, TrainingArguments, Trainer
+from transformers import BertConfig, BertTokenizerFast, BertForSequenceClassification, TrainingArguments, Trainer
+from safetensors.torch import load_file, save_file
+from torch.ao.nn.quantized.dynamic import Linear as QuantizedLinear
 from torch.utils.data import Dataset
+
+from modules.NLP.modeling.intent_scorer import IntentScorer, DEFAULT_CALIBRATION_SPLIT, DEFAULT_TEMPERATURE, \
+    DEFAULT_THRESHOLD
+from modules.NLP.modeling.model_artifact import ONNX_FILE
+from modules.NLP.modeling.onnx_backend import OnnxPredictor
+from modules.NLP.modeling.pretrained_resolver import PretrainedResolver
 from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
+
+QUANTIZED_FILE = "quantized_int8.safetensors"
+BASE_MODEL = "bert-base-uncased"
+
+
+TRAINING_MAX_LENGTH = 128
+INFERENCE_MAX_LENGTH = 64
 
 
 class IntentDataset(Dataset):
-    def __init__(self, encodings, labels):
-        self.encodings = encodings
+    """
+    A dataset of texts encoded once, each one kept as a compact int32 array of its own length rather than as a row
+    of a tensor padded to the longest text. The padding is done per batch by the PaddingCollator.
+
+    Attributes:
+        input_ids (list): The token ids of each text.
+        labels (list): The index of the intent of each text.
+    """
+
+    def __init__(self, input_ids: list, labels: list):
+        self.input_ids = [np.asarray(ids, dtype=np.int32) for ids in input_ids]
         self.labels = labels
 
     def __getitem__(self, idx):
-        item = {key: torch.tensor(val[idx]) for key, val in self.encodings.items()}
-        item['labels'] = torch.tensor(self.labels[idx])
-        return item
+        return {"input_ids": self.input_ids[idx], "labels": self.labels[idx]}
 
     def __len__(self):
         return len(self.labels)
 
 
+class PaddingCollator:
+    """
+    A collator that pads the texts of a batch to the longest one of the batch only, and builds the attention mask
+    and the token type ids BERT expects from the lengths of the texts.
+
+    Attributes:
+        pad_token_id (int): The id of the padding token.
+        pad_to_multiple_of (int): The padded length is rounded up to a multiple of this value.
+    """
+
+    def __init__(self, pad_token_id: int, pad_to_multiple_of: int = 8):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features: list) -> dict:
+        lengths = [len(feature["input_ids"]) for feature in features]
+        padded_length = -(-max(lengths) // self.pad_to_multiple_of) * self.pad_to_multiple_of
+        input_ids = torch.full((len(features), padded_length), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(features), padded_length), dtype=torch.long)
+        for row, (feature, length) in enumerate(zip(features, lengths)):
+            input_ids[row, :length] = torch.from_numpy(np.asarray(feature["input_ids"], dtype=np.int64))
+            attention_mask[row, :length] = 1
+        batch = {"input_ids": input_ids, "attention_mask": attention_mask,
+                 "token_type_ids": torch.zeros_like(input_ids)}
+        if "labels" in features[0]:
+            batch["labels"] = torch.tensor([feature["labels"] for feature in features], dtype=torch.long)
+        return batch
+
+
 class BertIntentClassifier:
     """
     A classifier for intent recognition in text using the BERT (Bidirectional Encoder Representations from Transformers) model.
@@ -28,35 +84,55 @@ class BertIntentClassifier:
 
     Attributes:
         __model_name (str): The name of the model for saving and loading purposes.
-        __tokenizer (BertTokenizer): Tokenizer for converting text into tokens that BERT can understand.
+        __tokenizer (BertTokenizerFast): Tokenizer for converting text into tokens that BERT can understand, shared
+        by all the classifiers loading it from the same directory.
+        __tokenizers (dict): The tokenizers already loaded, by directory, shared by all instances.
+        __tokenizers_lock (threading.Lock): A lock protecting the tokenizers cache.
         __intents (list): List of unique intent labels.
         __intent_map (dict): Mapping of intent labels to their corresponding indices.
-        __model (BertForSequenceClassification): The BERT model for sequence classification.
+        __model (BertForSequenceClassification | OnnxPredictor): The BERT model for sequence classification, run
+        with onnxruntime when it was exported to ONNX.
         __texts (list): Collection of text data for training.
         __tags (list): Corresponding intent labels for the text data.
         __device (torch.device): Device (CPU or GPU) on which the model will run.
+        __threshold (float): The probability the best intent must exceed to be accepted.
+        __calibration_split (float): The fraction of the patterns of every intent held out to fit the temperature.
+        __scorer (IntentScorer): The calibrated scoring of the outputs of the model.
 
     Methods:
         load_data(): Loads training data from a JSON file and preprocesses it into a suitable format.
         prepare_data(): Prepares the data for training by encoding texts and converting labels into tensors.
         train(epochs, learning_rate, batch_size): Trains the BERT model using the specified hyperparameters.
         predict(text): Predicts the intent of a given text using the trained model.
-        load_model(): Loads a trained BERT model and tokenizer from files.
+        predict_logits(texts, batch_size): Computes the raw scores of every intent for several texts.
+        load_model(quantized): Loads a trained BERT model and tokenizer from files.
+        quantize(model_name): Saves an int8 dynamically quantized copy of a trained model.
+        load_quantized(model_name): Loads the int8 dynamically quantized copy of a trained model.
     """
 
-    def __init__(self, model_name: str, num_epochs: int = None, learning_rate: float = None, batch_size: int = None):
+    __tokenizers = {}
+    __tokenizers_lock = threading.Lock()
+
+    def __init__(self, model_name: str, num_epochs: int = None, learning_rate: float = None, batch_size: int = None,
+                 threshold: float = DEFAULT_THRESHOLD, calibration_split: float = DEFAULT_CALIBRATION_SPLIT):
         """
-        Initializes the BertIntentClassifier with a specific model name.
+        Initializes the BertIntentClassifier with a specific model name. Nothing is loaded yet: the training data is
+        loaded by train, and the model, its tokenizer and its intent labels by load_model.
 
         Parameters:
             model_name (str): The name used to save or load the model.
             num_epochs (int): The number of epochs to train the model.
             batch_size (int): The batch size for training.
             learning_rate (float): The optimizer's learning rate.
+            threshold (float): The probability the best intent must exceed to be accepted, saved with the trained
+                               model. Defaults to DEFAULT_THRESHOLD.
+            calibration_split (float): The fraction of the patterns of every intent held out of the training to fit
+                                       the temperature of the model. Defaults to DEFAULT_CALIBRATION_SPLIT, no
+                                       pattern is held out and the temperature is DEFAULT_TEMPERATURE.
         """
 
         self.__model_name = model_name
-        self.__tokenizer = BertTokenizer.from_pretrained('bert-base-uncased')
+        self.__tokenizer = None
         self.__intents = []
         self.__intent_map = {}
         self.__model = None
@@ -66,7 +142,9 @@ class BertIntentClassifier:
         self.__num_epochs = num_epochs
         self.__learning_rate = learning_rate
         self.__batch_size = batch_size
-        self.load_data()
+        self.__threshold = threshold
+        self.__calibration_split = calibration_split
+        self.__scorer = None
 
     def load_data(self):
         """
@@ -87,27 +165,43 @@ class BertIntentClassifier:
                 self.__texts.append(text)
                 self.__tags.append(self.__intent_map[tag])
 
-    def prepare_data(self) -> IntentDataset:
+    def prepare_data(self, indices: list = None) -> IntentDataset:
         """
-        Encodes text data and converts labels into tensors, preparing them as a dataset for training.
+        Encodes text data once, without padding, preparing it as a dataset for training. The padding is added per
+        batch by the PaddingCollator.
+
+        Parameters:
+            indices (list): The indices of the texts to encode. Defaults to all of them.
 
         Returns:
             IntentDataset: A dataset containing encoded texts and labels ready for training.
         """
 
-        encodings = self.__tokenizer(self.__texts, truncation=True, padding=True, max_length=512, return_tensors='pt')
-        dataset = IntentDataset(encodings, self.__tags)
+        indices = range(len(self.__texts)) if indices is None else indices
+        encodings = self.__tokenizer([self.__texts[index] for index in indices], truncation=True,
+                                     max_length=TRAINING_MAX_LENGTH)
+        dataset = IntentDataset(encodings["input_ids"], [self.__tags[index] for index in indices])
         return dataset
 
     def train(self) -> None:
         """
-        Trains the BERT model for intent classification using the specified hyperparameters.
+        Trains the BERT model for intent classification using the specified hyperparameters, then fits the
+        temperature of the probabilities of the saved model on the held out patterns, which it was not trained on.
         """
 
-        dataset = self.prepare_data()
+        RuntimeConfig.use("training", "BERT")
+        base_model_path = PretrainedResolver.resolve(BASE_MODEL)
+        if not self.__texts:
+            self.load_data()
+        self.__tokenizer = BertIntentClassifier.__load_tokenizer(base_model_path)
+        training_indices, calibration_indices = IntentScorer.split_calibration(labels=self.__tags,
+                                                                               fraction=self.__calibration_split)
+        dataset = self.prepare_data(indices=training_indices)
 
-        self.__model = BertForSequenceClassification.from_pretrained('bert-base-uncased',
-                                                                     num_labels=len(self.__intents)).to(self.__device)
+        # The intent labels are saved in the config of the model, so they do not have to be rebuilt to use it
+        self.__model = BertForSequenceClassification.from_pretrained(
+            base_model_path, num_labels=len(self.__intents), id2label=dict(enumerate(self.__intents)),
+            label2id=self.__intent_map, local_files_only=True).to(self.__device)
 
         training_args = TrainingArguments(
             output_dir=PathFinder.get_complet_path(f"ressources/results/"),
@@ -118,13 +212,15 @@ class BertIntentClassifier:
             warmup_steps=500,
             weight_decay=0.01,
             logging_dir=PathFinder.get_complet_path(f"ressources/logs/"),
-            logging_steps=10  # Log metrics and loss every 10 steps
+            logging_steps=10,  # Log metrics and loss every 10 steps
+            group_by_length=True  # Batch texts of similar lengths together to reduce the padding
         )
 
         trainer = Trainer(
             model=self.__model,
             args=training_args,
             train_dataset=dataset,
+            data_collator=PaddingCollator(pad_token_id=self.__tokenizer.pad_token_id),
         )
 
         train_result = trainer.train()
@@ -142,6 +238,12 @@ class BertIntentClassifier:
 
         self.__save_chart(epochs_reported, losses)
 
+        self.__model.eval()
+        temperature = IntentScorer.fit_temperature(
+            logits=torch.from_numpy(self.predict_logits([self.__texts[index] for index in calibration_indices])),
+            labels=torch.tensor([self.__tags[index] for index in calibration_indices]))
+        self.__scorer = IntentScorer(tags=self.__intents, temperature=temperature, threshold=self.__threshold)
+
         self.__save_model(time_taken, last_loss)
 
     def __save_chart(self, epochs_reported, losses):
@@ -175,22 +277,146 @@ class BertIntentClassifier:
         config.num_epochs = self.__num_epochs  # Assuming self.epochs is defined
         config.learning_rate = self.__learning_rate  # Assuming self.lr is defined
         config.batch_size = self.__batch_size  # Assuming self.batch_size is defined
+        config.calibration_temperature = self.__scorer.temperature
+        config.intent_threshold = self.__scorer.threshold
 
         self.__model.save_pretrained(model_path)
+        # An ONNX export or a quantized copy of the previous weights would be preferred to the new ones
+        for derived_file in [ONNX_FILE, QUANTIZED_FILE]:
+            if os.path.isfile(os.path.join(model_path, derived_file)):
+                os.remove(os.path.join(model_path, derived_file))
         self.__tokenizer.save_pretrained(tokenizer_path)
 
         print(f'training complete in {total_time:.2f} sec. final loss: {last_loss:.4f}, file saved to {model_path}')
 
-    def load_model(self) -> None:
+    def load_model(self, quantized: bool = True) -> None:
         """
         Loads a trained BERT model and tokenizer from files, preparing the classifier for making predictions.
+        The ONNX export of the model is run with onnxruntime instead when it exists, otherwise the int8 quantized
+        copy of the model is loaded when it exists and is allowed. The intent labels, the temperature and the
+        threshold are read from the config of the model; intents.json is only loaded for the models saved without
+        labels.
+
+        Parameters:
+            quantized (bool): Whether the int8 quantized copy of the model can be loaded. Defaults to True.
         """
 
         model_path, tokenizer_path = self.__get_necessary_path()
-        self.__model = BertForSequenceClassification.from_pretrained(model_path)
-        self.__tokenizer = BertTokenizer.from_pretrained(tokenizer_path)
+        for path in [model_path, tokenizer_path]:
+            if not os.path.isdir(path):
+                raise FileNotFoundError(f"The BERT model {self.__model_name} cannot be loaded, {path} does not exist.")
+        config = BertConfig.from_pretrained(model_path, local_files_only=True)
+        labels = [config.id2label[index] for index in range(config.num_labels)]
+        if all(re.fullmatch(r"LABEL_\d+", label) for label in labels):
+            if not self.__intents:
+                self.load_data()
+        else:
+            self.__intents = labels
+            self.__intent_map = {label: index for index, label in enumerate(labels)}
+        # Not named temperature, which is a generation parameter of the configs of the transformers models
+        self.__scorer = IntentScorer(tags=self.__intents,
+                                     temperature=getattr(config, "calibration_temperature", DEFAULT_TEMPERATURE),
+                                     threshold=getattr(config, "intent_threshold", DEFAULT_THRESHOLD))
+
+        if OnnxPredictor.is_available(model_path):
+            self.__model = OnnxPredictor(model_path=model_path, modeling_name="BERT")
+        elif quantized and os.path.isfile(os.path.join(model_path, QUANTIZED_FILE)):
+            self.__model = BertIntentClassifier.load_quantized(model_name=self.__model_name)
+        else:
+            self.__model = BertForSequenceClassification.from_pretrained(model_path, config=config,
+                                                                         local_files_only=True)
+            self.__model.eval()
+        self.__tokenizer = BertIntentClassifier.__load_tokenizer(tokenizer_path)
         print(f"Model loaded from {model_path}, Tokenizer loaded from {tokenizer_path}")
 
+    @staticmethod
+    def __load_tokenizer(path: str) -> BertTokenizerFast:
+        """
+        Loads the fast (Rust-backed) tokenizer saved in a directory, or returns it if it was already loaded.
+
+        Parameters:
+            path (str): The directory of the tokenizer.
+
+        Returns:
+            BertTokenizerFast: The tokenizer.
+        """
+
+        with BertIntentClassifier.__tokenizers_lock:
+            if path not in BertIntentClassifier.__tokenizers:
+                BertIntentClassifier.__tokenizers[path] = BertTokenizerFast.from_pretrained(path,
+                                                                                            local_files_only=True)
+            return BertIntentClassifier.__tokenizers[path]
+
+    @staticmethod
+    def quantize(model_name: str) -> str:
+        """
+        Saves a copy of a trained model whose Linear layers, which hold nearly all of its weights and of its
+        computations, are dynamically quantized to int8: their weights are stored as int8 and the activations are
+        quantized on the fly, which reduces the memory used and speeds up CPU inference without retraining.
+
+        Parameters:
+            model_name (str): The name of the model directory in ressources/models.
+
+        The int8 weights are saved with safetensors, with their scale and zero point, rather than by pickling the
+        packed parameters of the quantized layers.
+
+        Returns:
+            str: The path of the quantized copy, saved in the model directory.
+        """
+
+        model_path = PathFinder.get_complet_path(f"ressources/models/{model_name}")
+        model = BertForSequenceClassification.from_pretrained(model_path, local_files_only=True)
+        model.eval()
+        quantized_model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        tensors = {}
+        quantized_layers = []
+        for name, module in quantized_model.named_modules():
+            if isinstance(module, QuantizedLinear):
+                quantized_layers.append(f"{name}.")
+                weight, bias = module.weight(), module.bias()
+                tensors[f"{name}.weight_int8"] = weight.int_repr()
+                tensors[f"{name}.weight_scale"] = torch.tensor(weight.q_scale(), dtype=torch.float64)
+                tensors[f"{name}.weight_zero_point"] = torch.tensor(weight.q_zero_point(), dtype=torch.int64)
+                if bias is not None:
+                    tensors[f"{name}.bias"] = bias.detach()
+        for name, tensor in model.state_dict().items():
+            if not any(name.startswith(layer) for layer in quantized_layers):
+                tensors[name] = tensor
+        quantized_path = os.path.join(model_path, QUANTIZED_FILE)
+        save_file({name: tensor.contiguous() for name, tensor in tensors.items()}, quantized_path)
+        return quantized_path
+
+    @staticmethod
+    def load_quantized(model_name: str) -> BertForSequenceClassification:
+        """
+        Loads the int8 quantized copy of a trained model saved by quantize.
+
+        Parameters:
+            model_name (str): The name of the model directory in ressources/models.
+
+        Returns:
+            BertForSequenceClassification: The quantized model, in evaluation mode.
+        """
+
+        model_path = PathFinder.get_complet_path(f"ressources/models/{model_name}")
+        tensors = load_file(os.path.join(model_path, QUANTIZED_FILE))
+        model = BertForSequenceClassification(BertConfig.from_pretrained(model_path, local_files_only=True))
+        model.eval()
+        # The weights of the Linear layers are missing, they are replaced by the int8 ones after the quantization
+        model.load_state_dict(tensors, strict=False)
+        quantized_model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        for name, module in quantized_model.named_modules():
+            if isinstance(module, QuantizedLinear):
+                # The dequantized weights fall on the int8 grid, so quantizing them again gives back the saved ones
+                scale = tensors[f"{name}.weight_scale"].item()
+                zero_point = tensors[f"{name}.weight_zero_point"].item()
+                dequantized = (tensors[f"{name}.weight_int8"].to(torch.float64) - zero_point) * scale
+                weight = torch.quantize_per_tensor(dequantized.to(torch.float32), scale, zero_point, torch.qint8)
+                module.set_weight_bias(weight, tensors.get(f"{name}.bias"))
+        return quantized_model
+
     def __get_necessary_path(self) -> tuple[str, str]:
         """
         Determines the file paths for saving the BERT model and tokenizer based on the model name.
@@ -211,14 +437,78 @@ class BertIntentClassifier:
             text (str): The text for which the intent is to be predicted.
 
         Returns:
-            str: The predicted intent label.
+            str: The predicted intent label, or an empty string if it is rejected by the threshold of the model.
         """
 
-        self.__model.eval()
-        inputs = self.__tokenizer(text, return_tensors="pt", truncation=True, padding=True, max_length=512)
+        return self.__scorer.predict(self.__compute_logits(texts=[text]))[0]
+
+    def predict_logits(self, texts: list, batch_size: int = 32) -> np.ndarray:
+        """
+        Computes the raw scores of every intent for several texts, e.g. to use the model as the teacher of a
+        distilled student.
+
+        Parameters:
+            texts (list): The texts to score.
+            batch_size (int): The number of texts given to the model at once. Defaults to 32.
+
+        Returns:
+            np.ndarray: A matrix with one row of logits per text, in the order of the intents property.
+        """
+
+        if not texts:
+            return np.zeros((0, len(self.__intents)), dtype=np.float32)
+
+        # Score the texts sorted by length, so each batch is padded to a length close to the one of all its texts
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        sorted_texts = [texts[index] for index in order]
+        logits = np.concatenate([self.__compute_logits(texts=sorted_texts[start:start + batch_size]).numpy()
+                                 for start in range(0, len(texts), batch_size)])
+        result = np.empty_like(logits)
+        result[order] = logits
+        return result
+
+    def __compute_logits(self, texts: list) -> torch.Tensor:
+        """
+        Tokenizes texts and computes their logits, with PyTorch or with onnxruntime depending on the loaded model.
+        The texts are padded to the longest of them only and truncated to INFERENCE_MAX_LENGTH tokens, far above
+        the length of a chat message.
+
+        Parameters:
+            texts (list): The texts to score.
+
+        Returns:
+            torch.Tensor: A matrix with one row of logits per text.
+        """
+
+        if isinstance(self.__model, OnnxPredictor):
+            inputs = self.__tokenizer(texts, return_tensors="np", truncation=True, padding=True,
+                                      max_length=INFERENCE_MAX_LENGTH)
+            return torch.from_numpy(self.__model.run(**{name: array.astype(np.int64)
+                                                        for name, array in inputs.items()}))
+
+        inputs = self.__tokenizer(texts, return_tensors="pt", truncation=True, padding=True,
+                                  max_length=INFERENCE_MAX_LENGTH).to(self.__model.device)
         with torch.no_grad():
-            outputs = self.__model(**inputs)
-        probs = torch.softmax(outputs.logits, dim=1)
-        prediction = torch.argmax(outputs.logits, dim=1)
-        predicted_prob = probs[0, prediction.item()].item()
-        return self.__intents[prediction.item()] if predicted_prob > 0.6 else ""
+            return self.__model(**inputs).logits.cpu()
+
+    @property
+    def intents(self) -> list:
+        """
+        Accesses the intent labels, in the order of the outputs of the model.
+
+        Returns:
+            list: The intent labels.
+        """
+
+        return self.__intents
+
+    @property
+    def scorer(self) -> IntentScorer:
+        """
+        Accesses the calibrated scoring of the outputs of the model, set up by train or load_model.
+
+        Returns:
+            IntentScorer: The scorer of the model.
+        """
+
+        return self.__scorer
@@ -0,0 +1,458 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+from safetensors import safe_open
+from safetensors.torch import save_file
+from transformers import BertModel, BertTokenizerFast
+
+from modules.NLP.modeling.BERT import BASE_MODEL, INFERENCE_MAX_LENGTH
+from modules.NLP.modeling.intent_scorer import IntentScorer, DEFAULT_CALIBRATION_SPLIT, DEFAULT_TEMPERATURE, \
+    DEFAULT_THRESHOLD
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.modeling import Modeling
+from modules.NLP.modeling.pretrained_resolver import PretrainedResolver
+from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
+
+EMBEDDINGS_DIRECTORY = "ressources/embeddings"
+WEIGHT_FILES = (".safetensors", ".bin")
+
+
+class FrozenEncoder:
+    """
+    A pretrained BERT encoder whose weights are never trained, turning texts into fixed size embeddings: the mean
+    of the last hidden states of their tokens. The encoders are shared by every model of the process using the same
+    pretrained model, so the weights are loaded in memory once whatever the number of models served.
+
+    The embeddings of the training patterns are cached on disk, in one file per pretrained model and revision of
+    its weights, by hash of the pattern, so only the patterns not encoded yet are run through the encoder.
+
+    Attributes:
+        __name (str): The name of the pretrained model on the hub, or its directory.
+        __path (str): The local directory of the pretrained model.
+        __revision (str): The revision of the weights of the pretrained model.
+        __tokenizer (BertTokenizerFast): The tokenizer of the pretrained model.
+        __model (BertModel): The encoder, in evaluation mode.
+        __encoders (dict): The encoders already loaded, by name, shared by all instances.
+        __encoders_lock (threading.Lock): A lock protecting the encoders cache.
+
+    Methods:
+        get(name): Returns the shared encoder of a pretrained model.
+        get_revision(path): Computes the revision of the weights saved in a directory.
+        encode(texts, batch_size): Computes the embeddings of texts.
+        encode_cached(texts, batch_size): Computes the embeddings of texts, reusing the cached ones.
+    """
+
+    __encoders = {}
+    __encoders_lock = threading.Lock()
+
+    def __init__(self, name: str = BASE_MODEL):
+        """
+        Initializes the FrozenEncoder by loading the pretrained model, without any network access.
+
+        Parameters:
+            name (str): The name of the pretrained model on the hub, or its directory. Defaults to BASE_MODEL.
+
+        Raises:
+            FileNotFoundError: If the pretrained model is available nowhere locally.
+        """
+        self.__name = name
+        self.__path = PretrainedResolver.resolve(name)
+        self.__revision = FrozenEncoder.get_revision(self.__path)
+        self.__tokenizer = BertTokenizerFast.from_pretrained(self.__path, local_files_only=True)
+        self.__model = BertModel.from_pretrained(self.__path, add_pooling_layer=False, local_files_only=True)
+        self.__model.eval()
+        self.__model.requires_grad_(False)
+
+    @staticmethod
+    def get(name: str = BASE_MODEL) -> "FrozenEncoder":
+        """
+        Returns the encoder of a pretrained model, loading it the first time.
+
+        Parameters:
+            name (str): The name of the pretrained model on the hub, or its directory. Defaults to BASE_MODEL.
+
+        Returns:
+            FrozenEncoder: The encoder shared by the whole process.
+        """
+        with FrozenEncoder.__encoders_lock:
+            if name not in FrozenEncoder.__encoders:
+                FrozenEncoder.__encoders[name] = FrozenEncoder(name=name)
+            return FrozenEncoder.__encoders[name]
+
+    @staticmethod
+    def get_revision(path: str) -> str:
+        """
+        Computes the revision of the weights of a pretrained model. A snapshot of the cache of the hub is named after
+        its commit; any other directory is identified by its config and by the names and sizes of its weight files,
+        which does not require reading the weights.
+
+        Parameters:
+            path (str): The local directory of the pretrained model.
+
+        Returns:
+            str: The revision, a hexadecimal string.
+        """
+        path = os.path.normpath(path)
+        if os.path.basename(os.path.dirname(path)) == "snapshots":
+            return os.path.basename(path)
+
+        digest = hashlib.sha1()
+        with open(os.path.join(path, "config.json"), "rb") as file:
+            digest.update(file.read())
+        for file_name in sorted(os.listdir(path)):
+            if file_name.endswith(WEIGHT_FILES):
+                digest.update(f"{file_name}:{os.path.getsize(os.path.join(path, file_name))}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def encode(self, texts: list, batch_size: int = 32) -> torch.Tensor:
+        """
+        Computes the embeddings of texts, by batches of texts of similar lengths. The texts are truncated to
+        INFERENCE_MAX_LENGTH tokens, far above the length of a chat message.
+
+        Parameters:
+            texts (list): The texts to encode.
+            batch_size (int): The number of texts given to the encoder at once. Defaults to 32.
+
+        Returns:
+            torch.Tensor: A matrix with one embedding per text, in the order of the texts.
+        """
+        embeddings = torch.empty((len(texts), self.__model.config.hidden_size))
+        order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+        for start in range(0, len(texts), batch_size):
+            indices = order[start:start + batch_size]
+            inputs = self.__tokenizer([texts[index] for index in indices], return_tensors="pt", truncation=True,
+                                      padding=True, max_length=INFERENCE_MAX_LENGTH).to(self.__model.device)
+            with torch.no_grad():
+                hidden_states = self.__model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).to(hidden_states.dtype)
+            embeddings[indices] = ((hidden_states * mask).sum(dim=1) / mask.sum(dim=1)).float().cpu()
+        return embeddings
+
+    def encode_cached(self, texts: list, batch_size: int = 32) -> torch.Tensor:
+        """
+        Computes the embeddings of texts, reading the ones already cached for this revision of the pretrained model
+        and encoding only the others, which are then added to the cache.
+
+        Parameters:
+            texts (list): The texts to encode.
+            batch_size (int): The number of texts given to the encoder at once. Defaults to 32.
+
+        Returns:
+            torch.Tensor: A matrix with one embedding per text, in the order of the texts.
+        """
+        cache = self.__load_cache()
+        keys = [FrozenEncoder.__hash_text(text) for text in texts]
+        missing = list(dict.fromkeys(key for key in keys if key not in cache))
+        if missing:
+            texts_by_key = dict(zip(keys, texts))
+            cache.update(zip(missing, self.encode([texts_by_key[key] for key in missing], batch_size=batch_size)))
+            self.__save_cache(cache)
+        print(f"{len(texts) - len(missing)} cached embeddings reused, {len(missing)} patterns encoded")
+        return torch.stack([cache[key] for key in keys]) if keys else torch.empty((0, self.hidden_size))
+
+    def __get_cache_path(self) -> str:
+        """
+        Returns the file caching the embeddings of this revision of the pretrained model.
+
+        Returns:
+            str: The path of the cache file, whether it exists or not.
+        """
+        name = os.path.basename(os.path.normpath(self.__name)).replace("/", "--")
+        return PathFinder.get_complet_path(f"{EMBEDDINGS_DIRECTORY}/{name}-{self.__revision[:16]}.safetensors")
+
+    def __load_cache(self) -> dict:
+        """
+        Reads the embeddings cached for this revision of the pretrained model.
+
+        Returns:
+            dict: The embedding of every cached text, by hash of the text.
+        """
+        path = self.__get_cache_path()
+        if not os.path.isfile(path):
+            return {}
+        with safe_open(path, framework="pt") as file:
+            keys = json.loads(file.metadata()["keys"])
+            embeddings = file.get_tensor("embeddings")
+        return dict(zip(keys, embeddings))
+
+    def __save_cache(self, cache: dict) -> None:
+        """
+        Writes the embeddings cached for this revision of the pretrained model, replacing the cache file at once so
+        that a reader never sees a partial file.
+
+        Parameters:
+            cache (dict): The embedding of every cached text, by hash of the text.
+        """
+        path = self.__get_cache_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        save_file({"embeddings": torch.stack(list(cache.values())).contiguous()}, temporary_path,
+                  metadata={"keys": json.dumps(list(cache.keys()))})
+        os.replace(temporary_path, path)
+
+    @staticmethod
+    def __hash_text(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+    @property
+    def name(self) -> str:
+        """
+        Accesses the name of the pretrained model on the hub, or its directory.
+
+        Returns:
+            str: The name of the pretrained model.
+        """
+        return self.__name
+
+    @property
+    def revision(self) -> str:
+        """
+        Accesses the revision of the weights of the pretrained model.
+
+        Returns:
+            str: The revision.
+        """
+        return self.__revision
+
+    @property
+    def hidden_size(self) -> int:
+        """
+        Accesses the size of the embeddings.
+
+        Returns:
+            int: The size of the embeddings.
+        """
+        return self.__model.config.hidden_size
+
+
+class FrozenBertClassifier:
+    """
+    A fast alternative to the fine-tuning of the BertIntentClassifier: the pretrained encoder is frozen, the patterns
+    of intents.json are encoded once, and only a small NeuralNet head is trained over their cached embeddings, which
+    takes seconds on a CPU for hundreds of epochs. The head is saved with the ModelArtifact layout, with the name and
+    revision of the encoder in its manifest; the encoder itself is not copied but shared with the other models.
+
+    Attributes:
+        __model_name (str): The name used to save or load the model.
+        __base_model (str): The name of the pretrained encoder on the hub, or its directory.
+        __num_epochs (int): The number of epochs to train the head.
+        __learning_rate (float): The optimizer's learning rate.
+        __batch_size (int): The batch size for training.
+        __hidden_size (int): The number of units in the hidden layers of the head.
+        __threshold (float): The probability the best intent must exceed to be accepted.
+        __calibration_split (float): The fraction of the patterns of every intent held out to fit the temperature.
+        __encoder (FrozenEncoder): The shared frozen encoder.
+        __head (NeuralNet): The classification head.
+        __intents (list): The intent labels, in the order of the outputs of the head.
+        __scorer (IntentScorer): The calibrated scoring of the outputs of the head.
+
+    Methods:
+        train(): Trains the head over the embeddings of the patterns and saves the model.
+        load_model(): Loads a trained head and its encoder.
+        predict(text): Predicts the intent of a text.
+        predict_logits(texts, batch_size): Computes the raw scores of every intent for several texts.
+    """
+
+    def __init__(self, model_name: str, num_epochs: int = 300, learning_rate: float = 1e-3, batch_size: int = 32,
+                 hidden_size: int = 128, threshold: float = DEFAULT_THRESHOLD,
+                 calibration_split: float = DEFAULT_CALIBRATION_SPLIT, base_model: str = BASE_MODEL):
+        """
+        Initializes the FrozenBertClassifier. Nothing is loaded yet: the encoder is loaded by train or load_model.
+
+        Parameters:
+            model_name (str): The name used to save or load the model.
+            num_epochs (int): The number of epochs to train the head. Defaults to 300.
+            learning_rate (float): The optimizer's learning rate. Defaults to 1e-3.
+            batch_size (int): The batch size for training. Defaults to 32.
+            hidden_size (int): The number of units in the hidden layers of the head. Defaults to 128.
+            threshold (float): The probability the best intent must exceed to be accepted, saved with the trained
+                               model. Defaults to DEFAULT_THRESHOLD.
+            calibration_split (float): The fraction of the patterns of every intent held out of the training to fit
+                                       the temperature of the model. Defaults to DEFAULT_CALIBRATION_SPLIT, no
+                                       pattern is held out and the temperature is DEFAULT_TEMPERATURE.
+            base_model (str): The name of the pretrained encoder on the hub, or its directory. Defaults to
+                              BASE_MODEL.
+        """
+        self.__model_name = model_name
+        self.__base_model = base_model
+        self.__num_epochs = num_epochs
+        self.__learning_rate = learning_rate
+        self.__batch_size = batch_size
+        self.__hidden_size = hidden_size
+        self.__threshold = threshold
+        self.__calibration_split = calibration_split
+        self.__encoder = None
+        self.__head = None
+        self.__intents = []
+        self.__scorer = None
+
+    def train(self) -> None:
+        """
+        Encodes the patterns of intents.json with the frozen encoder, reusing the cached embeddings, trains the head
+        over them and saves the model. The temperature of its probabilities is fitted last, on the patterns held out
+        of the training of the saved head.
+        """
+        RuntimeConfig.use("training", "FrozenBERT")
+        start = time.time()
+        with open(PathFinder.get_complet_path("ressources/json_files/intents.json"), "r", encoding="utf-8") as file:
+            intents_data = json.load(file)
+        self.__intents = list(dict.fromkeys(intent["tag"] for intent in intents_data["intents"]))
+        intent_map = {tag: index for index, tag in enumerate(self.__intents)}
+        texts = [text for intent in intents_data["intents"] for text in intent["patterns"]]
+        labels = [intent_map[intent["tag"]] for intent in intents_data["intents"] for _ in intent["patterns"]]
+
+        self.__encoder = FrozenEncoder.get(self.__base_model)
+        embeddings = self.__encoder.encode_cached(texts)
+        labels = torch.tensor(labels, dtype=torch.long)
+        training_indices, calibration_indices = IntentScorer.split_calibration(labels=labels.tolist(),
+                                                                               fraction=self.__calibration_split)
+        loss = self.__train_head(embeddings=embeddings, labels=labels, indices=torch.tensor(training_indices))
+        calibration_indices = torch.tensor(calibration_indices, dtype=torch.long)
+        with torch.no_grad():
+            temperature = IntentScorer.fit_temperature(logits=self.__head(embeddings[calibration_indices]),
+                                                       labels=labels[calibration_indices])
+        self.__scorer = IntentScorer(tags=self.__intents, temperature=temperature, threshold=self.__threshold)
+        self.__save_model(corpus_hash=hashlib.sha1(json.dumps([texts, labels.tolist()]).encode("utf-8")).hexdigest())
+        print(f'training complete in {time.time() - start:.2f} sec. final loss: {loss.item():.4f}, '
+              f'file saved to {ModelArtifact.get_path(self.__model_name)}')
+
+    def __train_head(self, embeddings: torch.Tensor, labels: torch.Tensor, indices: torch.Tensor) -> torch.Tensor:
+        """
+        Trains a new head over the embeddings of some patterns.
+
+        Parameters:
+            embeddings (torch.Tensor): The embeddings of all the patterns.
+            labels (torch.Tensor): The index of the intent of every pattern.
+            indices (torch.Tensor): The indices of the training patterns.
+
+        Returns:
+            torch.Tensor: The loss of the last batch.
+        """
+        self.__head = Modeling.select_model(modeling_name="NeuralNet", input_size=self.__encoder.hidden_size,
+                                            hidden_size=self.__hidden_size, num_classes=len(self.__intents),
+                                            device=torch.device("cpu"))
+        criterion = nn.CrossEntropyLoss()
+        optimizer = torch.optim.Adam(self.__head.parameters(), lr=self.__learning_rate)
+        report_frequency = max(1, self.__num_epochs // 10)
+        loss = torch.zeros(1)
+        for epoch in range(self.__num_epochs):
+            permutation = indices[torch.randperm(len(indices))]
+            for batch_start in range(0, len(permutation), self.__batch_size):
+                batch = permutation[batch_start:batch_start + self.__batch_size]
+                loss = criterion(self.__head(embeddings[batch]), labels[batch])
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+            if (epoch + 1) % report_frequency == 0 or epoch == 0:
+                print(f'Epoch [{epoch + 1}/{self.__num_epochs}], Loss: {loss.item():.4f}')
+        self.__head.eval()
+        return loss
+
+    def __save_model(self, corpus_hash: str) -> None:
+        """
+        Saves the trained head with the ModelArtifact layout, with the encoder it was trained over.
+
+        Parameters:
+            corpus_hash (str): The hash of the patterns and labels the head was trained on.
+        """
+        manifest = {
+            "input_size": self.__encoder.hidden_size,
+            "hidden_size": self.__hidden_size,
+            "output_size": len(self.__intents),
+            "tags": self.__intents,
+            "extractor": "BERT",
+            "preprocessor": "None",
+            "remove_stopwords": "None",
+            "modeling_name": "FrozenBERT",
+            "num_epochs": self.__num_epochs,
+            "batch_size": self.__batch_size,
+            "learning_rate": self.__learning_rate,
+            "vector_size": None,
+            "window": None,
+            "temperature": self.__scorer.temperature,
+            "threshold": self.__scorer.threshold,
+            "base_model": self.__base_model,
+            "encoder_revision": self.__encoder.revision,
+            "corpus_hash": corpus_hash,
+        }
+        ModelArtifact.save(model_name=self.__model_name, model_state=self.__head.state_dict(), manifest=manifest,
+                           vocab=[])
+
+    def load_model(self) -> None:
+        """
+        Loads a trained head and the shared encoder it was trained over.
+
+        Raises:
+            ValueError: If the weights of the encoder differ from the ones the head was trained over.
+        """
+        data = ModelArtifact.load(model_name=self.__model_name, device=torch.device("cpu"))
+        self.__base_model = data["base_model"]
+        self.__hidden_size = data["hidden_size"]
+        self.__encoder = FrozenEncoder.get(self.__base_model)
+        if self.__encoder.revision != data["encoder_revision"]:
+            raise ValueError(f"The model {self.__model_name} was trained over the revision "
+                             f"{data['encoder_revision']} of {self.__base_model}, but the revision "
+                             f"{self.__encoder.revision} is installed. Train it again.")
+
+        self.__intents = data["tags"]
+        self.__head = Modeling.select_model(modeling_name="NeuralNet", input_size=data["input_size"],
+                                            hidden_size=data["hidden_size"], num_classes=data["output_size"],
+                                            device=torch.device("cpu"))
+        self.__head.load_state_dict(data["model_state"])
+        self.__head.eval()
+        self.__scorer = IntentScorer(tags=self.__intents, temperature=data.get("temperature", DEFAULT_TEMPERATURE),
+                                     threshold=data.get("threshold", DEFAULT_THRESHOLD))
+
+    def predict(self, text: str) -> str:
+        """
+        Predicts the intent of a text.
+
+        Parameters:
+            text (str): The text for which the intent is to be predicted.
+
+        Returns:
+            str: The predicted intent label, or an empty string if it is rejected by the threshold of the model.
+        """
+        return self.__scorer.predict(torch.from_numpy(self.predict_logits(texts=[text])))[0]
+
+    def predict_logits(self, texts: list, batch_size: int = 32) -> np.ndarray:
+        """
+        Computes the raw scores of every intent for several texts.
+
+        Parameters:
+            texts (list): The texts to score.
+            batch_size (int): The number of texts given to the encoder at once. Defaults to 32.
+
+        Returns:
+            np.ndarray: A matrix with one row of logits per text, in the order of the intents property.
+        """
+        embeddings = self.__encoder.encode(texts, batch_size=batch_size)
+        with torch.no_grad():
+            return self.__head(embeddings).numpy()
+
+    @property
+    def intents(self) -> list:
+        """
+        Accesses the intent labels, in the order of the outputs of the head.
+
+        Returns:
+            list: The intent labels.
+        """
+        return self.__intents
+
+    @property
+    def scorer(self) -> IntentScorer:
+        """
+        Accesses the calibrated scoring of the outputs of the head, set up by train or load_model.
+
+        Returns:
+            IntentScorer: The scorer of the model.
+        """
+        return self.__scorer
@@ -0,0 +1,192 @@
+import math
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_TEMPERATURE = 1.0
+# The calibration is opt-in: the patterns held out to fit the temperature are never learned by the saved model
+DEFAULT_CALIBRATION_SPLIT = 0.0
+
+
+class IntentScorer:
+    """
+    A class that turns the logits of an intent classifier into intents, shared by every model so the scores mean
+    the same whatever the model. The probabilities are calibrated by a temperature, fitted at training time on the
+    patterns held out of the training of the model when some are, which divides the logits before the softmax, and
+    the best intent of a sentence is rejected when its probability is not above the threshold of the model.
+
+    Attributes:
+        __tags (list): The intent of every output of the model.
+        __temperature (float): The temperature dividing the logits.
+        __threshold (float): The probability the best intent must exceed to be accepted.
+
+    Methods:
+        probabilities(logits): Computes the calibrated probabilities of every intent.
+        score(logits, k): Returns the accepted intent and the k most likely intents of every sentence.
+        predict(logits): Returns the accepted intent of every sentence.
+        predict_with_probability(logits): Returns the accepted intent of every sentence with its probability.
+        fit_temperature(logits, labels): Fits the temperature minimizing the negative log-likelihood.
+        split_calibration(labels, fraction, seed): Splits samples into training and calibration samples.
+    """
+
+    def __init__(self, tags: list, temperature: float = DEFAULT_TEMPERATURE, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Initializes the IntentScorer.
+
+        Parameters:
+            tags (list): The intent of every output of the model.
+            temperature (float): The temperature dividing the logits. Defaults to DEFAULT_TEMPERATURE.
+            threshold (float): The probability the best intent must exceed to be accepted. Defaults to
+                               DEFAULT_THRESHOLD.
+        """
+        self.__tags = tags
+        self.__temperature = temperature
+        self.__threshold = threshold
+
+    def probabilities(self, logits: torch.Tensor) -> torch.Tensor:
+        """
+        Computes the calibrated probabilities of every intent.
+
+        Parameters:
+            logits (torch.Tensor): The logits of the sentences, one row per sentence.
+
+        Returns:
+            torch.Tensor: The probabilities of the sentences, one row per sentence.
+        """
+        return torch.softmax(logits.float() / self.__temperature, dim=1)
+
+    def score(self, logits: torch.Tensor, k: int = 3) -> list:
+        """
+        Returns, for every sentence, the accepted intent and the k most likely intents, from the same logits.
+
+        Parameters:
+            logits (torch.Tensor): The logits of the sentences, one row per sentence.
+            k (int): The number of candidate intents to return. Defaults to 3.
+
+        Returns:
+            list: One dictionary per sentence, with the accepted "tag", empty if the best intent is rejected, and
+                  the "candidates", a list of (tag, probability) pairs from the most likely one.
+        """
+        probabilities, indices = torch.topk(self.probabilities(logits), k=min(k, len(self.__tags)), dim=1)
+        scores = []
+        for row_probabilities, row_indices in zip(probabilities.tolist(), indices.tolist()):
+            candidates = [(self.__tags[index], probability)
+                          for index, probability in zip(row_indices, row_probabilities)]
+            scores.append({"tag": candidates[0][0] if candidates[0][1] > self.__threshold else "",
+                           "candidates": candidates})
+        return scores
+
+    def predict(self, logits: torch.Tensor) -> list:
+        """
+        Returns the accepted intent of every sentence.
+
+        Parameters:
+            logits (torch.Tensor): The logits of the sentences, one row per sentence.
+
+        Returns:
+            list: The best intent of every sentence, or an empty string if it is rejected.
+        """
+        return [tag for tag, _ in self.predict_with_probability(logits)]
+
+    def predict_with_probability(self, logits: torch.Tensor) -> list:
+        """
+        Returns the accepted intent of every sentence with the probability of its best intent.
+
+        Parameters:
+            logits (torch.Tensor): The logits of the sentences, one row per sentence.
+
+        Returns:
+            list: A (tag, probability) pair per sentence, the tag being an empty string if the best intent is
+                  rejected.
+        """
+        probabilities, indices = torch.max(self.probabilities(logits), dim=1)
+        return [(self.__tags[index] if probability > self.__threshold else "", probability)
+                for probability, index in zip(probabilities.tolist(), indices.tolist())]
+
+    @staticmethod
+    def fit_temperature(logits: torch.Tensor, labels: torch.Tensor) -> float:
+        """
+        Fits the temperature minimizing the negative log-likelihood of the labels of held out samples.
+
+        Parameters:
+            logits (torch.Tensor): The logits of the held out samples, one row per sample.
+            labels (torch.Tensor): The index of the intent of every held out sample.
+
+        Returns:
+            float: The fitted temperature, or DEFAULT_TEMPERATURE if there is no held out sample.
+        """
+        if len(labels) == 0:
+            return DEFAULT_TEMPERATURE
+
+        logits = logits.detach().float()
+        labels = labels.long()
+        # The logarithm of the temperature is optimized, so the temperature stays positive
+        log_temperature = torch.zeros(1, requires_grad=True)
+        optimizer = torch.optim.LBFGS([log_temperature], lr=0.1, max_iter=100)
+
+        def closure() -> torch.Tensor:
+            optimizer.zero_grad()
+            loss = F.cross_entropy(logits / log_temperature.exp(), labels)
+            loss.backward()
+            return loss
+
+        optimizer.step(closure)
+        return float(log_temperature.exp().clamp(0.05, 20.0).item())
+
+    @staticmethod
+    def split_calibration(labels: list, fraction: float = DEFAULT_CALIBRATION_SPLIT, seed: int = 0) -> tuple:
+        """
+        Splits samples into training and calibration samples, holding out the same fraction of the samples of
+        every intent, rounded up so that every intent is calibrated. An intent always keeps at least one training
+        sample.
+
+        Parameters:
+            labels (list): The intent of every sample.
+            fraction (float): The fraction of the samples of every intent to hold out. Defaults to
+                              DEFAULT_CALIBRATION_SPLIT.
+            seed (int): The seed of the random split. Defaults to 0.
+
+        Returns:
+            tuple: The sorted indices of the training samples and of the calibration samples.
+        """
+        generator = np.random.default_rng(seed)
+        training, calibration = [], []
+        for label in dict.fromkeys(labels):
+            indices = [index for index, sample_label in enumerate(labels) if sample_label == label]
+            generator.shuffle(indices)
+            held_out = min(math.ceil(len(indices) * fraction), len(indices) - 1)
+            calibration.extend(indices[:held_out])
+            training.extend(indices[held_out:])
+        return sorted(training), sorted(calibration)
+
+    @property
+    def tags(self) -> list:
+        """
+        Accesses the intent of every output of the model.
+
+        Returns:
+            list: The intents.
+        """
+        return self.__tags
+
+    @property
+    def temperature(self) -> float:
+        """
+        Accesses the temperature dividing the logits.
+
+        Returns:
+            float: The temperature.
+        """
+        return self.__temperature
+
+    @property
+    def threshold(self) -> float:
+        """
+        Accesses the probability the best intent must exceed to be accepted.
+
+        Returns:
+            float: The threshold.
+        """
+        return self.__threshold
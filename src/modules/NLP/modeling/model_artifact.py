@@ -0,0 +1,235 @@
+import json
+import os
+
+import numpy as np
+import torch
+from safetensors.numpy import load_file as load_numpy_file, save_file as save_numpy_file
+from safetensors.torch import load_file as load_torch_file, save_file as save_torch_file
+
+from modules.NLP.features_extractor.tf_idf import TFIDF
+from utilities.path_finder import PathFinder
+
+FORMAT_VERSION = 1
+
+MANIFEST_FILE = "manifest.json"
+WEIGHTS_FILE = "model.safetensors"
+VOCAB_FILE = "vocab.txt"
+IDF_FILE = "idf.safetensors"
+ONNX_FILE = "model.onnx"
+CORPUS_FILE = "corpus.json"
+
+
+class ModelArtifact:
+    """
+    A class that saves and loads the NeuralNet models in a versioned directory layout which can be loaded without
+    unpickling anything:
+
+        ressources/models/<model_name>/
+            manifest.json       the training configuration, the tags and the format version
+            model.safetensors   the weights of the network, memory-mapped on load
+            vocab.txt           the vocabulary, one word per line
+            idf.safetensors     the inverse document frequencies, only for the TFIDF extractor
+            model.onnx          the optional ONNX export of the network, see OnnxExporter
+            corpus.json         the snapshot of the patterns the model was trained on, with their tokens and
+                                whether they were held out to fit the temperature, used by the IncrementalTrainer
+
+    The legacy .pth files, which pickle the state dict together with the vocabulary and the whole preprocessed
+    corpus, can be converted to this layout.
+
+    Methods:
+        exists(model_name): Checks if a model is saved with this layout.
+        list_models(): Lists the saved models, once each.
+        save(...): Saves a trained model with this layout.
+        load(model_name, device): Loads a model saved with this layout.
+        load_parameters(model_file): Reads the training configuration of any saved model.
+        convert(model_file): Converts a legacy .pth file to this layout.
+    """
+
+    @staticmethod
+    def get_path(model_name: str) -> str:
+        """
+        Returns the directory of a model saved with this layout.
+
+        Parameters:
+            model_name (str): The name of the model, with or without the legacy .pth extension.
+
+        Returns:
+            str: The path of the model directory.
+        """
+
+        return PathFinder.get_complet_path(f"ressources/models/{model_name.removesuffix('.pth')}")
+
+    @staticmethod
+    def exists(model_name: str) -> bool:
+        """
+        Checks if a model is saved with this layout.
+
+        Parameters:
+            model_name (str): The name of the model, with or without the legacy .pth extension.
+
+        Returns:
+            bool: True if the model directory contains a manifest, False otherwise.
+        """
+
+        return os.path.isfile(os.path.join(ModelArtifact.get_path(model_name), MANIFEST_FILE))
+
+    @staticmethod
+    def list_models() -> list:
+        """
+        Lists the models of ressources/models, once each: a legacy .pth file converted to this layout is listed as
+        its model directory only, and the files and directories which are not models are left out.
+
+        Returns:
+            list: The sorted file or directory name of every model, as expected by load_parameters.
+        """
+
+        directory = PathFinder.get_complet_path("ressources/models")
+        models = []
+        for entry in sorted(os.listdir(directory)):
+            path = os.path.join(directory, entry)
+            if os.path.isdir(path):
+                # A model saved with this layout, or a BERT model directory
+                if ModelArtifact.exists(entry) or os.path.isfile(os.path.join(path, "config.json")):
+                    models.append(entry)
+            elif entry.endswith(".pth") and not ModelArtifact.exists(entry):
+                models.append(entry)
+        return models
+
+    @staticmethod
+    def save(model_name: str, model_state: dict, manifest: dict, vocab: list, idf: np.ndarray = None,
+             corpus: list = None) -> str:
+        """
+        Saves a trained model with this layout.
+
+        Parameters:
+            model_name (str): The name of the model.
+            model_state (dict): The state dict of the network.
+            manifest (dict): The training configuration and the tags of the model.
+            vocab (list): The vocabulary used by the feature extractor.
+            idf (np.ndarray, optional): The inverse document frequencies used by the TFIDF extractor.
+            corpus (list, optional): The "tag", "pattern" and "tokens" of every pattern the model was trained on,
+                                     and whether it was "held_out" of the training to fit the temperature.
+
+        Returns:
+            str: The path of the model directory.
+        """
+
+        path = ModelArtifact.get_path(model_name)
+        os.makedirs(path, exist_ok=True)
+        # An ONNX export of the previous weights would be preferred to the new ones
+        if os.path.isfile(os.path.join(path, ONNX_FILE)):
+            os.remove(os.path.join(path, ONNX_FILE))
+
+        save_torch_file({name: tensor.contiguous() for name, tensor in model_state.items()},
+                        os.path.join(path, WEIGHTS_FILE))
+        with open(os.path.join(path, VOCAB_FILE), "w", encoding="utf-8") as file:
+            file.write("\n".join(vocab))
+        if idf is not None:
+            save_numpy_file({"idf": np.asarray(idf, dtype=np.float64)}, os.path.join(path, IDF_FILE))
+        if corpus is not None:
+            with open(os.path.join(path, CORPUS_FILE), "w", encoding="utf-8") as file:
+                json.dump(corpus, file, ensure_ascii=False)
+        with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as file:
+            json.dump({"format_version": FORMAT_VERSION, **manifest}, file, indent=4)
+        return path
+
+    @staticmethod
+    def load(model_name: str, device: torch.device) -> dict:
+        """
+        Loads a model saved with this layout.
+
+        Parameters:
+            model_name (str): The name of the model, with or without the legacy .pth extension.
+            device (torch.device): The device on which to load the weights.
+
+        Returns:
+            dict: The manifest entries, with the "model_state", "vocab", "idf" and "corpus" entries added, the last
+                  two being None when they were not saved.
+
+        Raises:
+            ValueError: If the model was saved with a newer format version.
+        """
+
+        path = ModelArtifact.get_path(model_name)
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as file:
+            data = json.load(file)
+        if data["format_version"] > FORMAT_VERSION:
+            raise ValueError(f"The model {model_name} uses the format version {data['format_version']}, "
+                             f"only the versions up to {FORMAT_VERSION} are supported.")
+
+        data["model_state"] = load_torch_file(os.path.join(path, WEIGHTS_FILE), device=str(device))
+        with open(os.path.join(path, VOCAB_FILE), "r", encoding="utf-8") as file:
+            vocab = file.read()
+        data["vocab"] = vocab.split("\n") if vocab else []
+        idf_path = os.path.join(path, IDF_FILE)
+        data["idf"] = load_numpy_file(idf_path)["idf"] if os.path.isfile(idf_path) else None
+        data["corpus"] = None
+        if os.path.isfile(os.path.join(path, CORPUS_FILE)):
+            with open(os.path.join(path, CORPUS_FILE), "r", encoding="utf-8") as file:
+                data["corpus"] = json.load(file)
+        return data
+
+    @staticmethod
+    def load_parameters(model_file: str) -> dict:
+        """
+        Reads the training configuration of a saved model, whatever the way it is saved: with this layout, as a
+        legacy .pth file or as a BERT model directory.
+
+        Parameters:
+            model_file (str): The file or directory name of the model in ressources/models.
+
+        Returns:
+            dict: The modeling, preprocessing, extractor, stopword, epochs, batch_size, learning_rate and
+                  hidden_size of the model.
+        """
+
+        if ModelArtifact.exists(model_file):
+            with open(os.path.join(ModelArtifact.get_path(model_file), MANIFEST_FILE), "r", encoding="utf-8") as file:
+                data = json.load(file)
+
+        elif model_file.endswith(".pth"):
+            data = torch.load(PathFinder.get_complet_path(f"ressources/models/{model_file}"), map_location="cpu")
+
+        else:
+            with open(PathFinder.get_complet_path(f"ressources/models/{model_file}/config.json"), "r") as file:
+                config = json.load(file)
+            return {
+                'modeling': config["model_type"],
+                'preprocessing': "None",
+                'extractor': "BERT",
+                'stopword': "None",
+                'epochs': config["num_epochs"],
+                'batch_size': config["batch_size"],
+                'learning_rate': config["learning_rate"],
+                'hidden_size': "None"
+            }
+
+        return {
+            'modeling': data["modeling_name"],
+            'preprocessing': data["preprocessor"],
+            'extractor': data["extractor"],
+            'stopword': data["remove_stopwords"],
+            'epochs': data["num_epochs"],
+            'batch_size': data["batch_size"],
+            'learning_rate': data["learning_rate"],
+            'hidden_size': data["hidden_size"]
+        }
+
+    @staticmethod
+    def convert(model_file: str) -> str:
+        """
+        Converts a legacy .pth file to this layout. The raw corpus is not kept: the inverse document frequencies it
+        was used for are computed once and saved instead.
+
+        Parameters:
+            model_file (str): The name of the legacy .pth file in ressources/models.
+
+        Returns:
+            str: The path of the new model directory.
+        """
+
+        data = torch.load(PathFinder.get_complet_path(f"ressources/models/{model_file}"), map_location="cpu")
+        idf = TFIDF.compute_idf(vocab=data["vocab"], docs=data["docs"]) if data["extractor"] == "TFIDF" else None
+        manifest = {key: value for key, value in data.items() if key not in ["model_state", "vocab", "docs"]}
+        return ModelArtifact.save(model_name=model_file, model_state=data["model_state"], manifest=manifest,
+                                  vocab=data["vocab"], idf=idf)
@@ -1,10 +1,12 @@
 from modules.NLP.modeling.neural_net import NeuralNet
+from modules.NLP.modeling.sparse_neural_net import SparseNeuralNet
 
 
 class Modeling:
 
     @staticmethod
-    def select_model(modeling_name: str, input_size: int, hidden_size: int, num_classes: int, device) -> NeuralNet :
+    def select_model(modeling_name: str, input_size: int, hidden_size: int, num_classes: int,
+                     device) -> NeuralNet | SparseNeuralNet:
         """
         Selects and initializes a neural network model based on the specified model name.
 
@@ -16,7 +18,11 @@ class Modeling:
             device: The device on which to initialize the model (e.g., "cpu" or "cuda").
 
         Returns:
-            NeuralNet : An instance of the selected neural network model.
+            NeuralNet | SparseNeuralNet : An instance of the selected neural network model.
         """
         if modeling_name == "NeuralNet":
-            return NeuralNet(input_size=input_size, hidden_size=hidden_size, num_classes=num_classes).to(device=device)
\ No newline at end of file
+            return NeuralNet(input_size=input_size, hidden_size=hidden_size, num_classes=num_classes).to(device=device)
+
+        elif modeling_name == "SparseNeuralNet":
+            return SparseNeuralNet(input_size=input_size, hidden_size=hidden_size,
+                                   num_classes=num_classes).to(device=device)
@@ -0,0 +1,202 @@
+import inspect
+import os
+import threading
+
+import numpy as np
+import torch
+from transformers import BertForSequenceClassification
+
+from modules.NLP.modeling.model_artifact import ModelArtifact, ONNX_FILE
+from modules.NLP.modeling.modeling import Modeling
+from utilities.runtime_config import RuntimeConfig
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+OPSET_VERSION = 17
+BERT_INPUTS = ["input_ids", "attention_mask", "token_type_ids"]
+# The TorchScript exporter is the default of the pinned torch, which has no dynamo argument; the releases which
+# added the argument later made the dynamo exporter the default, which needs the onnxscript package
+EXPORT_OPTIONS = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+
+
+class OnnxPredictor:
+    """
+    A class that runs an exported ONNX graph with onnxruntime, with all the graph optimizations enabled and the
+    thread counts of the serving pool of the RuntimeConfig, so that several predictors served side by side do not
+    oversubscribe the CPU.
+
+    The onnxruntime session is created on the first run, and again in a process forked from the one which created
+    it: the thread pools of a session do not exist in a forked process, and the thread counts are resolved in the
+    process which runs the graph, e.g. within the limit of a prefork worker.
+
+    Attributes:
+        __model_path (str): The directory of the model, holding the model.onnx graph.
+        __modeling_name (str): The type of model, whose serving settings give the thread counts.
+        __session (onnxruntime.InferenceSession): The session running the graph, or None until the first run.
+        __session_pid (int): The id of the process which created the session.
+        __input_names (list): The names of the inputs of the graph.
+        __lock (threading.Lock): The lock guarding the creation of the session.
+
+    Methods:
+        is_available(model_path): Checks if a model directory holds an ONNX graph which can be run.
+        run(**inputs): Runs the graph and returns its logits.
+    """
+
+    def __init__(self, model_path: str, modeling_name: str = None):
+        """
+        Initializes the OnnxPredictor of the graph of a model directory. The session is created on the first run.
+
+        Parameters:
+            model_path (str): The directory of the model, holding the model.onnx graph.
+            modeling_name (str): The type of model, e.g. "NeuralNet" or "BERT", whose serving settings give the
+                                 thread counts. Defaults to None, the settings of the serving pool.
+        """
+        self.__model_path = model_path
+        self.__modeling_name = modeling_name
+        self.__session = None
+        self.__session_pid = None
+        self.__input_names = []
+        self.__lock = threading.Lock()
+
+    def __get_session(self) -> "onnxruntime.InferenceSession":
+        """
+        Returns the session of the graph, creating it if this process did not yet.
+
+        Returns:
+            onnxruntime.InferenceSession: The session running the graph in this process.
+        """
+        if self.__session is not None and self.__session_pid == os.getpid():
+            return self.__session
+
+        with self.__lock:
+            if self.__session is None or self.__session_pid != os.getpid():
+                settings = RuntimeConfig.get("serving", self.__modeling_name)
+                options = onnxruntime.SessionOptions()
+                options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+                options.execution_mode = onnxruntime.ExecutionMode.ORT_SEQUENTIAL
+                options.intra_op_num_threads = settings["intra_op_threads"]
+                options.inter_op_num_threads = settings["inter_op_threads"]
+                session = onnxruntime.InferenceSession(os.path.join(self.__model_path, ONNX_FILE),
+                                                       sess_options=options, providers=["CPUExecutionProvider"])
+                self.__input_names = [graph_input.name for graph_input in session.get_inputs()]
+                self.__session_pid = os.getpid()
+                self.__session = session
+        return self.__session
+
+    @staticmethod
+    def is_available(model_path: str) -> bool:
+        """
+        Checks if a model directory holds an ONNX graph and if onnxruntime is installed to run it.
+
+        Parameters:
+            model_path (str): The directory of the model.
+
+        Returns:
+            bool: True if the graph can be run, False otherwise.
+        """
+        return onnxruntime is not None and os.path.isfile(os.path.join(model_path, ONNX_FILE))
+
+    def run(self, **inputs: np.ndarray) -> np.ndarray:
+        """
+        Runs the graph. The inputs the graph does not use are ignored, which lets the output of a tokenizer be given
+        as is.
+
+        Parameters:
+            **inputs (np.ndarray): The inputs of the graph, by name.
+
+        Returns:
+            np.ndarray: The logits computed by the graph, one row per sample.
+        """
+        session = self.__get_session()
+        return session.run(None, {name: inputs[name] for name in self.__input_names})[0]
+
+
+class OnnxExporter:
+    """
+    A class that exports the trained models to ONNX graphs, saved as model.onnx inside the model directory, with a
+    dynamic batch axis (and a dynamic sequence axis for BERT).
+
+    Methods:
+        export_model(model_file): Exports a model if the chatbot can run it with onnxruntime.
+        export_neural_net(model_file): Exports a NeuralNet model.
+        export_bert(model_name): Exports a BertForSequenceClassification model.
+    """
+
+    @staticmethod
+    def export_model(model_file: str) -> str | None:
+        """
+        Exports a model of ressources/models if the chatbot runs it with onnxruntime once exported: a NeuralNet or
+        SparseNeuralNet model, or a fine-tuned BERT model whose weights are present. The Retrieval and FrozenBERT
+        models are left out.
+
+        Parameters:
+            model_file (str): The file or directory name of the model in ressources/models.
+
+        Returns:
+            str | None: The path of the exported graph, or None if the model is not exported.
+        """
+        if ModelArtifact.exists(model_file) or model_file.endswith(".pth"):
+            if ModelArtifact.load_parameters(model_file)["modeling"] not in ["NeuralNet", "SparseNeuralNet"]:
+                return None
+            return OnnxExporter.export_neural_net(model_file=model_file)
+        if os.path.isfile(os.path.join(ModelArtifact.get_path(model_file), "model.safetensors")):
+            return OnnxExporter.export_bert(model_name=model_file)
+        return None
+
+    @staticmethod
+    def export_neural_net(model_file: str) -> str:
+        """
+        Exports a NeuralNet (or SparseNeuralNet) model as a dense NeuralNet graph taking the feature vectors of the
+        sentences. A legacy .pth model is converted to the ModelArtifact layout first, to get a directory to save
+        the graph in.
+
+        Parameters:
+            model_file (str): The name of the model in ressources/models.
+
+        Returns:
+            str: The path of the exported graph.
+        """
+        if not ModelArtifact.exists(model_file):
+            ModelArtifact.convert(model_file=model_file)
+        data = ModelArtifact.load(model_name=model_file, device=torch.device("cpu"))
+
+        model = Modeling.select_model(modeling_name="NeuralNet", input_size=data["input_size"],
+                                      hidden_size=data["hidden_size"], num_classes=data["output_size"],
+                                      device=torch.device("cpu"))
+        model.load_state_dict(data["model_state"])
+        model.eval()
+
+        onnx_path = os.path.join(ModelArtifact.get_path(model_file), ONNX_FILE)
+        torch.onnx.export(model, (torch.zeros(1, data["input_size"]),), onnx_path, input_names=["features"],
+                          output_names=["logits"], dynamic_axes={"features": {0: "batch"}, "logits": {0: "batch"}},
+                          opset_version=OPSET_VERSION, **EXPORT_OPTIONS)
+        return onnx_path
+
+    @staticmethod
+    def export_bert(model_name: str) -> str:
+        """
+        Exports a BertForSequenceClassification model saved in ressources/models, taking the output of its
+        tokenizer.
+
+        Parameters:
+            model_name (str): The name of the model directory in ressources/models.
+
+        Returns:
+            str: The path of the exported graph.
+        """
+        model_path = ModelArtifact.get_path(model_name)
+        model = BertForSequenceClassification.from_pretrained(model_path, local_files_only=True)
+        # Return a tuple, whose first element are the logits, rather than a ModelOutput which cannot be traced
+        model.config.return_dict = False
+        model.eval()
+
+        dummy_inputs = tuple(torch.ones(1, 8, dtype=torch.long) for _ in BERT_INPUTS)
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in BERT_INPUTS}
+        dynamic_axes["logits"] = {0: "batch"}
+        onnx_path = os.path.join(model_path, ONNX_FILE)
+        torch.onnx.export(model, dummy_inputs, onnx_path, input_names=BERT_INPUTS, output_names=["logits"],
+                          dynamic_axes=dynamic_axes, opset_version=OPSET_VERSION, **EXPORT_OPTIONS)
+        return onnx_path
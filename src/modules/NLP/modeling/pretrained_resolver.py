@@ -0,0 +1,75 @@
+import os
+
+from utilities.path_finder import PathFinder
+
+PRETRAINED_DIRECTORY = "ressources/pretrained"
+OFFLINE_FLAGS = ["HF_HUB_OFFLINE", "TRANSFORMERS_OFFLINE"]
+
+
+class PretrainedResolver:
+    """
+    A class that resolves the pretrained models of the Hugging Face hub to local directories, so that no model is
+    ever looked up on the network when it is loaded: the loading time does not depend on the network and an
+    air-gapped machine fails immediately with a clear error instead of stalling.
+
+    A pretrained model is looked for, in this order, as a directory path, as a snapshot saved in
+    ressources/pretrained/<name> by utilities/download_pretrained.py, and in the local cache of the hub.
+
+    Methods:
+        enable_offline_mode(): Forbids the Hugging Face libraries to access the network.
+        get_snapshot_path(name): Returns the directory of the ressources snapshot of a pretrained model.
+        resolve(name): Returns the local directory of a pretrained model.
+    """
+
+    @staticmethod
+    def enable_offline_mode() -> None:
+        """
+        Sets the offline flags of the Hugging Face libraries, unless they were explicitly set in the environment.
+        They are read when the libraries are imported, so this must be called first.
+        """
+        for flag in OFFLINE_FLAGS:
+            os.environ.setdefault(flag, "1")
+
+    @staticmethod
+    def get_snapshot_path(name: str) -> str:
+        """
+        Returns the directory of the ressources snapshot of a pretrained model, whether it exists or not.
+
+        Parameters:
+            name (str): The name of the model on the hub, e.g. "bert-base-uncased".
+
+        Returns:
+            str: The path of the snapshot directory.
+        """
+        return PathFinder.get_complet_path(f"{PRETRAINED_DIRECTORY}/{name.replace('/', '--')}")
+
+    @staticmethod
+    def resolve(name: str) -> str:
+        """
+        Returns the local directory of a pretrained model, without any network access.
+
+        Parameters:
+            name (str): A directory path or the name of the model on the hub, e.g. "bert-base-uncased".
+
+        Returns:
+            str: The directory holding the files of the model.
+
+        Raises:
+            FileNotFoundError: If the model is available nowhere locally.
+        """
+        if os.path.isdir(name):
+            return name
+
+        snapshot_path = PretrainedResolver.get_snapshot_path(name)
+        if os.path.isfile(os.path.join(snapshot_path, "config.json")):
+            return snapshot_path
+
+        # Imported here because the hub reads the offline flags when it is imported, see enable_offline_mode
+        from huggingface_hub import snapshot_download
+        try:
+            return snapshot_download(repo_id=name, local_files_only=True)
+        except (OSError, ValueError):
+            raise FileNotFoundError(
+                f"The pretrained model '{name}' is not available locally. Download it once, on a machine with network "
+                f"access, with 'python -m utilities.download_pretrained {name}', which saves it to "
+                f"{snapshot_path}.") from None
@@ -0,0 +1,352 @@
+import numpy as np
+import torch
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+DEFAULT_K = 5
+DEFAULT_MIN_SIMILARITY = 0.5
+# The exact search reads every vector at each query: beyond this number of values (patterns x dimensions) it
+# takes more than about a millisecond
+APPROXIMATE_MIN_VALUES = 3000000
+INITIAL_CAPACITY = 1024
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scales vectors to a unit L2 norm, so that their dot product is their cosine similarity. The null vectors, e.g.
+    the bag of words of a sentence without any known word, are left null.
+
+    Parameters:
+        vectors (np.ndarray): The vectors, one per row.
+
+    Returns:
+        np.ndarray: The normalized float32 vectors.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def reserve(array: np.ndarray, size: int, extra: int) -> np.ndarray:
+    """
+    Makes room for more rows at the end of an array whose first rows are used, doubling its capacity when it is
+    full, so that appending rows one by one is an amortized O(1) copy.
+
+    Parameters:
+        array (np.ndarray): The array, whose first `size` rows are used.
+        size (int): The number of rows used.
+        extra (int): The number of rows to append.
+
+    Returns:
+        np.ndarray: The array itself if it has room for the extra rows, otherwise a larger copy of its used rows.
+    """
+    if size + extra <= len(array):
+        return array
+    grown = np.zeros((max(2 * len(array), size + extra), *array.shape[1:]), dtype=array.dtype)
+    grown[:size] = array[:size]
+    return grown
+
+
+class ExactIndex:
+    """
+    An index of normalized vectors searched exhaustively with one matrix product, the fastest search for up to tens
+    of thousands of vectors. The vectors are kept in a matrix whose capacity doubles when it is full, so adding a
+    vector is an amortized O(1) copy.
+
+    Attributes:
+        __vectors (np.ndarray): The matrix of the vectors, whose first __size rows are used.
+        __size (int): The number of vectors in the index.
+
+    Methods:
+        add(vectors): Adds normalized vectors to the index.
+        search(queries, k): Returns the k most similar vectors of every query.
+        vectors: The vectors of the index, in the order they were added.
+    """
+
+    def __init__(self, dimension: int):
+        """
+        Initializes an empty ExactIndex.
+
+        Parameters:
+            dimension (int): The size of the vectors.
+        """
+        self.__vectors = np.zeros((INITIAL_CAPACITY, dimension), dtype=np.float32)
+        self.__size = 0
+
+    def add(self, vectors: np.ndarray) -> None:
+        """
+        Adds normalized vectors to the index.
+
+        Parameters:
+            vectors (np.ndarray): The normalized vectors, one per row.
+        """
+        self.__vectors = reserve(self.__vectors, size=self.__size, extra=len(vectors))
+        self.__vectors[self.__size:self.__size + len(vectors)] = vectors
+        self.__size += len(vectors)
+
+    def search(self, queries: np.ndarray, k: int) -> tuple:
+        """
+        Returns the k vectors of the index most similar to every query, from the most similar one.
+
+        Parameters:
+            queries (np.ndarray): The normalized queries, one per row.
+            k (int): The number of neighbours of every query.
+
+        Returns:
+            tuple: The cosine similarities and the positions in the index of the neighbours, one row per query.
+        """
+        k = min(k, self.__size)
+        similarities = queries @ self.__vectors[:self.__size].T
+        positions = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        neighbour_similarities = np.take_along_axis(similarities, positions, axis=1)
+        order = np.argsort(-neighbour_similarities, axis=1)
+        return np.take_along_axis(neighbour_similarities, order, axis=1), np.take_along_axis(positions, order, axis=1)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        Accesses the vectors of the index, in the order they were added.
+
+        Returns:
+            np.ndarray: The vectors, one per row.
+        """
+        return self.__vectors[:self.__size]
+
+
+class HnswIndex:
+    """
+    An approximate index of normalized vectors, a HNSW graph of hnswlib, whose search time grows with the logarithm
+    of the number of vectors rather than linearly. Adding a vector inserts it in the graph; the graph is resized by
+    doubling its capacity when it is full.
+
+    Attributes:
+        __index (hnswlib.Index): The HNSW graph, with the inner product as similarity.
+
+    Methods:
+        is_available(): Checks if hnswlib is installed.
+        add(vectors): Adds normalized vectors to the index.
+        search(queries, k): Returns the approximately k most similar vectors of every query.
+        vectors: The vectors of the index, in the order they were added.
+    """
+
+    def __init__(self, dimension: int, ef: int = 64):
+        """
+        Initializes an empty HnswIndex.
+
+        Parameters:
+            dimension (int): The size of the vectors.
+            ef (int): The size of the list of candidates explored by a search, trading speed for recall.
+                      Defaults to 64.
+        """
+        self.__index = hnswlib.Index(space="ip", dim=dimension)
+        self.__index.init_index(max_elements=INITIAL_CAPACITY, ef_construction=100, M=16)
+        self.__index.set_ef(ef)
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Checks if hnswlib is installed.
+
+        Returns:
+            bool: True if the approximate index can be used, False otherwise.
+        """
+        return hnswlib is not None
+
+    def add(self, vectors: np.ndarray) -> None:
+        """
+        Adds normalized vectors to the index.
+
+        Parameters:
+            vectors (np.ndarray): The normalized vectors, one per row.
+        """
+        size = self.__index.get_current_count()
+        if size + len(vectors) > self.__index.get_max_elements():
+            self.__index.resize_index(max(2 * self.__index.get_max_elements(), size + len(vectors)))
+        self.__index.add_items(vectors, np.arange(size, size + len(vectors)))
+
+    def search(self, queries: np.ndarray, k: int) -> tuple:
+        """
+        Returns the approximately k vectors of the index most similar to every query, from the most similar one.
+
+        Parameters:
+            queries (np.ndarray): The normalized queries, one per row.
+            k (int): The number of neighbours of every query.
+
+        Returns:
+            tuple: The cosine similarities and the positions in the index of the neighbours, one row per query.
+        """
+        positions, distances = self.__index.knn_query(queries, k=min(k, self.__index.get_current_count()))
+        # The "ip" distance of hnswlib is one minus the inner product
+        return 1.0 - distances, positions.astype(np.int64)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        Accesses the vectors of the index, in the order they were added.
+
+        Returns:
+            np.ndarray: The vectors, one per row.
+        """
+        return np.asarray(self.__index.get_items(range(self.__index.get_current_count())), dtype=np.float32)
+
+
+class RetrievalClassifier:
+    """
+    A training-free intent classifier: the normalized feature vectors of the patterns are kept in an index, and a
+    sentence is classified by a vote of its k most similar patterns, each one weighted by its cosine similarity.
+    The patterns less similar than a minimum similarity do not vote, so a sentence far from every pattern gets no
+    intent. Adding patterns, e.g. after an edit of intents.json, is an insertion in the index without any training.
+
+    The index is exact, a matrix product, up to APPROXIMATE_MIN_VALUES values (patterns x dimensions), and a HNSW
+    graph beyond when hnswlib is installed, so a query stays under a millisecond for tens of thousands of patterns.
+
+    Attributes:
+        __tags (list): The intents, whose positions are the labels of the patterns.
+        __k (int): The number of patterns voting for the intent of a sentence.
+        __min_similarity (float): The cosine similarity a pattern must reach to vote.
+        __labels (np.ndarray): The labels of the patterns, whose first __size entries are used.
+        __index (ExactIndex | HnswIndex): The index of the vectors of the patterns.
+        __size (int): The number of patterns.
+
+    Methods:
+        add(vectors, labels): Adds patterns to the index.
+        vote(features): Computes the share of the vote of every intent for several sentences.
+        logits(features): Computes scores whose softmax is the share of the vote of every intent.
+    """
+
+    def __init__(self, tags: list, k: int = DEFAULT_K, min_similarity: float = DEFAULT_MIN_SIMILARITY):
+        """
+        Initializes an empty RetrievalClassifier.
+
+        Parameters:
+            tags (list): The intents, whose positions are the labels of the patterns.
+            k (int): The number of patterns voting for the intent of a sentence. Defaults to DEFAULT_K.
+            min_similarity (float): The cosine similarity a pattern must reach to vote. Defaults to
+                                    DEFAULT_MIN_SIMILARITY.
+        """
+        self.__tags = list(tags)
+        self.__k = k
+        self.__min_similarity = min_similarity
+        self.__labels = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self.__index = None
+        self.__size = 0
+
+    def add(self, vectors: np.ndarray, labels: np.ndarray) -> None:
+        """
+        Adds patterns to the index. The index switches from exact to approximate once it holds
+        APPROXIMATE_MIN_VALUES values, if hnswlib is installed.
+
+        Parameters:
+            vectors (np.ndarray): The feature vectors of the patterns, one per row, normalized by the classifier.
+            labels (np.ndarray): The position in the tags of the intent of every pattern.
+        """
+        if len(vectors) == 0:
+            return
+
+        vectors = normalize(vectors)
+        self.__labels = reserve(self.__labels, size=self.__size, extra=len(vectors))
+        self.__labels[self.__size:self.__size + len(vectors)] = labels
+        self.__size += len(vectors)
+
+        if self.__index is None:
+            self.__index = ExactIndex(vectors.shape[1])
+        if isinstance(self.__index, ExactIndex) and self.__size * vectors.shape[1] >= APPROXIMATE_MIN_VALUES \
+                and HnswIndex.is_available():
+            # The patterns indexed so far are moved to the approximate index, once
+            index = HnswIndex(vectors.shape[1])
+            index.add(self.__index.vectors)
+            self.__index = index
+        self.__index.add(vectors)
+
+    def vote(self, features: np.ndarray) -> np.ndarray:
+        """
+        Computes the share of the vote of every intent for several sentences: the sum of the similarities of the
+        neighbours of the sentence labelled with the intent, divided by the sum of the similarities of all its
+        voting neighbours.
+
+        Parameters:
+            features (np.ndarray): The feature vectors of the sentences, one per row.
+
+        Returns:
+            np.ndarray: A matrix with one row per sentence and one column per intent, whose rows sum to one, or are
+                        null when no pattern is similar enough to the sentence.
+        """
+        votes = np.zeros((len(features), len(self.__tags)), dtype=np.float32)
+        if self.__size == 0 or len(features) == 0:
+            return votes
+
+        similarities, positions = self.__index.search(normalize(features), k=self.__k)
+        weights = np.where(similarities >= self.__min_similarity, similarities, 0.0).astype(np.float32)
+        labels = self.labels[positions]
+        np.add.at(votes, (np.repeat(np.arange(len(features)), labels.shape[1]), labels.ravel()), weights.ravel())
+        totals = votes.sum(axis=1, keepdims=True)
+        return np.divide(votes, totals, out=votes, where=totals > 0)
+
+    def logits(self, features: np.ndarray) -> torch.Tensor:
+        """
+        Computes scores whose softmax, with a temperature of one, is the share of the vote of every intent, so that
+        the classifier is scored by an IntentScorer as any other model. A sentence no pattern votes for gets equal
+        scores for every intent.
+
+        Parameters:
+            features (np.ndarray): The feature vectors of the sentences, one per row.
+
+        Returns:
+            torch.Tensor: A matrix with one row of scores per sentence, in the order of the tags.
+        """
+        return torch.from_numpy(np.log(self.vote(features) + 1e-9))
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """
+        Accesses the normalized vectors of the patterns, in the order they were added.
+
+        Returns:
+            np.ndarray: The vectors, one per row.
+        """
+        if self.__index is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self.__index.vectors
+
+    @property
+    def labels(self) -> np.ndarray:
+        """
+        Accesses the labels of the patterns, in the order they were added.
+
+        Returns:
+            np.ndarray: The position in the tags of the intent of every pattern.
+        """
+        return self.__labels[:self.__size]
+
+    @property
+    def tags(self) -> list:
+        """
+        Accesses the intents, whose positions are the labels of the patterns.
+
+        Returns:
+            list: The intents.
+        """
+        return self.__tags
+
+    @property
+    def k(self) -> int:
+        """
+        Accesses the number of patterns voting for the intent of a sentence.
+
+        Returns:
+            int: The number of voting patterns.
+        """
+        return self.__k
+
+    @property
+    def min_similarity(self) -> float:
+        """
+        Accesses the cosine similarity a pattern must reach to vote.
+
+        Returns:
+            float: The minimum similarity.
+        """
+        return self.__min_similarity
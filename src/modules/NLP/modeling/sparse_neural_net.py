@@ -0,0 +1,121 @@
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+
+
+class SparseLinear(nn.Module):
+    """
+    A linear layer whose input is given in sparse form, as the indices and the values of the nonzero features of
+    each sample. The product with the weight matrix is computed with an embedding bag summing the weight rows of the
+    nonzero features, so its cost depends on the number of nonzero features rather than on the input size.
+
+    The weight is stored transposed, one row per input feature, but it is saved and loaded with the layout of
+    nn.Linear, so the state dicts of both layers are interchangeable.
+
+    Attributes:
+        weight (nn.Parameter): The weight matrix, of shape (in_features, out_features).
+        bias (nn.Parameter): The bias vector, of shape (out_features).
+
+    Methods:
+        forward(indices, offsets, weights): Computes the output of the layer for a batch of sparse samples.
+    """
+
+    def __init__(self, in_features: int, out_features: int):
+        """
+        Initializes the SparseLinear layer with the same initialization as nn.Linear.
+
+        Parameters:
+            in_features (int): The number of input features, i.e. the size of the vocabulary.
+            out_features (int): The number of output features.
+        """
+        super(SparseLinear, self).__init__()
+        linear = nn.Linear(in_features, out_features)
+        self.weight = nn.Parameter(linear.weight.detach().t().contiguous())
+        self.bias = nn.Parameter(linear.bias.detach().clone())
+
+    def forward(self, indices: torch.Tensor, offsets: torch.Tensor, weights: torch.Tensor = None) -> torch.Tensor:
+        """
+        Computes the output of the layer for a batch of sparse samples.
+
+        Parameters:
+            indices (torch.Tensor): The indices of the nonzero features of all the samples, concatenated.
+            offsets (torch.Tensor): The position in indices where each sample starts.
+            weights (torch.Tensor, optional): The values of the nonzero features, 1 for each of them if omitted.
+
+        Returns:
+            torch.Tensor: The output tensor, of shape (number of samples, out_features).
+        """
+        return F.embedding_bag(indices, self.weight, offsets, mode="sum", per_sample_weights=weights) + self.bias
+
+    def _save_to_state_dict(self, destination, prefix, keep_vars):
+        super(SparseLinear, self)._save_to_state_dict(destination, prefix, keep_vars)
+        destination[prefix + "weight"] = destination[prefix + "weight"].t()
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        if prefix + "weight" in state_dict:
+            state_dict[prefix + "weight"] = state_dict[prefix + "weight"].t()
+        super(SparseLinear, self)._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+
+class SparseNeuralNet(nn.Module):
+    """
+    The NeuralNet feedforward network with a first layer consuming sparse features. It is meant for the BagOfWords
+    and TFIDF extractors, whose vectors only have a few nonzero entries: the dense vector of the size of the
+    vocabulary is never built, neither for training nor for inference. Its state dict has the same layout as the
+    one of NeuralNet, so the weights of a trained NeuralNet can be loaded as is and give the same predictions.
+
+    Attributes:
+        l1 (SparseLinear): The first linear layer, consuming the sparse features.
+        l2 (nn.Linear): The second linear layer.
+        l3 (nn.Linear): The third linear layer which outputs the logits for each class.
+        relu (nn.ReLU): The ReLU activation function used between layers.
+
+    Methods:
+        forward(indices, offsets, weights): Defines the forward pass of the model.
+        modeling_name(): Provides the name of the model configuration.
+    """
+
+    def __init__(self, input_size: int = None, hidden_size: int = None, num_classes: int = None):
+        """
+        Initializes the SparseNeuralNet model with specified sizes for input, hidden, and output layers.
+
+        Parameters:
+            input_size (int, optional): The number of input features. Defaults to None.
+            hidden_size (int, optional): The number of features in the hidden layers. Defaults to None.
+            num_classes (int, optional): The number of classes for the output layer. Defaults to None.
+        """
+        super(SparseNeuralNet, self).__init__()
+        self.l1 = SparseLinear(input_size, hidden_size)
+        self.l2 = nn.Linear(hidden_size, hidden_size)
+        self.l3 = nn.Linear(hidden_size, num_classes)
+        self.relu = nn.ReLU()
+
+    def forward(self, indices: torch.Tensor, offsets: torch.Tensor, weights: torch.Tensor = None) -> torch.Tensor:
+        """
+        Performs a forward pass through the network with ReLU activations after each of the first two linear layers.
+
+        Parameters:
+            indices (torch.Tensor): The indices of the nonzero features of all the samples, concatenated.
+            offsets (torch.Tensor): The position in indices where each sample starts.
+            weights (torch.Tensor, optional): The values of the nonzero features.
+
+        Returns:
+            torch.Tensor: The output tensor containing logits for each class before the softmax activation.
+        """
+        out = self.l1(indices, offsets, weights)
+        out = self.relu(out)
+        out = self.l2(out)
+        out = self.relu(out)
+        out = self.l3(out)
+        # no activation and no softmax at the end
+        return out
+
+    @property
+    def modeling_name(self) -> str:
+        """
+        Provides the name of the model configuration, which can be useful for dynamic model loading or logging.
+
+        Returns:
+            str: The name of the model, "SparseNeuralNet".
+        """
+        return "SparseNeuralNet"
@@ -1,5 +1,5 @@
 import nltk
-from nltk import pos_tag
+from nltk import pos_tag, pos_tag_sents
 from nltk.corpus import wordnet
 from nltk.stem import WordNetLemmatizer
 
@@ -18,6 +18,7 @@ class Lemmatizer:
 
     Methods:
         preprocess_text(tokens): Lemmatizes a list of tokens based on their part-of-speech tags.
+        preprocess_corpus(token_lists): Lemmatizes several lists of tokens at once.
         preprocessor_name: Returns the name of the preprocessor as 'Lemmatizer'.
     """
 
@@ -62,6 +63,31 @@ class Lemmatizer:
         lemmatized_words = [self.__lemmatizer.lemmatize(word, self.__get_wordnet_pos(tag)) for word, tag in pos_tags]
         return lemmatized_words
 
+    def preprocess_corpus(self, token_lists: list) -> list:
+        """
+        Lemmatizes several lists of tokens at once, giving the same lemmas as preprocess_text on each list. The
+        lists are tagged by a single pos_tag_sents call, which loads the tagger once, and each distinct
+        (word, part-of-speech) pair is lemmatized only once.
+
+        Parameters:
+            token_lists (list): The lists of word tokens to be lemmatized, one per sentence.
+
+        Returns:
+            list: The lists of lemmatized word tokens, in the order of token_lists.
+        """
+        lemmas = {}
+        lemmatized_lists = []
+        for tagged_tokens in pos_tag_sents(token_lists):
+            lemmatized_words = []
+            for word, tag in tagged_tokens:
+                pair = (word, self.__get_wordnet_pos(tag))
+                lemma = lemmas.get(pair)
+                if lemma is None:
+                    lemma = lemmas[pair] = self.__lemmatizer.lemmatize(*pair)
+                lemmatized_words.append(lemma)
+            lemmatized_lists.append(lemmatized_words)
+        return lemmatized_lists
+
     @property
     def preprocessor_name(self) -> str:
         """
@@ -1,6 +1,15 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
 from modules.NLP.preprocessing.lemmatizer import Lemmatizer
 from modules.NLP.preprocessing.stemmer import Stemmer
 from modules.NLP.preprocessing.tokenizer import Tokenizer
+from utilities.tracing import Tracer
+
+# Below this number of texts, starting the processes of a pool costs more than it saves
+PARALLEL_MIN_TEXTS = 5000
 
 
 class Preprocessor:
@@ -17,6 +26,7 @@ class Preprocessor:
 
     Methods:
         preprocess_text(text): Processes the input text using the selected preprocessing method and tokenizer.
+        preprocess_corpus(texts, processes): Processes several texts at once, optionally in a pool of processes.
         preprocessor_name: Property that returns the name of the current preprocessor.
         remove_stopwords: Property that indicates whether stopwords are removed during tokenization.
     """
@@ -44,8 +54,37 @@ class Preprocessor:
         Returns:
             list: A list of processed tokens from the input text.
         """
-        tokens = self.__tokinizer.tokenize_and_filter_sentence(text)  # Tokenize and convert to lowercase
-        return self.__preprocessor.preprocess_text(tokens)
+        with Tracer.span("preprocessing"):
+            tokens = self.__tokinizer.tokenize_and_filter_sentence(text)  # Tokenize and convert to lowercase
+            return self.__preprocessor.preprocess_text(tokens)
+
+    def preprocess_corpus(self, texts: list, processes: int = None) -> list:
+        """
+        Processes several texts at once, giving the same tokens as preprocess_text on each text. The texts are
+        tokenized, then given together to the preprocessing method, which tags and lemmatizes (or stems) each
+        distinct token only once. A corpus of at least PARALLEL_MIN_TEXTS texts can also be split between a pool
+        of processes.
+
+        Parameters:
+            texts (list): The texts to be preprocessed.
+            processes (int, optional): The number of processes to split a large corpus between. Defaults to None,
+                                       which processes the corpus in the current process.
+
+        Returns:
+            list: The lists of processed tokens, in the order of texts.
+        """
+        if processes is not None and processes > 1 and len(texts) >= PARALLEL_MIN_TEXTS:
+            chunk_size = math.ceil(len(texts) / processes)
+            chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+                results = executor.map(_preprocess_chunk, repeat(self.__preprocessor_name),
+                                       repeat(self.__remove_stopwords), chunks)
+                return [tokens for chunk_tokens in results for tokens in chunk_tokens]
+
+        with Tracer.span("preprocessing"):
+            token_lists = [self.__tokinizer.tokenize_and_filter_sentence(text) for text in texts]
+            return self.__preprocessor.preprocess_corpus(token_lists)
 
     def __select_preprocessor(self, preprocessor_name) -> Stemmer | Lemmatizer:
         """
@@ -81,3 +120,11 @@ class Preprocessor:
             bool: True if stopwords are removed, False otherwise.
         """
         return self.__remove_stopwords
+
+
+def _preprocess_chunk(preprocessor_name: str, remove_stopwords: bool, texts: list) -> list:
+    """
+    Processes a chunk of texts in a process of the pool of Preprocessor.preprocess_corpus.
+    """
+    return Preprocessor(preprocessor_name=preprocessor_name,
+                        remove_stopwords=remove_stopwords).preprocess_corpus(texts=texts)
@@ -1,5 +1,8 @@
 import re
 
+from utilities.tracing import Tracer
+
+
 def segment_sentences(user_input: str) -> dict:
     """
     Segments a string of user input into sentences, considering typical end-of-sentence punctuation,
@@ -18,11 +21,13 @@ def segment_sentences(user_input: str) -> dict:
               - 'code': The code block extracted from the input (if any).
               - 'user_input': A list of sentences segmented from the input, excluding the code block.
     """
-    pattern = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|!|\n)\s|\n+')
-    segmented_sentences = __extract_language_and_code(user_input=user_input)
-    segmented_sentences["user_input"] = pattern.split(string=segmented_sentences["user_input"])
-    segmented_sentences["user_input"] = [segment for segment in segmented_sentences["user_input"] if segment != '']
-    return segmented_sentences
+    with Tracer.span("segmentation"):
+        pattern = re.compile(r'(?<!\w\.\w.)(?<![A-Z][a-z]\.)(?<=\.|\?|!|\n)\s|\n+')
+        segmented_sentences = __extract_language_and_code(user_input=user_input)
+        segmented_sentences["user_input"] = pattern.split(string=segmented_sentences["user_input"])
+        segmented_sentences["user_input"] = [segment for segment in segmented_sentences["user_input"]
+                                             if segment != '']
+        return segmented_sentences
 
 def __extract_language_and_code(user_input: str) -> dict:
     """
@@ -21,6 +21,7 @@ class Stemmer:
 
     Methods:
         preprocess_text(tokens): Processes a list of word tokens and applies stemming to each token.
+        preprocess_corpus(token_lists): Applies stemming to several lists of tokens at once.
     """
     def __init__(self):
         """
@@ -69,6 +70,28 @@ class Stemmer:
             stem_sentence.append(self.__stem_word(word=word))
         return stem_sentence
 
+    def preprocess_corpus(self, token_lists: list) -> list:
+        """
+        Applies stemming to several lists of word tokens at once, stemming each distinct word only once.
+
+        Parameters:
+            token_lists (list): The lists of word tokens to be stemmed, one per sentence.
+
+        Returns:
+            list: The lists of stemmed word tokens, in the order of token_lists.
+        """
+        stems = {}
+        stem_sentences = []
+        for tokens in token_lists:
+            stem_sentence = []
+            for word in tokens:
+                stem = stems.get(word)
+                if stem is None:
+                    stem = stems[word] = self.__stem_word(word=word)
+                stem_sentence.append(stem)
+            stem_sentences.append(stem_sentence)
+        return stem_sentences
+
     def __stem_word(self, word: str) -> str:
         """
         Stem a single word through sequential application of stemming rules from steps 1 to 5.
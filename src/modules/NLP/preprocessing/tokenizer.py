@@ -1,7 +1,4 @@
-import re
-import string
-
-from utilities.path_finder import PathFinder
+from modules.NLP.preprocessing.tokenizer_resources import load_stop_words, PUNCTUATION_TABLE, TOKEN_PATTERN
 
 
 class Tokenizer:
@@ -9,7 +6,8 @@ class Tokenizer:
     A tokenizer class that processes and tokenizes input sentences.
 
     This class provides functionality to tokenize sentences into words, optionally excluding
-    stopwords, and removing punctuation from the input sentence.
+    stopwords, and removing punctuation from the input sentence. The stop words, the token pattern
+    and the punctuation table are shared by all the tokenizers of the process.
     """
 
     def __init__(self, remove_stopwords: bool = True):
@@ -21,7 +19,7 @@ class Tokenizer:
                                       Defaults to True.
         """
 
-        self.__stop_words = self.__load_stop_words()
+        self.__stop_words = load_stop_words()
         self.__remove_stopwords = remove_stopwords
 
     def tokenize_and_filter_sentence(self, sentence: str) -> list:
@@ -29,7 +27,7 @@ class Tokenizer:
         Tokenizes the input sentence and filters it according to the instance's configuration.
 
         This method removes punctuation from the input sentence, tokenizes it, and optionally
-        removes stopwords from the list of tokens.
+        removes stopwords from the list of tokens, in a single expression over the shared resources.
 
         Parameters:
             sentence (str): The sentence to tokenize and filter.
@@ -38,30 +36,12 @@ class Tokenizer:
             list: A list of tokens derived from the input sentence.
         """
 
-        sentence = self.__remove_punctuation(sentence=sentence)
-        tokens = self.__tokenize(sentence=sentence)
+        tokens = TOKEN_PATTERN.findall(sentence.translate(PUNCTUATION_TABLE).lower())
         if(self.__remove_stopwords):
-            tokens = self.__remove_stop_words(tokens=tokens)
+            stop_words = self.__stop_words
+            return [token for token in tokens if token not in stop_words]
         return tokens
 
-    def __load_stop_words(self) -> set:
-        """
-        Loads and returns a set of stopwords.
-
-        This method reads stopwords from a specified file and returns them as a set.
-
-        Returns:
-            set: A set of stopwords.
-        """
-
-        stop_words = set()
-        file_path = PathFinder().get_complet_path(path_to_file="ressources/stop_words/english.txt")
-
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                stop_words.add(line.strip())
-        return stop_words
-
     def __tokenize(self, sentence: str) -> list:
         """
         Tokenizes the input sentence into a list of words.
@@ -75,9 +55,7 @@ class Tokenizer:
             list: A list of tokens found in the input sentence.
         """
 
-        pattern = r'\w+|\$[\d\.]+|\S+'
-        tokens = re.findall(pattern, sentence.lower())
-        return tokens
+        return TOKEN_PATTERN.findall(sentence.lower())
 
     def __remove_stop_words(self, tokens: list) -> list:
         """
@@ -104,5 +82,4 @@ class Tokenizer:
             str: The input sentence with punctuation removed.
         """
 
-        translator = str.maketrans('', '', string.punctuation)
-        return sentence.translate(translator)
+        return sentence.translate(PUNCTUATION_TABLE)
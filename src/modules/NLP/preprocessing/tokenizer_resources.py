@@ -0,0 +1,28 @@
+import re
+import string
+from functools import lru_cache
+
+from utilities.path_finder import PathFinder
+
+STOP_WORDS_FILE = "ressources/stop_words/english.txt"
+
+# Compiled once for the process, rather than looked up in the cache of re at every sentence
+TOKEN_PATTERN = re.compile(r'\w+|\$[\d\.]+|\S+')
+PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+
+
+@lru_cache(maxsize=None)
+def load_stop_words(path_to_file: str = STOP_WORDS_FILE) -> frozenset:
+    """
+    Loads a stop words file, one word per line. The file is read once per process: the immutable set returned is
+    shared by every Tokenizer.
+
+    Parameters:
+        path_to_file (str): The stop words file, relative to the project. Defaults to STOP_WORDS_FILE.
+
+    Returns:
+        frozenset: The stop words.
+    """
+
+    with open(PathFinder.get_complet_path(path_to_file=path_to_file), 'r', encoding='utf-8') as file:
+        return frozenset(line.strip() for line in file)
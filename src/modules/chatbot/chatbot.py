@@ -1,3 +1,4 @@
+import itertools
 import json
 import os
 
@@ -7,10 +8,20 @@ import importlib
 
 from modules.NLP.features_extractor.extractor import Extractor
 from modules.NLP.modeling.BERT import BertIntentClassifier
+from modules.NLP.modeling.frozen_bert import FrozenBertClassifier, FrozenEncoder
+from modules.NLP.modeling.intent_scorer import IntentScorer, DEFAULT_TEMPERATURE, DEFAULT_THRESHOLD
+from modules.NLP.modeling.model_artifact import ModelArtifact
 from modules.NLP.modeling.modeling import Modeling
+from modules.NLP.modeling.onnx_backend import OnnxPredictor
+from modules.NLP.modeling.retrieval_classifier import RetrievalClassifier
+from modules.NLP.modeling.sparse_neural_net import SparseNeuralNet
 from modules.NLP.preprocessing.preprocessor import Preprocessor
 from modules.NLP.preprocessing.sentence_segmenter import segment_sentences
+from modules.chatbot.pattern_lookup import PatternLookup
+from modules.chatbot.prediction_cache import PredictionCache, DEFAULT_CACHE_SIZE
 from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
+from utilities.tracing import Tracer
 
 
 class ChatBot:
@@ -20,25 +31,53 @@ class ChatBot:
 
     Attributes:
         __extractor (Extractor): The feature extraction mechanism used to convert text input into a format suitable for the model.
+        __encoder (FrozenEncoder): The frozen BERT encoder used instead of the extractor by a Retrieval model over
+        BERT embeddings.
         __model (Modeling): The neural network model that predicts the category of the input.
         __device (torch.device): The computation device (CPU or GPU) on which the model is loaded.
+        __scorer (IntentScorer): The calibrated scoring of the outputs of the model.
         __intents_data (dict): A dictionary storing the responses and functionalities associated with each intent.
+        __intents_content (dict): The content of the intents file, whose patterns are looked up.
+        __pattern_lookup (bool): Whether the sentences which are copies of a pattern are looked up.
+        __lookup (PatternLookup): The intent of the patterns of the intents file, found without the model, or None
+        when the lookup is disabled. It is built again for every model loaded.
+        __added_patterns (list): The (tag, patterns) pairs added to the loaded Retrieval model, looked up too.
+        __cache (PredictionCache): The predictions of the model by preprocessed tokens, or None when the cache is
+        disabled.
+        __model_id (tuple): The identifier of the loaded model in the keys of the cache, unique to every load.
+        __model_file (str): The name of the loaded model.
     """
 
-    def __init__(self, model_file: str):
+    __load_counter = itertools.count()
+
+    def __init__(self, model_file: str, pattern_lookup: bool = True, cache_size: int = DEFAULT_CACHE_SIZE):
         """
         Initializes the chatbot with a pre-trained model and loads the intents configuration.
 
         Parameters:
             model_file (str): The path to the pre-trained model file.
+            pattern_lookup (bool): Whether the sentences which are copies of a pattern of the intents file get its
+                                   intent without running the model. Defaults to True; the evaluation of a model
+                                   disables it to score the model itself.
+            cache_size (int): The number of predictions kept by the LRU cache of the chatbot, 0 to disable it.
+                              Defaults to DEFAULT_CACHE_SIZE; the evaluation of a model disables it too.
         """
         self.__extractor = None
+        self.__encoder = None
         self.__model = None
         self.__intents_data = dict()
         self.__device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.__modeling_name = None
-        self.load_essential(model_file)
+        self.__scorer = None
+        self.__intents_content = None
+        self.__pattern_lookup = pattern_lookup
+        self.__lookup = None
+        self.__added_patterns = []
+        self.__cache = PredictionCache(max_size=cache_size) if cache_size > 0 else None
+        self.__model_id = None
+        self.__model_file = None
         self.__load_intents()
+        self.load_essential(model_file)
 
     def __load_intents(self) -> None:
         """
@@ -56,39 +95,124 @@ class ChatBot:
                     "class": intent["class"],
                     "parameters": intent["parameters"]
                 }
+        self.__intents_content = data
+
+    def __build_lookup(self) -> None:
+        """
+        Builds the lookup table of the patterns of the intents known to the loaded model, and of the patterns added
+        to it, with its preprocessor, when the lookup is enabled.
+        """
+        if not self.__pattern_lookup:
+            return
+        intents = self.__intents_content["intents"] + [{"tag": tag, "patterns": patterns}
+                                                       for tag, patterns in self.__added_patterns]
+        self.__lookup = PatternLookup(intents_data={"intents": intents}, tags=self.__scorer.tags,
+                                      preprocessor=self.__extractor.preprocessor if self.__extractor else None)
 
     def load_essential(self, model_file: str) -> None:
         """
          Loads a pre-trained model along with its configuration and necessary data for feature extraction.
+         A model saved with the ModelArtifact layout is preferred to the legacy .pth file of the same name.
+         A NeuralNet fed by the BagOfWords or TFIDF extractor is loaded as a SparseNeuralNet, which shares its
+         weights layout and gives the same predictions without building the dense feature vector.
+         When the model directory holds an ONNX export and onnxruntime is installed, the network is run with
+         onnxruntime instead of PyTorch. The temperature and the threshold of the model, saved at training time,
+         set up its IntentScorer. A FrozenBERT model is a head over a frozen pretrained encoder, shared with the
+         other models of the process. A Retrieval model indexes the saved vectors of the patterns again, and one over
+         BERT embeddings is refused when the installed encoder differs from the one its patterns were encoded with.
+         The predictions cached for the previous model are forgotten, and the pattern lookup is built again for the
+         intents and the preprocessor of the new model.
 
          Parameters:
              model_file (str): The name of the file containing the trained model and its metadata.
+
+         Raises:
+             ValueError: If a model over BERT embeddings was built over another revision of the encoder.
          """
 
+        # A prediction of the previous model stored after the reload is keyed on its own identifier, never read
+        self.__model_id = (model_file, next(ChatBot.__load_counter))
+        self.__model_file = model_file
+        if self.__cache is not None:
+            self.__cache.clear()
+        # The lookup of the previous model would give its intents, and its tokens to the new extractor
+        self.__lookup = None
+        self.__extractor = None
+        self.__encoder = None
+        self.__added_patterns = []
+        self.__load_model(model_file)
+        self.__build_lookup()
+
+    def __load_model(self, model_file: str) -> None:
+        """
+        Loads the model, its scorer and its extractor or encoder, see load_essential.
+
+        Parameters:
+            model_file (str): The name of the file containing the trained model and its metadata.
+
+        Raises:
+            ValueError: If a model over BERT embeddings was built over another revision of the encoder.
+        """
+
         path_file = PathFinder.get_complet_path("ressources/models/" + model_file)
 
-        if os.path.isdir(path_file):
+        if ModelArtifact.exists(model_file):
+            data = ModelArtifact.load(model_name=model_file, device=self.__device)
+            if data["modeling_name"] == "FrozenBERT":
+                self.__modeling_name = "FrozenBERT"
+                self.__model = FrozenBertClassifier(model_name=model_file)
+                self.__model.load_model()
+                self.__scorer = self.__model.scorer
+                return
+
+        elif os.path.isdir(path_file):
             self.__modeling_name = "BERT"
             self.__model = BertIntentClassifier(model_name=model_file)
             self.__model.load_model()
+            self.__scorer = self.__model.scorer
+            return
 
         else:
             data = torch.load(path_file, map_location=self.__device)
-            self.__modeling_name = data["modeling_name"]
 
-            self.__model = Modeling.select_model(modeling_name=data["modeling_name"], input_size=data["input_size"],
+        self.__modeling_name = data["modeling_name"]
+        if self.__modeling_name == "NeuralNet" and data["extractor"] in ["BagOfWords", "TFIDF"]:
+            self.__modeling_name = "SparseNeuralNet"
+
+        if self.__modeling_name == "Retrieval":
+            self.__model = RetrievalClassifier(tags=data["tags"], k=data["k"], min_similarity=data["min_similarity"])
+            self.__model.add(vectors=data["model_state"]["vectors"].cpu().numpy(),
+                             labels=data["model_state"]["labels"].cpu().numpy())
+        elif OnnxPredictor.is_available(ModelArtifact.get_path(model_file)):
+            # The session is created by the process running the model, e.g. a prefork worker with its thread limit
+            self.__model = OnnxPredictor(model_path=ModelArtifact.get_path(model_file),
+                                         modeling_name=self.__modeling_name)
+        else:
+            self.__model = Modeling.select_model(modeling_name=self.__modeling_name, input_size=data["input_size"],
                                                  hidden_size=data["hidden_size"], num_classes=data["output_size"],
                                                  device=self.__device)
             self.__model.load_state_dict(data["model_state"])
             self.__model.eval()
 
-            preprocessor = Preprocessor(preprocessor_name=data["preprocessor"],
-                                        remove_stopwords=data["remove_stopwords"])
+        self.__scorer = IntentScorer(tags=data["tags"], temperature=data.get("temperature", DEFAULT_TEMPERATURE),
+                                     threshold=data.get("threshold", DEFAULT_THRESHOLD))
 
-            self.__extractor = Extractor(preprocessor=preprocessor, extractor_name=data["extractor"],
-                                         vocab=data["vocab"], docs=data["docs"], tags=data["tags"],
-                                         window=data["window"],
-                                         vector_size=data["vector_size"], model_name=model_file)
+        if data["extractor"] == "BERT":
+            encoder = FrozenEncoder.get(data["base_model"])
+            if encoder.revision != data["encoder_revision"]:
+                raise ValueError(f"The model {model_file} was indexed over the revision {data['encoder_revision']} "
+                                 f"of {data['base_model']}, but the revision {encoder.revision} is installed. "
+                                 f"Train it again.")
+            self.__encoder = encoder
+            return
+
+        preprocessor = Preprocessor(preprocessor_name=data["preprocessor"],
+                                    remove_stopwords=data["remove_stopwords"])
+
+        self.__extractor = Extractor(preprocessor=preprocessor, extractor_name=data["extractor"],
+                                     vocab=data["vocab"], docs=data.get("docs"), tags=data["tags"],
+                                     window=data["window"], vector_size=data["vector_size"], model_name=model_file,
+                                     idf=data.get("idf"))
 
     def predict_tag(self, sentence: str) -> str:
         """
@@ -111,20 +235,185 @@ class ChatBot:
             applications.
         """
 
-        if (self.__modeling_name == "BERT"):
-            return self.__model.predict(text=sentence)
+        return self.predict_tags(sentences=[sentence])[0]
+
+    def predict_tags(self, sentences: list, batch_size: int = 64) -> list:
+        """
+        Determines the tags of several sentences, feeding them to the model by batches rather than one at a time.
+        A sentence whose most likely tag has a calibrated probability not above the threshold of the model gets the
+        empty tag. The sentences which are copies of a pattern of the intents file, by their normalized text or by
+        their preprocessed tokens, get the intent of the pattern without running the model, and the sentences
+        whose preprocessed tokens were already predicted by the model get the cached prediction.
+
+        Parameters:
+            sentences (list): The sentences for which the intents need to be determined.
+            batch_size (int): The number of sentences given to the model at once. Defaults to 64.
+
+        Returns:
+            list: The predicted intent of each sentence, in the order of the sentences.
+        """
+
+        if not sentences:
+            return []
+        if self.__lookup is not None:
+            tags, token_lists = self.__lookup.lookup(sentences)
+        else:
+            tags, token_lists = [None] * len(sentences), [None] * len(sentences)
+        misses = [index for index, tag in enumerate(tags) if tag is None]
+
+        cache = self.__cache if self.__extractor is not None else None
+        model_id = self.__model_id
+        if misses and cache is not None:
+            unprocessed = [index for index in misses if token_lists[index] is None]
+            if unprocessed:
+                for index, tokens in zip(unprocessed, self.__extractor.preprocessor.preprocess_corpus(
+                        texts=[sentences[index] for index in unprocessed])):
+                    token_lists[index] = tokens
+            for index in misses:
+                prediction = cache.get((model_id, tuple(token_lists[index])))
+                if prediction is not None:
+                    tags[index] = prediction[0]
+            misses = [index for index in misses if tags[index] is None]
+
+        if misses:
+            predictions = self.__scorer.predict_with_probability(self.__compute_batched_logits(
+                sentences=[sentences[index] for index in misses], batch_size=batch_size,
+                token_lists=[token_lists[index] for index in misses] if token_lists[misses[0]] is not None else None))
+            for index, prediction in zip(misses, predictions):
+                tags[index] = prediction[0]
+                if cache is not None:
+                    cache.put((model_id, tuple(token_lists[index])), prediction)
+        return tags
+
+    def score_intents(self, sentences: list, k: int = 3, batch_size: int = 64) -> list:
+        """
+        Scores several sentences in one pass of the model, giving for each one the intent accepted by the
+        threshold of the model and the k most likely intents with their calibrated probabilities, e.g. to offer
+        the user a choice when no intent is accepted.
+
+        Parameters:
+            sentences (list): The sentences to score.
+            k (int): The number of candidate intents of each sentence. Defaults to 3.
+            batch_size (int): The number of sentences given to the model at once. Defaults to 64.
+
+        Returns:
+            list: One dictionary per sentence, with the accepted "tag", empty if none is accepted, and the
+                  "candidates", a list of (tag, probability) pairs from the most likely one.
+        """
+
+        if not sentences:
+            return []
+        return self.__scorer.score(self.__compute_batched_logits(sentences=sentences, batch_size=batch_size), k=k)
 
-        X = self.__extractor.extract_features(sentence)
-        X = X.reshape(1, X.shape[0])
-        X = torch.from_numpy(X).to(dtype=torch.float).to(self.__device)
+    def __compute_batched_logits(self, sentences: list, batch_size: int, token_lists: list = None) -> torch.Tensor:
+        """
+        Computes the raw scores of every tag for several sentences, by batches.
 
-        output = self.__model(X)
-        _, predicted = torch.max(output, dim=1)
+        Parameters:
+            sentences (list): The sentences to score.
+            batch_size (int): The number of sentences given to the model at once.
+            token_lists (list): The preprocessed tokens of every sentence, when they are already known. Defaults to
+                                None, which preprocesses the sentences.
 
-        probabilities = torch.softmax(output, dim=1)
-        prob = probabilities[0][predicted.item()]
+        Returns:
+            torch.Tensor: A matrix with one row of logits per sentence, in the order of the scorer tags.
+        """
+
+        RuntimeConfig.use("serving", self.__modeling_name)
+        if self.__modeling_name in ["BERT", "FrozenBERT"]:
+            with Tracer.span("model_forward"):
+                return torch.from_numpy(self.__model.predict_logits(texts=sentences, batch_size=batch_size))
 
-        return self.__extractor.tags[predicted.item()] if prob.item() > 0.6 else ""
+        with torch.no_grad():
+            return torch.cat([self.__compute_logits(
+                sentences=sentences[start:start + batch_size],
+                token_lists=token_lists[start:start + batch_size] if token_lists is not None else None).cpu()
+                for start in range(0, len(sentences), batch_size)])
+
+    def __compute_logits(self, sentences: list, token_lists: list = None) -> torch.Tensor:
+        """
+        Computes the raw scores of every tag for a batch of sentences with the feed-forward model.
+
+        Parameters:
+            sentences (list): The sentences of the batch.
+            token_lists (list): The preprocessed tokens of every sentence of the batch, when they are already known.
+                                Defaults to None, which preprocesses the sentences.
+
+        Returns:
+            torch.Tensor: A matrix with one row of logits per sentence, in the order of the extractor tags.
+        """
+
+        if isinstance(self.__model, RetrievalClassifier) and self.__encoder is not None:
+            X = self.__encoder.encode(sentences).numpy()
+            with Tracer.span("model_forward"):
+                return self.__model.logits(X)
+
+        if token_lists is None:
+            token_lists = self.__extractor.preprocessor.preprocess_corpus(texts=sentences)
+
+        if isinstance(self.__model, RetrievalClassifier):
+            X = self.__extractor.batch_features_from_tokens(token_lists)
+            with Tracer.span("model_forward"):
+                return self.__model.logits(X)
+
+        if isinstance(self.__model, OnnxPredictor):
+            X = self.__extractor.batch_features_from_tokens(token_lists).astype(np.float32)
+            with Tracer.span("model_forward"):
+                return torch.from_numpy(self.__model.run(features=X))
+
+        if isinstance(self.__model, SparseNeuralNet):
+            sparse_features = [self.__extractor.sparse_features_from_tokens(tokens) for tokens in token_lists]
+            lengths = [len(indices) for indices, _ in sparse_features]
+            offsets = torch.tensor([0] + lengths[:-1], dtype=torch.long).cumsum(dim=0)
+            indices = torch.from_numpy(np.concatenate([indices for indices, _ in sparse_features]))
+            weights = torch.from_numpy(np.concatenate([weights for _, weights in sparse_features]))
+            with Tracer.span("model_forward"):
+                return self.__model(indices.to(self.__device), offsets.to(self.__device), weights.to(self.__device))
+
+        X = torch.from_numpy(self.__extractor.batch_features_from_tokens(token_lists)).to(dtype=torch.float)
+        with Tracer.span("model_forward"):
+            return self.__model(X.to(self.__device))
+
+    def add_patterns(self, tag: str, patterns: list) -> None:
+        """
+        Adds patterns of an intent to a Retrieval model, which predicts it for sentences similar to them from the
+        next prediction on, without any training. The patterns are not saved with the model, the cached
+        predictions are forgotten, and the copies of the patterns are looked up like those of the intents file.
+
+        Parameters:
+            tag (str): The intent of the patterns, which must be one of the intents of the model.
+            patterns (list): The new patterns.
+
+        Raises:
+            ValueError: If the model is not a Retrieval model or does not know the intent.
+        """
+
+        if not isinstance(self.__model, RetrievalClassifier):
+            raise ValueError(f"Only a Retrieval model can learn new patterns, not a {self.__modeling_name} model.")
+        if tag not in self.__model.tags:
+            raise ValueError(f"The intent '{tag}' is unknown to the model.")
+
+        if self.__encoder is not None:
+            vectors = self.__encoder.encode(patterns).numpy()
+        else:
+            vectors = self.__extractor.extract_batch_features(patterns)
+        self.__model.add(vectors=vectors, labels=[self.__model.tags.index(tag)] * len(patterns))
+        if self.__cache is not None:
+            self.__cache.clear()
+        self.__added_patterns.append((tag, list(patterns)))
+        self.__build_lookup()
+
+    def export_metrics(self) -> str:
+        """
+        Returns the counters of the chatbot, the hit ratios of the pattern lookup and of the prediction cache and
+        the size of the cache, in the Prometheus text format.
+
+        Returns:
+            str: The exposition text, empty when the lookup and the cache are disabled.
+        """
+
+        return "".join(component.export_prometheus() for component in [self.__lookup, self.__cache]
+                       if component is not None)
 
     def get_response(self, user_input: str) -> list:
         """
@@ -158,7 +447,8 @@ class ChatBot:
 
                         param = list(self.__intents_data[predicted_tag]['parameters']['static'].values())
                         # Call the function with parameters unpacked from the list
-                        outputs.append(function_to_call(*param))
+                        with Tracer.span("intent_handler"):
+                            outputs.append(function_to_call(*param))
 
                     elif self.__intents_data[predicted_tag]['function'] != "":
                         module = importlib.import_module(self.__intents_data[predicted_tag]['module'])
@@ -168,9 +458,20 @@ class ChatBot:
                             self.__intents_data[predicted_tag]['parameters']['static'][item] = treated_user_input[item]
                         param = list(self.__intents_data[predicted_tag]['parameters']['static'].values())
                         # Call the function with parameters unpacked from the list
-                        outputs.extend(function_to_call(*param))
+                        with Tracer.span("intent_handler"):
+                            outputs.extend(function_to_call(*param))
 
                 else:
                     outputs.append("Sorry, I do not understand your request...")
 
         return outputs
+
+    @property
+    def model_file(self) -> str:
+        """
+        Accesses the name of the loaded model, as given to load_essential.
+
+        Returns:
+            str: The name of the model.
+        """
+        return self.__model_file
@@ -0,0 +1,269 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import numpy as np
+import torch
+from filelock import FileLock
+
+from modules.chatbot.chatbot import ChatBot
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from utilities.path_finder import PathFinder
+
+INTENT_TEST_FILE = "ressources/json_files/chatbot_intent_test.json"
+RESULTS_FILE = "ressources/json_files/chatbot_test_results.jsonl"
+LEGACY_RESULTS_FILE = "ressources/json_files/chatbot_test_result.json"
+NO_INTENT = "<no intent>"
+SUMMARY_FIELDS = ["modeling", "preprocessing", "extractor", "stopword", "epochs", "batch_size", "learning_rate",
+                  "hidden_size", "score_known_data", "score_unknown_data"]
+
+
+class ResultStore:
+    """
+    A class that keeps the history of the chatbot tests in an append-only JSON lines file: every test is written as
+    one line at the end of the file while holding a file lock, so that tests run at the same time by several
+    threads or processes never overwrite each other. The results written by older versions in
+    chatbot_test_result.json are still read, after the new ones.
+
+    Attributes:
+        __path (str): The path of the JSON lines file.
+        __legacy_path (str): The path of the legacy JSON file.
+        __lock (FileLock): The lock guarding the JSON lines file.
+
+    Methods:
+        append(result): Appends a test result to the history.
+        load(): Returns every test result, the most recent first.
+        load_summaries(): Returns the summary fields of every test result, the most recent first.
+    """
+
+    def __init__(self, path: str = RESULTS_FILE, legacy_path: str = LEGACY_RESULTS_FILE):
+        """
+        Initializes the ResultStore.
+
+        Parameters:
+            path (str): The JSON lines file, relative to the project. Defaults to RESULTS_FILE.
+            legacy_path (str): The legacy JSON file, relative to the project. Defaults to LEGACY_RESULTS_FILE.
+        """
+        self.__path = PathFinder.get_complet_path(path)
+        self.__legacy_path = PathFinder.get_complet_path(legacy_path)
+        self.__lock = FileLock(f"{self.__path}.lock")
+
+    def append(self, result: dict) -> None:
+        """
+        Appends a test result to the history.
+
+        Parameters:
+            result (dict): The result to append, which must be serializable to JSON.
+        """
+        line = json.dumps(result, ensure_ascii=False) + "\n"
+        with self.__lock, open(self.__path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+    def load(self) -> list:
+        """
+        Returns every test result, the most recent first, followed by the legacy results.
+
+        Returns:
+            list: The test results.
+        """
+        results = []
+        if os.path.isfile(self.__path):
+            with self.__lock, open(self.__path, "r", encoding="utf-8") as file:
+                results = [json.loads(line) for line in file if line.strip()]
+        results.reverse()
+
+        if os.path.isfile(self.__legacy_path):
+            with open(self.__legacy_path, "r", encoding="utf-8") as file:
+                results.extend(json.load(file)["tests"])
+        return results
+
+    def load_summaries(self) -> list:
+        """
+        Returns the summary fields of every test result, the most recent first: the training parameters of the
+        model and its scores on the known and unknown data, as displayed by the test page.
+
+        Returns:
+            list: The test summaries.
+        """
+        return [{field: result.get(field, "") for field in SUMMARY_FIELDS} for result in self.load()]
+
+
+class Evaluator:
+    """
+    A class that tests the trained models on the utterances of chatbot_intent_test.json. The utterances are
+    predicted by batches, several models can be tested at the same time by a pool of processes, and each test
+    reports, besides the scores on the known and unknown data, the precision and recall of every intent, the
+    confusion matrix and the latency of the predictions.
+
+    Attributes:
+        __test_data (dict): The "known_data" and "unknown_data" utterances, with their expected tag.
+        __store (ResultStore): The history where the results are appended.
+        __batch_size (int): The number of utterances predicted at once.
+        __latency_samples (int): The number of utterances predicted one by one to measure the latency.
+
+    Methods:
+        evaluate(model_file): Tests a model and appends its result to the history.
+        evaluate_all(model_files, processes): Tests several models in parallel.
+        compute_metrics(expected, predicted): Computes the per-intent metrics and the confusion matrix.
+        compute_latency(durations): Computes the latency statistics of predictions.
+    """
+
+    def __init__(self, test_file: str = INTENT_TEST_FILE, store: ResultStore = None, batch_size: int = 64,
+                 latency_samples: int = 50):
+        """
+        Initializes the Evaluator by loading the test utterances.
+
+        Parameters:
+            test_file (str): The test utterances file, relative to the project. Defaults to INTENT_TEST_FILE.
+            store (ResultStore): The history of the results. Defaults to a ResultStore on RESULTS_FILE.
+            batch_size (int): The number of utterances predicted at once. Defaults to 64.
+            latency_samples (int): The number of utterances predicted one by one to measure the latency.
+                                   Defaults to 50.
+        """
+        with open(PathFinder.get_complet_path(test_file), "r", encoding="utf-8") as file:
+            self.__test_data = json.load(file)
+        self.__store = store if store is not None else ResultStore()
+        self.__batch_size = batch_size
+        self.__latency_samples = latency_samples
+
+    def evaluate(self, model_file: str, save: bool = True) -> dict:
+        """
+        Tests a model on the known and unknown utterances and appends its result to the history.
+
+        Parameters:
+            model_file (str): The name of the model in ressources/models.
+            save (bool): Whether to append the result to the history. Defaults to True.
+
+        Returns:
+            dict: The training parameters of the model, its scores formatted as in the legacy results, and the
+                  "metrics" and "latency" of the test.
+        """
+        chatbot = ChatBot(model_file=model_file, pattern_lookup=False, cache_size=0)
+        result = {"model_file": model_file, "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                  **ModelArtifact.load_parameters(model_file=model_file)}
+
+        expected = {}
+        predicted = {}
+        start = time.perf_counter()
+        for data_set in ["known_data", "unknown_data"]:
+            expected[data_set] = [data["tag"] for data in self.__test_data[data_set]]
+            predicted[data_set] = chatbot.predict_tags(sentences=[data["user_input"]
+                                                                  for data in self.__test_data[data_set]],
+                                                       batch_size=self.__batch_size)
+            accuracy = np.mean([tag == expected_tag
+                                for tag, expected_tag in zip(predicted[data_set], expected[data_set])])
+            result[f"score_{data_set}"] = f"{round(float(accuracy) * 100, 2)} %"
+        batch_duration = time.perf_counter() - start
+
+        sentences = [data["user_input"] for data in self.__test_data["known_data"]][:self.__latency_samples]
+        durations = []
+        for sentence in sentences:
+            start = time.perf_counter()
+            chatbot.predict_tag(sentence)
+            durations.append(time.perf_counter() - start)
+
+        result["metrics"] = Evaluator.compute_metrics(expected=expected["known_data"] + expected["unknown_data"],
+                                                      predicted=predicted["known_data"] + predicted["unknown_data"])
+        result["latency"] = {**Evaluator.compute_latency(durations),
+                             "batched_utterances_per_second": round(sum(map(len, expected.values())) /
+                                                                    batch_duration, 1)}
+        if save:
+            self.__store.append(result)
+        return result
+
+    def evaluate_all(self, model_files: list, processes: int = None) -> list:
+        """
+        Tests several models, each one in a process of a pool, and appends their results to the history as they
+        complete. The processes are spawned rather than forked, as forking a process whose torch threads are
+        running may deadlock, and each one uses a single torch thread so they do not compete for the cores.
+
+        Parameters:
+            model_files (list): The names of the models in ressources/models.
+            processes (int): The number of processes. Defaults to the number of models, within the number of CPUs.
+
+        Returns:
+            list: The results of the models, in the order of model_files.
+        """
+        processes = processes or min(len(model_files), os.cpu_count() or 1)
+        results = {}
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=torch.set_num_threads, initargs=(1,)) as executor:
+            futures = {executor.submit(_evaluate_model, model_file, self.__batch_size, self.__latency_samples):
+                       model_file for model_file in model_files}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                self.__store.append(results[futures[future]])
+        return [results[model_file] for model_file in model_files]
+
+    @staticmethod
+    def compute_metrics(expected: list, predicted: list) -> dict:
+        """
+        Computes the accuracy, the precision, recall and F1 score of every intent, and the confusion matrix. An
+        utterance for which no intent is predicted counts as the NO_INTENT label.
+
+        Parameters:
+            expected (list): The expected tag of each utterance.
+            predicted (list): The predicted tag of each utterance, empty when no intent was predicted.
+
+        Returns:
+            dict: The "accuracy", the "intents" metrics by tag, and the "confusion_matrix" with its "labels", whose
+                  rows are the expected labels and columns the predicted ones.
+        """
+        predicted = [tag if tag != "" else NO_INTENT for tag in predicted]
+        labels = sorted(set(expected)) + sorted(set(predicted) - set(expected))
+        index = {label: position for position, label in enumerate(labels)}
+
+        matrix = np.zeros((len(labels), len(labels)), dtype=np.int64)
+        np.add.at(matrix, ([index[tag] for tag in expected], [index[tag] for tag in predicted]), 1)
+
+        true_positives = np.diag(matrix)
+        predicted_counts = matrix.sum(axis=0)
+        support = matrix.sum(axis=1)
+        precision = np.divide(true_positives, predicted_counts, out=np.zeros(len(labels)), where=predicted_counts > 0)
+        recall = np.divide(true_positives, support, out=np.zeros(len(labels)), where=support > 0)
+        f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros(len(labels)),
+                       where=precision + recall > 0)
+
+        return {
+            "accuracy": round(float(true_positives.sum() / max(len(expected), 1)), 4),
+            "intents": {label: {"precision": round(float(precision[position]), 4),
+                                "recall": round(float(recall[position]), 4),
+                                "f1": round(float(f1[position]), 4),
+                                "support": int(support[position])}
+                        for position, label in enumerate(labels) if label in expected},
+            "confusion_matrix": {"labels": labels, "matrix": matrix.tolist()}
+        }
+
+    @staticmethod
+    def compute_latency(durations: list) -> dict:
+        """
+        Computes the latency statistics of single predictions.
+
+        Parameters:
+            durations (list): The duration of each prediction, in seconds.
+
+        Returns:
+            dict: The number of predictions and their mean, median, 95th and 99th percentiles and maximum, in
+                  milliseconds.
+        """
+        if not durations:
+            return {"count": 0}
+        milliseconds = np.array(durations) * 1000
+        return {"count": len(durations),
+                "mean_ms": round(float(milliseconds.mean()), 3),
+                "p50_ms": round(float(np.percentile(milliseconds, 50)), 3),
+                "p95_ms": round(float(np.percentile(milliseconds, 95)), 3),
+                "p99_ms": round(float(np.percentile(milliseconds, 99)), 3),
+                "max_ms": round(float(milliseconds.max()), 3)}
+
+
+def _evaluate_model(model_file: str, batch_size: int, latency_samples: int) -> dict:
+    """
+    Tests a model in a process of the pool of Evaluator.evaluate_all, without saving its result, which is appended
+    by the parent process.
+    """
+    return Evaluator(batch_size=batch_size, latency_samples=latency_samples).evaluate(model_file=model_file,
+                                                                                      save=False)
@@ -0,0 +1,149 @@
+import re
+import threading
+import unicodedata
+
+from modules.NLP.preprocessing.preprocessor import Preprocessor
+
+LOOKUP_METRIC_NAME = "chatbot_pattern_lookup"
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes a sentence so that the copies of a pattern differing only by case, punctuation or spacing are equal,
+    e.g. "Thanks!" and "  thanks ".
+
+    Parameters:
+        text (str): The sentence to normalize.
+
+    Returns:
+        str: The lower case words of the sentence, separated by single spaces.
+    """
+    return " ".join(re.sub(r"[^\w\s]+", " ", unicodedata.normalize("NFKC", text).casefold()).split())
+
+
+class PatternLookup:
+    """
+    A class that finds the intent of the sentences which are copies of a pattern of intents.json without running
+    the model. A sentence is first looked up by its normalized text, in microseconds, then, when the model has a
+    preprocessor, by its preprocessed tokens: a sentence with the same tokens as a pattern gets the same features,
+    so the tokens lookup only skips the feature extraction and the network. The patterns shared by several intents
+    are left to the model.
+
+    The number of sentences looked up and found is counted for the /metrics endpoint.
+
+    Attributes:
+        __texts (dict): The intent of every normalized pattern.
+        __tokens (dict): The intent of every tuple of preprocessed tokens of a pattern.
+        __preprocessor (Preprocessor): The preprocessor of the model, or None when the model has none.
+        __lookups (int): The number of sentences looked up.
+        __hits (int): The number of sentences found.
+        __lock (threading.Lock): The lock guarding the counters.
+
+    Methods:
+        lookup(sentences): Finds the intent of the sentences which are copies of a pattern.
+        export_prometheus(): Returns the counters of the lookups in the Prometheus text format.
+        hit_ratio: The share of the sentences looked up which were found.
+    """
+
+    def __init__(self, intents_data: dict, tags: list, preprocessor: Preprocessor = None):
+        """
+        Builds the lookup tables of the patterns of the intents known to the model.
+
+        Parameters:
+            intents_data (dict): The content of the intents file.
+            tags (list): The intents the model can predict; the patterns of the other intents are ignored.
+            preprocessor (Preprocessor): The preprocessor of the model, to look the sentences up by their tokens
+                                         too. Defaults to None, which looks them up by their text only.
+        """
+        patterns = [(intent["tag"], pattern) for intent in intents_data["intents"] if intent["tag"] in tags
+                    for pattern in intent["patterns"]]
+        self.__texts = PatternLookup.__build_table([normalize_text(pattern) for _, pattern in patterns],
+                                                   [tag for tag, _ in patterns])
+        self.__preprocessor = preprocessor
+        self.__tokens = dict()
+        if preprocessor is not None:
+            token_lists = preprocessor.preprocess_corpus([pattern for _, pattern in patterns])
+            self.__tokens = PatternLookup.__build_table([tuple(tokens) for tokens in token_lists],
+                                                        [tag for tag, _ in patterns])
+        self.__lookups = 0
+        self.__hits = 0
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __build_table(keys: list, tags: list) -> dict:
+        """
+        Maps every key to the intent of its patterns, leaving out the empty keys and the keys of several intents.
+
+        Parameters:
+            keys (list): The key of every pattern.
+            tags (list): The intent of every pattern.
+
+        Returns:
+            dict: The intent of every unambiguous key.
+        """
+        table = dict()
+        ambiguous = set()
+        for key, tag in zip(keys, tags):
+            if table.setdefault(key, tag) != tag:
+                ambiguous.add(key)
+        for key in ambiguous | {"", ()}:
+            table.pop(key, None)
+        return table
+
+    def lookup(self, sentences: list) -> tuple[list, list]:
+        """
+        Finds the intent of the sentences which are copies of a pattern, by their normalized text, then by their
+        preprocessed tokens. The tokens are returned so that the sentences not found are not preprocessed again.
+
+        Parameters:
+            sentences (list): The sentences to look up.
+
+        Returns:
+            tuple[list, list]: The intent of every sentence, None when it is not found, and the preprocessed tokens
+                               of every sentence, None when it was found by its text or the model has no
+                               preprocessor.
+        """
+        tags = [self.__texts.get(normalize_text(sentence)) for sentence in sentences]
+        token_lists = [None] * len(sentences)
+        misses = [index for index, tag in enumerate(tags) if tag is None]
+        if misses and self.__preprocessor is not None:
+            for index, tokens in zip(misses, self.__preprocessor.preprocess_corpus([sentences[index]
+                                                                                    for index in misses])):
+                tags[index] = self.__tokens.get(tuple(tokens))
+                token_lists[index] = tokens
+
+        hits = len(tags) - tags.count(None)
+        with self.__lock:
+            self.__lookups += len(tags)
+            self.__hits += hits
+        return tags, token_lists
+
+    def export_prometheus(self) -> str:
+        """
+        Returns the number of sentences looked up and found in the Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        with self.__lock:
+            lookups, hits = self.__lookups, self.__hits
+        return "\n".join([f"# HELP {LOOKUP_METRIC_NAME}_total Sentences looked up in the patterns of the intents.",
+                          f"# TYPE {LOOKUP_METRIC_NAME}_total counter",
+                          f"{LOOKUP_METRIC_NAME}_total {lookups}",
+                          f"# HELP {LOOKUP_METRIC_NAME}_hits_total Sentences found in the patterns of the intents.",
+                          f"# TYPE {LOOKUP_METRIC_NAME}_hits_total counter",
+                          f"{LOOKUP_METRIC_NAME}_hits_total {hits}",
+                          f"# HELP {LOOKUP_METRIC_NAME}_hit_ratio Share of the sentences found without the model.",
+                          f"# TYPE {LOOKUP_METRIC_NAME}_hit_ratio gauge",
+                          f"{LOOKUP_METRIC_NAME}_hit_ratio {hits / lookups if lookups else 0.0}"]) + "\n"
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Accesses the share of the sentences looked up which were found without the model.
+
+        Returns:
+            float: The hit ratio, 0 before the first lookup.
+        """
+        with self.__lock:
+            return self.__hits / self.__lookups if self.__lookups else 0.0
@@ -0,0 +1,130 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_CACHE_SIZE = 4096
+CACHE_METRIC_NAME = "chatbot_prediction_cache"
+
+
+class PredictionCache:
+    """
+    A bounded LRU cache of the predictions of a model, keyed on the model and the preprocessed tokens of a
+    sentence: the sentences which differ only by case, punctuation or inflection have the same tokens, hence the
+    same features and the same prediction, so a cached one skips the feature extraction and the forward pass. When
+    the cache is full, the least recently used prediction is evicted.
+
+    The cache is shared by the threads serving the requests: every access holds a lock, which only guards dictionary
+    operations, never a prediction.
+
+    Attributes:
+        __max_size (int): The number of predictions the cache holds at most.
+        __entries (OrderedDict): The cached predictions, from the least recently used one.
+        __hits (int): The number of lookups which found a prediction.
+        __misses (int): The number of lookups which found none.
+        __lock (threading.Lock): The lock guarding the entries and the counters.
+
+    Methods:
+        get(key): Returns a cached prediction.
+        put(key, prediction): Caches a prediction.
+        clear(): Forgets every cached prediction.
+        export_prometheus(): Returns the size and the counters of the cache in the Prometheus text format.
+        size: The number of cached predictions.
+        hit_ratio: The share of the lookups which found a prediction.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initializes an empty PredictionCache.
+
+        Parameters:
+            max_size (int): The number of predictions the cache holds at most. Defaults to DEFAULT_CACHE_SIZE.
+        """
+        self.__max_size = max_size
+        self.__entries = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple | None:
+        """
+        Returns a cached prediction, which becomes the most recently used one.
+
+        Parameters:
+            key (tuple): The identifier of the model and the tuple of the preprocessed tokens of the sentence.
+
+        Returns:
+            tuple | None: The (tag, probability) prediction, or None if it is not cached.
+        """
+        with self.__lock:
+            prediction = self.__entries.get(key)
+            if prediction is None:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return prediction
+
+    def put(self, key: tuple, prediction: tuple) -> None:
+        """
+        Caches a prediction, evicting the least recently used one when the cache is full.
+
+        Parameters:
+            key (tuple): The identifier of the model and the tuple of the preprocessed tokens of the sentence.
+            prediction (tuple): The (tag, probability) prediction.
+        """
+        with self.__lock:
+            self.__entries[key] = prediction
+            self.__entries.move_to_end(key)
+            if len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Forgets every cached prediction, e.g. when another model is loaded. The counters are kept.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def export_prometheus(self) -> str:
+        """
+        Returns the size, the capacity and the hit and miss counters of the cache in the Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        with self.__lock:
+            size, hits, misses = len(self.__entries), self.__hits, self.__misses
+        lines = []
+        for name, kind, description, value in [
+                ("size", "gauge", "Predictions in the cache.", size),
+                ("max_size", "gauge", "Predictions the cache holds at most.", self.__max_size),
+                ("hits_total", "counter", "Predictions found in the cache.", hits),
+                ("misses_total", "counter", "Predictions computed by the model.", misses),
+                ("hit_ratio", "gauge", "Share of the predictions found in the cache.",
+                 hits / (hits + misses) if hits + misses else 0.0)]:
+            lines.extend([f"# HELP {CACHE_METRIC_NAME}_{name} {description}",
+                          f"# TYPE {CACHE_METRIC_NAME}_{name} {kind}",
+                          f"{CACHE_METRIC_NAME}_{name} {value}"])
+        return "\n".join(lines) + "\n"
+
+    @property
+    def size(self) -> int:
+        """
+        Accesses the number of cached predictions.
+
+        Returns:
+            int: The size of the cache.
+        """
+        with self.__lock:
+            return len(self.__entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Accesses the share of the lookups which found a prediction.
+
+        Returns:
+            float: The hit ratio, 0 before the first lookup.
+        """
+        with self.__lock:
+            total = self.__hits + self.__misses
+            return self.__hits / total if total else 0.0
@@ -5,13 +5,18 @@ import numpy as np
 import torch
 import torch.nn as nn
 from matplotlib import pyplot as plt
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import DataLoader, Dataset, Subset
 
 from modules.NLP.modeling.BERT import BertIntentClassifier
+from modules.NLP.modeling.frozen_bert import FrozenBertClassifier, FrozenEncoder
+from modules.NLP.modeling.intent_scorer import IntentScorer, DEFAULT_CALIBRATION_SPLIT, DEFAULT_THRESHOLD
+from modules.NLP.modeling.model_artifact import ModelArtifact
 from modules.NLP.modeling.modeling import Modeling
+from modules.NLP.modeling.retrieval_classifier import RetrievalClassifier, DEFAULT_K, DEFAULT_MIN_SIMILARITY
 from modules.NLP.features_extractor.extractor import Extractor
 from modules.NLP.preprocessing.preprocessor import Preprocessor
 from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
 
 
 class ChatBotTrainer:
@@ -29,12 +34,25 @@ class ChatBotTrainer:
         __vector_size (int): The dimensionality of the word vectors.
         __window (int): The context window size for the word vector model.
         __model (torch.nn.Module): The neural network model used for training.
-
+        __threshold (float): The probability the best intent must exceed to be accepted, saved with the model.
+        __calibration_split (float): The fraction of the patterns of every intent held out to fit the temperature.
+        __temperature (float): The temperature of the probabilities of the model, fitted after the training.
+        __calibration_indices (list): The indices of the patterns held out of the training to fit the temperature.
+        __extractor_name (str): The name of the feature extractor, "BERT" for the embeddings of the frozen BERT
+                                encoder.
+        __k (int): The number of patterns voting for the intent of a sentence, for the Retrieval modeling.
+        __min_similarity (float): The cosine similarity a pattern must reach to vote, for the Retrieval modeling.
+
+    Methods:
+        check_configuration(modeling_name, extractor_name): Checks if a modeling can be fed by a feature extractor.
+        start_training(): Trains the model and saves it.
     """
 
     def __init__(self, extractor_name: str = None, preprocessor_name: str = None, remove_stopwords: bool = None,
                  modeling_name: str = None, model_name: str = None, num_epochs: int = None, batch_size: int = None,
-                 learning_rate: float = None, hidden_size: int = None, vector_size: int = None, window: int = None):
+                 learning_rate: float = None, hidden_size: int = None, vector_size: int = None, window: int = None,
+                 threshold: float = DEFAULT_THRESHOLD, calibration_split: float = DEFAULT_CALIBRATION_SPLIT,
+                 k: int = DEFAULT_K, min_similarity: float = DEFAULT_MIN_SIMILARITY):
         """
         Initializes the ChatBotTrainer with the specified configuration and sets up the model based on the provided model name.
 
@@ -42,7 +60,9 @@ class ChatBotTrainer:
             extractor_name (str): The name of the feature extractor to use.
             preprocessor_name (str): The name of the preprocessor to apply to the text data.
             remove_stopwords (bool): Whether to remove stopwords during preprocessing.
-            modeling_name (str): The type of model to train ('BERT' for using BERT; others for custom models).
+            modeling_name (str): The type of model to train ('BERT' to fine-tune BERT, 'FrozenBERT' to train a head
+                                 over the frozen BERT encoder, 'Retrieval' to index the patterns without training;
+                                 others for custom models).
             model_name (str): The identifier for the model, used for saving and loading.
             num_epochs (int): The number of epochs to train the model.
             batch_size (int): The batch size for training.
@@ -50,8 +70,21 @@ class ChatBotTrainer:
             hidden_size (int): The number of units in the hidden layers of a custom model.
             vector_size (int): The size of the embedding vectors.
             window (int): The window size in terms of the number of words around the target word for feature extraction.
+            threshold (float): The probability the best intent must exceed to be accepted by the trained model.
+                               Defaults to DEFAULT_THRESHOLD.
+            calibration_split (float): The fraction of the patterns of every intent held out of the training to fit
+                                       the temperature of the model. Defaults to DEFAULT_CALIBRATION_SPLIT, no
+                                       pattern is held out and the temperature is DEFAULT_TEMPERATURE.
+            k (int): The number of patterns voting for the intent of a sentence, for the Retrieval modeling.
+                     Defaults to DEFAULT_K.
+            min_similarity (float): The cosine similarity a pattern must reach to vote, for the Retrieval modeling.
+                                    Defaults to DEFAULT_MIN_SIMILARITY.
+
+        Raises:
+            ValueError: If the modeling cannot be fed by the feature extractor.
         """
 
+        ChatBotTrainer.check_configuration(modeling_name=modeling_name, extractor_name=extractor_name)
         self.__device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         self.__modeling_name = modeling_name
         self.__num_epochs = num_epochs
@@ -62,74 +95,217 @@ class ChatBotTrainer:
         self.__vector_size = vector_size
         self.__window = window
         self.__model = None
-
-        if (modeling_name != "BERT"):
+        self.__threshold = threshold
+        self.__calibration_split = calibration_split
+        self.__temperature = None
+        self.__calibration_indices = []
+        self.__extractor_name = extractor_name
+        self.__k = k
+        self.__min_similarity = min_similarity
+
+        # The BERT models and the retrieval over BERT embeddings encode the raw patterns themselves
+        if modeling_name not in ["BERT", "FrozenBERT"] and not (modeling_name == "Retrieval" and
+                                                                 extractor_name == "BERT"):
             self.preprocessor = Preprocessor(preprocessor_name, remove_stopwords)
             self.extractor = Extractor(preprocessor=self.preprocessor, extractor_name=extractor_name,
                                        vector_size=self.__vector_size, window=self.__window,
                                        model_name=self.__model_name,
                                        is_training=True)
 
-            self.dataset = IntentDataset(extractor=self.extractor)
+            self.dataset = IntentDataset(extractor=self.extractor, sparse=modeling_name == "SparseNeuralNet")
+
+    @staticmethod
+    def check_configuration(modeling_name: str, extractor_name: str) -> None:
+        """
+        Checks if a modeling can be fed by a feature extractor, before anything is loaded or trained: the
+        SparseNeuralNet takes the sparse vectors of the BagOfWords and TFIDF extractors only, the Word2Vec vectors
+        are dense.
+
+        Parameters:
+            modeling_name (str): The type of model to train.
+            extractor_name (str): The name of the feature extractor.
+
+        Raises:
+            ValueError: If the modeling cannot be fed by the feature extractor.
+        """
+
+        if modeling_name == "SparseNeuralNet" and extractor_name not in ["BagOfWords", "TFIDF"]:
+            raise ValueError(f"The SparseNeuralNet modeling needs the BagOfWords or TFIDF extractor, not "
+                             f"{extractor_name}; use the NeuralNet modeling with the Word2Vec vectors.")
 
     def start_training(self) -> None:
         """
         Starts the training process for the chatbot. Depending on the configuration, it either trains a BERT model or a custom model.
-        Tracks and prints training progress and loss at regular intervals.
+        Tracks and prints training progress and loss at regular intervals. The temperature of the probabilities of
+        the saved model is fitted on the patterns held out of its training.
         """
 
+        RuntimeConfig.use("training", self.__modeling_name)
         if (self.__modeling_name == "BERT"):
             BertIntentClassifier(model_name=self.__model_name, num_epochs=self.__num_epochs,
-                                 learning_rate=self.__learning_rate,batch_size=self.__batch_size).train()
+                                 learning_rate=self.__learning_rate,batch_size=self.__batch_size,
+                                 threshold=self.__threshold, calibration_split=self.__calibration_split).train()
+
+        elif self.__modeling_name == "FrozenBERT":
+            FrozenBertClassifier(model_name=self.__model_name, num_epochs=self.__num_epochs,
+                                 learning_rate=self.__learning_rate, batch_size=self.__batch_size,
+                                 hidden_size=self.__hidden_size, threshold=self.__threshold,
+                                 calibration_split=self.__calibration_split).train()
+
+        elif self.__modeling_name == "Retrieval":
+            self.__build_index()
 
         else:
             start = time.time()
-            input_size = len(self.dataset[0][0])
-            output_size = len(self.extractor.tags)
+            training_indices, calibration_indices = IntentScorer.split_calibration(
+                labels=self.dataset.y_train.tolist(), fraction=self.__calibration_split)
+            average_loss = self.__train_model(indices=training_indices)
+            self.__temperature = self.__fit_temperature(calibration_indices=calibration_indices)
+            self.__calibration_indices = calibration_indices
+            end = time.time()
+            self.__save_model(final_loss=average_loss, total_time=end - start)
 
-            self.__model = Modeling().select_model(modeling_name=self.__modeling_name, input_size=input_size,
-                                                   hidden_size=self.__hidden_size, num_classes=output_size,
-                                                   device=self.__device)
+    def __train_model(self, indices: list) -> float:
+        """
+        Trains a new model on some patterns of the dataset. Tracks and prints training progress and loss at
+        regular intervals.
 
-            train_loader = DataLoader(dataset=self.dataset, batch_size=self.__batch_size, shuffle=True, num_workers=0)
+        Parameters:
+            indices (list): The indices of the training patterns in the dataset.
 
-            criterion = nn.CrossEntropyLoss()
-            optimizer = torch.optim.Adam(self.__model.parameters(), lr=self.__learning_rate)
+        Returns:
+            float: The average loss of the last reported epochs.
+        """
 
-            report_frequency = max(1, self.__num_epochs // 10)
+        input_size = self.dataset.input_size
+        output_size = len(self.extractor.tags)
 
-            total_loss = 0
-            num_batches = 0
-            average_loss = 0
-            losses = []
-            epochs_reported = []
-            for epoch in range(self.__num_epochs):
-                for words, labels in train_loader:
-                    words = words.to(dtype=torch.float).to(self.__device)
-                    labels = labels.to(dtype=torch.long).to(self.__device)
+        self.__model = Modeling().select_model(modeling_name=self.__modeling_name, input_size=input_size,
+                                               hidden_size=self.__hidden_size, num_classes=output_size,
+                                               device=self.__device)
+
+        collate_fn = collate_sparse if self.dataset.sparse else None
+        train_loader = DataLoader(dataset=Subset(self.dataset, indices), batch_size=self.__batch_size,
+                                  shuffle=True, num_workers=0, collate_fn=collate_fn)
+
+        criterion = nn.CrossEntropyLoss()
+        optimizer = torch.optim.Adam(self.__model.parameters(), lr=self.__learning_rate)
+
+        report_frequency = max(1, self.__num_epochs // 10)
+
+        total_loss = 0
+        num_batches = 0
+        average_loss = 0
+        losses = []
+        epochs_reported = []
+        for epoch in range(self.__num_epochs):
+            for words, labels in train_loader:
+                labels = labels.to(dtype=torch.long).to(self.__device)
 
+                if self.dataset.sparse:
+                    outputs = self.__model(*(tensor.to(self.__device) for tensor in words))
+                else:
+                    words = words.to(dtype=torch.float).to(self.__device)
                     outputs = self.__model(words)
-                    loss = criterion(outputs, labels)
+                loss = criterion(outputs, labels)
 
-                    optimizer.zero_grad()
-                    loss.backward()
-                    optimizer.step()
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
 
-                    total_loss += loss.item()
-                    num_batches += 1
+                total_loss += loss.item()
+                num_batches += 1
 
-                    # Check if it's time to report
-                if (epoch + 1) % report_frequency == 0 or epoch == 0:
-                    average_loss = total_loss / num_batches
-                    losses.append(average_loss)
-                    epochs_reported.append(epoch + 1)
-                    print(f'Epoch [{epoch + 1}/{self.__num_epochs}], Average Loss: {average_loss:.4f}')
-                    total_loss = 0  # Reset total loss after reporting
-                    num_batches = 0  # Reset batch count after reporting
+                # Check if it's time to report
+            if (epoch + 1) % report_frequency == 0 or epoch == 0:
+                average_loss = total_loss / num_batches
+                losses.append(average_loss)
+                epochs_reported.append(epoch + 1)
+                print(f'Epoch [{epoch + 1}/{self.__num_epochs}], Average Loss: {average_loss:.4f}')
+                total_loss = 0  # Reset total loss after reporting
+                num_batches = 0  # Reset batch count after reporting
 
-            end = time.time()
-            # self.__save_chart(epochs_reported=epochs_reported, losses=losses)
-            self.__save_model(final_loss=average_loss, total_time=end - start)
+        # self.__save_chart(epochs_reported=epochs_reported, losses=losses)
+        return average_loss
+
+    def __build_index(self) -> None:
+        """
+        Indexes the feature vectors of all the patterns for the Retrieval modeling, which needs no training, and
+        saves them with the ModelArtifact layout. The BERT embeddings are read from the cache of the frozen encoder.
+        """
+
+        start = time.time()
+        if self.__extractor_name == "BERT":
+            with open(PathFinder.get_complet_path('ressources/json_files/intents.json'), 'r', encoding='utf-8') as file:
+                intents_data = json.load(file)
+            tags = list(dict.fromkeys(intent["tag"] for intent in intents_data["intents"]))
+            tag_indices = {tag: index for index, tag in enumerate(tags)}
+            labels = [tag_indices[intent["tag"]] for intent in intents_data["intents"] for _ in intent["patterns"]]
+            encoder = FrozenEncoder.get()
+            vectors = encoder.encode_cached([text for intent in intents_data["intents"]
+                                             for text in intent["patterns"]]).numpy()
+            vocab, idf, preprocessor_name, remove_stopwords = [], None, "None", "None"
+        else:
+            encoder = None
+            tags, vectors, labels = self.extractor.tags, self.dataset.x_train, self.dataset.y_train
+            vocab, idf = self.extractor.vocab, self.extractor.idf
+            preprocessor_name = self.extractor.preprocessor.preprocessor_name
+            remove_stopwords = self.extractor.preprocessor.remove_stopwords
+
+        classifier = RetrievalClassifier(tags=tags, k=self.__k, min_similarity=self.__min_similarity)
+        classifier.add(vectors=vectors, labels=labels)
+        manifest = {
+            "input_size": classifier.vectors.shape[1],
+            "hidden_size": None,
+            "output_size": len(tags),
+            "tags": tags,
+            "extractor": self.__extractor_name,
+            "preprocessor": preprocessor_name,
+            "remove_stopwords": remove_stopwords,
+            "modeling_name": self.__modeling_name,
+            "num_epochs": None,
+            "batch_size": None,
+            "learning_rate": None,
+            "vector_size": self.__vector_size,
+            "window": self.__window,
+            "threshold": self.__threshold,
+            "k": classifier.k,
+            "min_similarity": classifier.min_similarity,
+        }
+        if encoder is not None:
+            manifest.update({"base_model": encoder.name, "encoder_revision": encoder.revision})
+
+        file_path = ModelArtifact.save(model_name=self.__model_name,
+                                       model_state={"vectors": torch.from_numpy(classifier.vectors),
+                                                    "labels": torch.from_numpy(classifier.labels)},
+                                       manifest=manifest, vocab=vocab, idf=idf)
+        print(f'{len(classifier.labels)} patterns indexed in {time.time() - start:.2f} sec., file saved to {file_path}')
+
+    def __fit_temperature(self, calibration_indices: list) -> float:
+        """
+        Fits the temperature of the probabilities of the trained model on the held out patterns.
+
+        Parameters:
+            calibration_indices (list): The indices of the held out patterns in the dataset.
+
+        Returns:
+            float: The fitted temperature.
+        """
+
+        if not calibration_indices:
+            return IntentScorer.fit_temperature(logits=torch.zeros(0), labels=torch.zeros(0))
+
+        samples = [self.dataset[index] for index in calibration_indices]
+        self.__model.eval()
+        with torch.no_grad():
+            if self.dataset.sparse:
+                inputs, labels = collate_sparse(samples)
+                logits = self.__model(*(tensor.to(self.__device) for tensor in inputs))
+            else:
+                features = torch.from_numpy(np.stack([features for features, _ in samples])).to(dtype=torch.float)
+                labels = torch.tensor([label for _, label in samples])
+                logits = self.__model(features.to(self.__device))
+        return IntentScorer.fit_temperature(logits=logits.cpu(), labels=labels)
 
     def __save_chart(self, epochs_reported, losses):
         # Plotting the loss curve
@@ -144,21 +320,18 @@ class ChatBotTrainer:
 
     def __save_model(self, final_loss: float, total_time: float) -> None:
         """
-        Saves the trained model and configuration to a file. Additionally, prints the training summary including the final loss and total training time.
+        Saves the trained model and configuration with the ModelArtifact layout. Additionally, prints the training summary including the final loss and total training time.
 
         Parameters:
             final_loss (torch.Tensor): The loss value of the last training batch.
             total_time (float): The total time taken for the training process in seconds.
         """
 
-        data = {
-            "model_state": self.__model.state_dict(),
-            "input_size": len(self.dataset[0][0]),
+        manifest = {
+            "input_size": self.dataset.input_size,
             "hidden_size": self.__hidden_size,
             "output_size": len(self.extractor.tags),
-            "vocab": self.extractor.vocab,
             "tags": self.extractor.tags,
-            "docs": self.extractor.docs,
             "extractor": self.extractor.extractor_name,
             "preprocessor": self.extractor.preprocessor.preprocessor_name,
             "remove_stopwords": self.extractor.preprocessor.remove_stopwords,
@@ -168,10 +341,17 @@ class ChatBotTrainer:
             "learning_rate": self.__learning_rate,
             "vector_size": self.__vector_size,
             "window": self.__window,
+            "temperature": self.__temperature,
+            "threshold": self.__threshold,
         }
 
-        file_path = PathFinder.get_complet_path(f"ressources/models/{self.__model_name}.pth")
-        torch.save(data, file_path)
+        # The held out patterns are kept for the IncrementalTrainer, to fit the temperature again on unseen patterns
+        held_out = set(self.__calibration_indices)
+        corpus = [{"tag": tag, "pattern": pattern, "tokens": tokens, "held_out": index in held_out}
+                  for index, ((tag, pattern), tokens) in enumerate(zip(self.dataset.patterns, self.extractor.docs))]
+        file_path = ModelArtifact.save(model_name=self.__model_name, model_state=self.__model.state_dict(),
+                                       manifest=manifest, vocab=self.extractor.vocab, idf=self.extractor.idf,
+                                       corpus=corpus)
         print(
             f'training complete in {total_time:.2f} sec. final loss: {final_loss:.4f}, file saved to {file_path}')
 
@@ -182,42 +362,67 @@ class IntentDataset(Dataset):
 
     Attributes:
         extractor (Extractor): An instance of the Extractor class used to convert text data into features.
+        sparse (bool): Whether the features are kept in sparse form, as (indices, weights) pairs.
         x_train (numpy.array): The features extracted from the training data.
         y_train (numpy.array): The intent labels corresponding to each feature set in x_train.
+        patterns (list): The (tag, pattern) pair of each sample, in the order of x_train.
 
     """
 
-    def __init__(self, extractor: Extractor):
+    def __init__(self, extractor: Extractor, sparse: bool = False):
         """
         Initializes the dataset with a feature extractor.
 
         Parameters:
             extractor (Extractor): The feature extractor that will be used to process text data.
+            sparse (bool): Whether to keep the features in sparse form for a SparseNeuralNet. Defaults to False.
         """
 
         self.extractor = extractor
+        self.sparse = sparse
         self.x_train = []
         self.y_train = []
+        self.patterns = []
         self.load_data()
 
     def load_data(self) -> None:
         """
         Loads intent data from a JSON file and processes it using the feature extractor to populate x_train and y_train.
+        The patterns were already preprocessed, in the same order, into the docs of the corpus of the extractor, so
+        the features are computed from these docs rather than by preprocessing every pattern again.
         """
 
         file_path = PathFinder().get_complet_path('ressources/json_files/intents.json')
         with open(file_path, 'r', encoding='utf-8') as file:
             intents_data = json.load(file)
 
-        for intent in intents_data["intents"]:
-            for pattern in intent["patterns"]:
-                features = self.extractor.extract_features(pattern)
-                self.x_train.append(features)
-                self.y_train.append(self.extractor.tags.index(intent["tag"]))
-
-        self.x_train = np.array(self.x_train)
+        tag_indices = {tag: index for index, tag in enumerate(self.extractor.tags)}
+        labels = [tag_indices[intent["tag"]] for intent in intents_data["intents"] for _ in intent["patterns"]]
+        self.patterns = [(intent["tag"], pattern) for intent in intents_data["intents"]
+                         for pattern in intent["patterns"]]
+        for tokens, label in zip(self.extractor.docs, labels, strict=True):
+            if self.sparse:
+                features = self.extractor.sparse_features_from_tokens(tokens)
+            else:
+                features = self.extractor.features_from_tokens(tokens)
+            self.x_train.append(features)
+            self.y_train.append(label)
+
+        if not self.sparse:
+            self.x_train = np.array(self.x_train)
         self.y_train = np.array(self.y_train)
 
+    @property
+    def input_size(self) -> int:
+        """
+        Gives the number of input features of the model trained on this dataset.
+
+        Returns:
+            int: The size of the vocabulary for sparse features, the length of the feature vectors otherwise.
+        """
+
+        return len(self.extractor.vocab) if self.sparse else len(self.x_train[0])
+
     def __getitem__(self, index):
         """
         Retrieves a single item from the dataset.
@@ -240,3 +445,22 @@ class IntentDataset(Dataset):
         """
 
         return len(self.x_train)
+
+
+def collate_sparse(batch: list) -> tuple:
+    """
+    Merges sparse samples of an IntentDataset into the flat form expected by a SparseNeuralNet.
+
+    Parameters:
+        batch (list): The ((indices, weights), label) samples of the batch.
+
+    Returns:
+        tuple: The (indices, offsets, weights) tensors of the batch and the tensor of its labels.
+    """
+
+    lengths = [len(indices) for (indices, _), _ in batch]
+    indices = torch.from_numpy(np.concatenate([indices for (indices, _), _ in batch]))
+    weights = torch.from_numpy(np.concatenate([weights for (_, weights), _ in batch]))
+    offsets = torch.tensor([0] + lengths[:-1], dtype=torch.long).cumsum(dim=0)
+    labels = torch.tensor([label for _, label in batch])
+    return (indices, offsets, weights), labels
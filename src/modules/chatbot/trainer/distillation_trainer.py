@@ -0,0 +1,356 @@
+import json
+import random
+import re
+import time
+
+import torch
+import torch.nn.functional as F
+from torch.utils.data import DataLoader
+
+from modules.NLP.features_extractor.extractor import Extractor
+from modules.NLP.modeling.BERT import BertIntentClassifier
+from modules.NLP.modeling.intent_scorer import IntentScorer, DEFAULT_THRESHOLD
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.modeling import Modeling
+from modules.NLP.preprocessing.preprocessor import Preprocessor
+from modules.chatbot.trainer.chat_bot_trainer import collate_sparse
+from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
+
+FILLER_PREFIXES = ["please", "hey", "can you", "could you", "i want to", "so"]
+FILLER_SUFFIXES = ["please", "thanks", "now", "?"]
+# The distillation set holds several paraphrases of every pattern, so the student still sees many texts of every
+# intent when some patterns are held out, with their paraphrases, to fit its temperature
+DISTILLATION_CALIBRATION_SPLIT = 0.1
+
+
+def paraphrase(sentence: str, count: int, seed: int = 0) -> list:
+    """
+    Generates cheap paraphrases of a sentence by lowercasing it, removing its punctuation, dropping or swapping
+    words and adding filler words. They keep the intent of the sentence while showing the student model the
+    variations the users actually type.
+
+    Parameters:
+        sentence (str): The sentence to paraphrase.
+        count (int): The maximum number of paraphrases to generate.
+        seed (int): The seed of the random generator, so the same paraphrases are generated each time. Defaults to 0.
+
+    Returns:
+        list: Up to `count` distinct paraphrases, all different from the sentence.
+    """
+
+    generator = random.Random(f"{seed}:{sentence}")
+    words = re.sub(r"[^\w\s']", " ", sentence.lower()).split()
+    if not words:
+        return []
+    paraphrases = {" ".join(words)}
+
+    for _ in range(count * 4):
+        if len(paraphrases) > count:
+            break
+        new_words = list(words)
+        transformation = generator.randrange(4)
+        if transformation == 0 and len(new_words) > 2:
+            del new_words[generator.randrange(len(new_words))]
+        elif transformation == 1 and len(new_words) > 1:
+            index = generator.randrange(len(new_words) - 1)
+            new_words[index], new_words[index + 1] = new_words[index + 1], new_words[index]
+        elif transformation == 2:
+            new_words.insert(0, generator.choice(FILLER_PREFIXES))
+        else:
+            new_words.append(generator.choice(FILLER_SUFFIXES))
+        paraphrases.add(" ".join(new_words))
+
+    paraphrases.discard(sentence)
+    return sorted(paraphrases)[:count]
+
+
+class DistillationTrainer:
+    """
+    A class that distills the BERT intent classifier into a small NeuralNet (or SparseNeuralNet) student. The student
+    is trained on the patterns of intents.json and on paraphrases of them, to match the soft labels of the teacher
+    softened by a temperature, while still being pulled towards the true tags. It is saved with the ModelArtifact
+    layout, as any other NeuralNet, so the chatbot and the GUI can use it directly. The temperature of its
+    probabilities is fitted on the patterns held out of its training, with their paraphrases, and saved with its
+    threshold as for the models of the ChatBotTrainer.
+
+    Attributes:
+        __device (torch.device): The computing device (CPU or GPU) where the student is trained.
+        __teacher_name (str): The name of the BERT model used as teacher.
+        __teacher (BertIntentClassifier): The teacher, loaded when the training starts if not given.
+        __modeling_name (str): The architecture of the student, "NeuralNet" or "SparseNeuralNet".
+        __model_name (str): The name used to save the student.
+        __num_epochs (int): The number of training epochs.
+        __batch_size (int): The number of samples per training batch.
+        __learning_rate (float): The learning rate for the optimizer.
+        __hidden_size (int): The size of the hidden layers of the student.
+        __temperature (float): The temperature used to soften the logits of both models.
+        __alpha (float): The weight of the distillation loss, the true tags loss having a weight of 1 - alpha.
+        __num_paraphrases (int): The number of paraphrases generated per pattern.
+        __vector_size (int): The dimensionality of the word vectors, for the Word2Vec extractors.
+        __window (int): The context window size, for the Word2Vec extractors.
+        __threshold (float): The probability the best intent must exceed to be accepted, saved with the student.
+        __calibration_split (float): The fraction of the patterns of every intent held out, with their paraphrases,
+                                     to fit the temperature of the probabilities of the student.
+        __model (torch.nn.Module): The student model.
+        extractor (Extractor): The feature extractor of the student.
+
+    Methods:
+        start_training(): Builds the distillation set, trains the student and saves it.
+    """
+
+    def __init__(self, model_name: str, teacher_name: str = "bert_intent_classificator", extractor_name: str = "TFIDF",
+                 preprocessor_name: str = "Stemmer", remove_stopwords: bool = False, modeling_name: str = "NeuralNet",
+                 num_epochs: int = 200, batch_size: int = 32, learning_rate: float = 0.005, hidden_size: int = 64,
+                 temperature: float = 2.0, alpha: float = 0.7, num_paraphrases: int = 4, vector_size: int = None,
+                 window: int = None, teacher: BertIntentClassifier = None, threshold: float = DEFAULT_THRESHOLD,
+                 calibration_split: float = DISTILLATION_CALIBRATION_SPLIT):
+        """
+        Initializes the DistillationTrainer with the configuration of the student and of the distillation.
+
+        Parameters:
+            model_name (str): The name used to save the student.
+            teacher_name (str): The name of the BERT model used as teacher.
+            extractor_name (str): The feature extractor of the student.
+            preprocessor_name (str): The preprocessor of the student.
+            remove_stopwords (bool): Whether the student removes the stopwords.
+            modeling_name (str): The architecture of the student, "NeuralNet" or "SparseNeuralNet".
+            num_epochs (int): The number of training epochs.
+            batch_size (int): The number of samples per training batch.
+            learning_rate (float): The learning rate for the optimizer.
+            hidden_size (int): The size of the hidden layers of the student.
+            temperature (float): The temperature used to soften the logits of both models.
+            alpha (float): The weight of the distillation loss against the true tags loss.
+            num_paraphrases (int): The number of paraphrases generated per pattern.
+            vector_size (int): The dimensionality of the word vectors, for the Word2Vec extractors.
+            window (int): The context window size, for the Word2Vec extractors.
+            teacher (BertIntentClassifier, optional): An already loaded teacher, with the predict_logits method and
+                                                      the intents property.
+            threshold (float): The probability the best intent must exceed to be accepted by the student. Defaults
+                               to DEFAULT_THRESHOLD.
+            calibration_split (float): The fraction of the patterns of every intent held out of the training, with
+                                       their paraphrases, to fit the temperature of the student. Defaults to
+                                       DISTILLATION_CALIBRATION_SPLIT, 0 trains the student on every pattern with
+                                       the default temperature.
+        """
+
+        self.__device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.__teacher_name = teacher_name
+        self.__teacher = teacher
+        self.__modeling_name = modeling_name
+        self.__model_name = model_name
+        self.__num_epochs = num_epochs
+        self.__batch_size = batch_size
+        self.__learning_rate = learning_rate
+        self.__hidden_size = hidden_size
+        self.__temperature = temperature
+        self.__alpha = alpha
+        self.__num_paraphrases = num_paraphrases
+        self.__vector_size = vector_size
+        self.__window = window
+        self.__threshold = threshold
+        self.__calibration_split = calibration_split
+        self.__model = None
+
+        preprocessor = Preprocessor(preprocessor_name, remove_stopwords)
+        self.extractor = Extractor(preprocessor=preprocessor, extractor_name=extractor_name,
+                                   vector_size=vector_size, window=window, model_name=model_name, is_training=True)
+
+    def start_training(self) -> None:
+        """
+        Builds the distillation set, scores it with the teacher, trains the student, fits its temperature on the
+        held out patterns and saves it.
+        """
+
+        RuntimeConfig.use("training", self.__modeling_name)
+        start = time.time()
+        texts, labels, groups = self.__load_texts()
+
+        if self.__teacher is None:
+            self.__teacher = BertIntentClassifier(model_name=self.__teacher_name)
+            self.__teacher.load_model()
+        # Reorder the outputs of the teacher to follow the tags of the student
+        order = [self.__teacher.intents.index(tag) for tag in self.extractor.tags]
+        teacher_logits = torch.from_numpy(self.__teacher.predict_logits(texts)[:, order]).to(dtype=torch.float)
+        soft_labels = torch.softmax(teacher_logits / self.__temperature, dim=1)
+
+        sparse = self.__modeling_name == "SparseNeuralNet"
+        if sparse:
+            input_size = len(self.extractor.vocab)
+            features = [self.extractor.extract_sparse_features(text) for text in texts]
+        else:
+            features = self.extractor.extract_batch_features(texts)
+            input_size = features.shape[1]
+        samples = [(features[index], (soft_labels[index], labels[index])) for index in range(len(texts))]
+
+        # A pattern is held out with its paraphrases, which would otherwise be nearly seen texts
+        pattern_labels = [labels[groups.index(group)] for group in range(groups[-1] + 1)] if groups else []
+        _, calibration_groups = IntentScorer.split_calibration(labels=pattern_labels,
+                                                               fraction=self.__calibration_split)
+        calibration_groups = set(calibration_groups)
+        calibration_indices = [index for index, group in enumerate(groups) if group in calibration_groups]
+        training_samples = [sample for sample, group in zip(samples, groups) if group not in calibration_groups]
+
+        self.__model = Modeling.select_model(modeling_name=self.__modeling_name, input_size=input_size,
+                                             hidden_size=self.__hidden_size, num_classes=len(self.extractor.tags),
+                                             device=self.__device)
+        train_loader = DataLoader(dataset=training_samples, batch_size=self.__batch_size, shuffle=True,
+                                  collate_fn=self.__collate_sparse if sparse else None)
+        optimizer = torch.optim.Adam(self.__model.parameters(), lr=self.__learning_rate)
+
+        report_frequency = max(1, self.__num_epochs // 10)
+        average_loss = 0
+        for epoch in range(self.__num_epochs):
+            total_loss = 0
+            num_batches = 0
+            for words, (batch_soft_labels, batch_labels) in train_loader:
+                if sparse:
+                    outputs = self.__model(*(tensor.to(self.__device) for tensor in words))
+                else:
+                    outputs = self.__model(words.to(dtype=torch.float).to(self.__device))
+                loss = self.__loss(outputs=outputs, soft_labels=batch_soft_labels.to(self.__device),
+                                   labels=batch_labels.to(dtype=torch.long).to(self.__device))
+
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+                total_loss += loss.item()
+                num_batches += 1
+
+            average_loss = total_loss / num_batches
+            if (epoch + 1) % report_frequency == 0 or epoch == 0:
+                print(f'Epoch [{epoch + 1}/{self.__num_epochs}], Average Loss: {average_loss:.4f}')
+
+        temperature = self.__fit_temperature(features=features, labels=labels, indices=calibration_indices,
+                                             sparse=sparse)
+        self.__save_model(input_size=input_size, num_texts=len(texts), temperature=temperature,
+                          final_loss=average_loss, total_time=time.time() - start)
+
+    def __fit_temperature(self, features, labels: list, indices: list, sparse: bool) -> float:
+        """
+        Fits the temperature of the probabilities of the trained student on the held out texts.
+
+        Parameters:
+            features (np.ndarray | list): The features of every text, in sparse form for a SparseNeuralNet.
+            labels (list): The index of the true tag of every text.
+            indices (list): The indices of the held out texts.
+            sparse (bool): Whether the features are in sparse form.
+
+        Returns:
+            float: The fitted temperature, or DEFAULT_TEMPERATURE if no text is held out.
+        """
+
+        if not indices:
+            return IntentScorer.fit_temperature(logits=torch.zeros(0), labels=torch.zeros(0))
+
+        self.__model.eval()
+        with torch.no_grad():
+            if sparse:
+                inputs, _ = collate_sparse([(features[index], labels[index]) for index in indices])
+                logits = self.__model(*(tensor.to(self.__device) for tensor in inputs))
+            else:
+                logits = self.__model(torch.from_numpy(features[indices]).to(dtype=torch.float).to(self.__device))
+        return IntentScorer.fit_temperature(logits=logits.cpu(), labels=torch.tensor([labels[index]
+                                                                                     for index in indices]))
+
+    def __load_texts(self) -> tuple[list, list, list]:
+        """
+        Loads the patterns of intents.json and generates their paraphrases.
+
+        Returns:
+            tuple[list, list, list]: The texts of the distillation set, the index of their true tag and the index
+                                     of the pattern they come from.
+        """
+
+        file_path = PathFinder.get_complet_path('ressources/json_files/intents.json')
+        with open(file_path, 'r', encoding='utf-8') as file:
+            intents_data = json.load(file)
+
+        texts = []
+        labels = []
+        groups = []
+        patterns = [(intent["tag"], pattern) for intent in intents_data["intents"] for pattern in intent["patterns"]]
+        for group, (tag, pattern) in enumerate(patterns):
+            label = self.extractor.tags.index(tag)
+            for text in [pattern, *paraphrase(pattern, count=self.__num_paraphrases)]:
+                texts.append(text)
+                labels.append(label)
+                groups.append(group)
+        return texts, labels, groups
+
+    def __loss(self, outputs: torch.Tensor, soft_labels: torch.Tensor, labels: torch.Tensor) -> torch.Tensor:
+        """
+        Computes the distillation loss: the Kullback-Leibler divergence between the softened outputs of the student
+        and the soft labels of the teacher, scaled by the squared temperature to keep its gradients comparable, mixed
+        with the cross entropy against the true tags.
+
+        Parameters:
+            outputs (torch.Tensor): The logits of the student.
+            soft_labels (torch.Tensor): The probabilities of the teacher at the distillation temperature.
+            labels (torch.Tensor): The index of the true tags.
+
+        Returns:
+            torch.Tensor: The loss of the batch.
+        """
+
+        distillation_loss = F.kl_div(F.log_softmax(outputs / self.__temperature, dim=1), soft_labels,
+                                     reduction="batchmean") * self.__temperature ** 2
+        return self.__alpha * distillation_loss + (1 - self.__alpha) * F.cross_entropy(outputs, labels)
+
+    @staticmethod
+    def __collate_sparse(batch: list) -> tuple:
+        """
+        Merges sparse samples into the flat form expected by a SparseNeuralNet, keeping the soft labels along the
+        true tags.
+
+        Parameters:
+            batch (list): The (features, (soft_labels, label)) samples of the batch.
+
+        Returns:
+            tuple: The (indices, offsets, weights) tensors of the batch and its (soft_labels, labels) tensors.
+        """
+
+        words, labels = collate_sparse([(features, label) for features, (_, label) in batch])
+        return words, (torch.stack([soft_labels for _, (soft_labels, _) in batch]), labels)
+
+    def __save_model(self, input_size: int, num_texts: int, temperature: float, final_loss: float,
+                     total_time: float) -> None:
+        """
+        Saves the student with the ModelArtifact layout, the distillation settings being added to its manifest.
+
+        Parameters:
+            input_size (int): The number of input features of the student.
+            num_texts (int): The number of texts of the distillation set.
+            temperature (float): The temperature of the probabilities of the student, fitted on the held out texts.
+            final_loss (float): The average loss of the last epoch.
+            total_time (float): The total time taken for the distillation in seconds.
+        """
+
+        manifest = {
+            "input_size": input_size,
+            "hidden_size": self.__hidden_size,
+            "output_size": len(self.extractor.tags),
+            "tags": self.extractor.tags,
+            "extractor": self.extractor.extractor_name,
+            "preprocessor": self.extractor.preprocessor.preprocessor_name,
+            "remove_stopwords": self.extractor.preprocessor.remove_stopwords,
+            "modeling_name": self.__modeling_name,
+            "num_epochs": self.__num_epochs,
+            "batch_size": self.__batch_size,
+            "learning_rate": self.__learning_rate,
+            "vector_size": self.__vector_size,
+            "window": self.__window,
+            "temperature": temperature,
+            "threshold": self.__threshold,
+            "distillation": {
+                "teacher": self.__teacher_name,
+                "temperature": self.__temperature,
+                "alpha": self.__alpha,
+                "num_paraphrases": self.__num_paraphrases,
+                "num_texts": num_texts,
+            },
+        }
+
+        file_path = ModelArtifact.save(model_name=self.__model_name, model_state=self.__model.state_dict(),
+                                       manifest=manifest, vocab=self.extractor.vocab, idf=self.extractor.idf)
+        print(f'distillation complete in {total_time:.2f} sec. final loss: {final_loss:.4f}, file saved to {file_path}')
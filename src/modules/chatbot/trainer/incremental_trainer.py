@@ -0,0 +1,252 @@
+import json
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+from modules.NLP.features_extractor.extractor import Extractor
+from modules.NLP.features_extractor.tf_idf import TFIDF
+from modules.NLP.modeling.intent_scorer import IntentScorer, DEFAULT_TEMPERATURE
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.modeling import Modeling
+from modules.NLP.preprocessing.preprocessor import Preprocessor
+from modules.chatbot.trainer.chat_bot_trainer import collate_sparse
+from utilities.path_finder import PathFinder
+from utilities.runtime_config import RuntimeConfig
+
+INTENTS_FILE = "ressources/json_files/intents.json"
+INCREMENTAL_EPOCHS = 20
+
+
+class IncrementalTrainer:
+    """
+    A class that updates a trained NeuralNet (or SparseNeuralNet) model after an edit of intents.json, instead of
+    training it again from scratch. The intents file is compared with the snapshot of the corpus saved with the
+    model: only the new patterns are preprocessed, the vocabulary and the output layer are extended, keeping the
+    trained weights of the known words and intents, and the model is fine-tuned for a few epochs.
+
+    The new words get null input weights, so the network computes the same outputs as before for the known patterns
+    until the fine-tuning; the new intents get freshly initialized output weights. The Word2Vec vectors are not
+    trained again: the new words they do not know are ignored, as for any unknown word.
+
+    The patterns held out of the training to fit the temperature stay held out of the fine-tuning, and the
+    temperature is fitted again on them. A model trained without held out patterns keeps its temperature.
+
+    Attributes:
+        __model_name (str): The name of the model to update, saved with the ModelArtifact layout.
+        __num_epochs (int): The number of epochs of the fine-tuning.
+        __learning_rate (float): The learning rate of the fine-tuning, the one of the training by default.
+        __batch_size (int): The batch size of the fine-tuning, the one of the training by default.
+        __intents_file (str): The intents file, relative to the project.
+
+    Methods:
+        diff(corpus, intents_data): Compares the snapshot of a corpus with an intents file.
+        grow_state(model_state, input_size, tag_positions, new_state): Extends the weights of a trained network.
+        train(): Updates the model with the changes of the intents file.
+    """
+
+    def __init__(self, model_name: str, num_epochs: int = INCREMENTAL_EPOCHS, learning_rate: float = None,
+                 batch_size: int = None, intents_file: str = INTENTS_FILE):
+        """
+        Initializes the IncrementalTrainer.
+
+        Parameters:
+            model_name (str): The name of the model to update, with or without the legacy .pth extension.
+            num_epochs (int): The number of epochs of the fine-tuning. Defaults to INCREMENTAL_EPOCHS.
+            learning_rate (float): The learning rate of the fine-tuning. Defaults to the one of the training.
+            batch_size (int): The batch size of the fine-tuning. Defaults to the one of the training.
+            intents_file (str): The intents file, relative to the project. Defaults to INTENTS_FILE.
+        """
+        self.__model_name = model_name
+        self.__num_epochs = num_epochs
+        self.__learning_rate = learning_rate
+        self.__batch_size = batch_size
+        self.__intents_file = intents_file
+
+    @staticmethod
+    def diff(corpus: list, intents_data: dict) -> dict:
+        """
+        Compares the snapshot of the corpus a model was trained on with the content of an intents file.
+
+        Parameters:
+            corpus (list): The "tag" and "pattern" of every pattern the model was trained on.
+            intents_data (dict): The content of the intents file.
+
+        Returns:
+            dict: The "added_intents" and "removed_intents" tags, and the "added_patterns" and "removed_patterns"
+                  (tag, pattern) pairs.
+        """
+        old_patterns = {(sample["tag"], sample["pattern"]) for sample in corpus}
+        new_patterns = {(intent["tag"], pattern)
+                        for intent in intents_data["intents"] for pattern in intent["patterns"]}
+        old_tags = list(dict.fromkeys(sample["tag"] for sample in corpus))
+        new_tags = [intent["tag"] for intent in intents_data["intents"]]
+        return {"added_intents": [tag for tag in new_tags if tag not in old_tags],
+                "removed_intents": [tag for tag in old_tags if tag not in new_tags],
+                "added_patterns": sorted(new_patterns - old_patterns),
+                "removed_patterns": sorted(old_patterns - new_patterns)}
+
+    @staticmethod
+    def grow_state(model_state: dict, input_size: int, tag_positions: list, new_state: dict) -> dict:
+        """
+        Extends the weights of a trained network to a larger vocabulary and to other intents. The weights of the
+        known words, the first `input_size` columns of l1, are kept, the ones of the new words are null; the output
+        rows of l3 of the intents still present are kept, those of the new intents are taken from new_state.
+
+        Parameters:
+            model_state (dict): The state dict of the trained network, in the layout of nn.Linear.
+            input_size (int): The input size of the trained network.
+            tag_positions (list): For every intent of the new network, its position in the outputs of the trained
+                                  network, or None for a new intent.
+            new_state (dict): The freshly initialized state dict of the new network.
+
+        Returns:
+            dict: The state dict of the new network.
+        """
+        state = {name: tensor.clone() for name, tensor in new_state.items()}
+        state["l1.weight"].zero_()
+        state["l1.weight"][:, :input_size] = model_state["l1.weight"]
+        state["l1.bias"] = model_state["l1.bias"].clone()
+        state["l2.weight"] = model_state["l2.weight"].clone()
+        state["l2.bias"] = model_state["l2.bias"].clone()
+        for position, old_position in enumerate(tag_positions):
+            if old_position is not None:
+                state["l3.weight"][position] = model_state["l3.weight"][old_position]
+                state["l3.bias"][position] = model_state["l3.bias"][old_position]
+        return state
+
+    def train(self) -> dict:
+        """
+        Updates the model with the changes of the intents file, and saves it with the new snapshot of the corpus.
+
+        Returns:
+            dict: The diff of the intents file against the previous snapshot, see diff, with the "duration" of the
+                  update in seconds. Nothing is trained when the intents file did not change.
+
+        Raises:
+            ValueError: If the model was not saved with the snapshot of its corpus, or is not a NeuralNet.
+        """
+        RuntimeConfig.use("training", "NeuralNet")
+        start = time.time()
+        if not ModelArtifact.exists(self.__model_name):
+            raise ValueError(f"The model {self.__model_name} has no corpus snapshot, train it again with the "
+                             f"ChatBotTrainer to update it incrementally.")
+        data = ModelArtifact.load(model_name=self.__model_name, device=torch.device("cpu"))
+        if data["corpus"] is None or data["modeling_name"] not in ["NeuralNet", "SparseNeuralNet"]:
+            raise ValueError(f"The {data['modeling_name']} model {self.__model_name} has no corpus snapshot, "
+                             f"train it again with the ChatBotTrainer to update it incrementally.")
+
+        with open(PathFinder.get_complet_path(self.__intents_file), "r", encoding="utf-8") as file:
+            intents_data = json.load(file)
+        changes = IncrementalTrainer.diff(corpus=data["corpus"], intents_data=intents_data)
+        if not any(changes.values()):
+            return {**changes, "duration": time.time() - start}
+
+        # Only the new patterns are preprocessed, the tokens of the others are read from the snapshot
+        known_tokens = {(sample["tag"], sample["pattern"]): sample["tokens"] for sample in data["corpus"]}
+        patterns = [(intent["tag"], pattern) for intent in intents_data["intents"] for pattern in intent["patterns"]]
+        preprocessor = Preprocessor(preprocessor_name=data["preprocessor"], remove_stopwords=data["remove_stopwords"])
+        new_tokens = iter(preprocessor.preprocess_corpus([pattern for tag, pattern in patterns
+                                                          if (tag, pattern) not in known_tokens]))
+        docs = [known_tokens[pattern] if pattern in known_tokens else next(new_tokens) for pattern in patterns]
+
+        tags = [intent["tag"] for intent in intents_data["intents"]]
+        vocab = list(dict.fromkeys(data["vocab"] + [word for doc in docs for word in doc]))
+        idf = TFIDF.compute_idf(vocab=vocab, docs=docs) if data["extractor"] == "TFIDF" else None
+        extractor = Extractor(preprocessor=preprocessor, extractor_name=data["extractor"], vocab=vocab, tags=tags,
+                              docs=docs, window=data["window"], vector_size=data["vector_size"],
+                              model_name=self.__model_name, idf=idf)
+        input_size = len(vocab) if data["extractor"] in ["BagOfWords", "TFIDF"] else data["input_size"]
+
+        model = Modeling.select_model(modeling_name=data["modeling_name"], input_size=input_size,
+                                      hidden_size=data["hidden_size"], num_classes=len(tags),
+                                      device=torch.device("cpu"))
+        tag_positions = [data["tags"].index(tag) if tag in data["tags"] else None for tag in tags]
+        model.load_state_dict(IncrementalTrainer.grow_state(model_state=data["model_state"],
+                                                            input_size=data["input_size"],
+                                                            tag_positions=tag_positions,
+                                                            new_state=model.state_dict()))
+
+        tag_indices = {tag: index for index, tag in enumerate(tags)}
+        labels = [tag_indices[tag] for tag, _ in patterns]
+        sparse = data["modeling_name"] == "SparseNeuralNet"
+        if sparse:
+            samples = [(extractor.sparse_features_from_tokens(doc), label) for doc, label in zip(docs, labels)]
+        else:
+            samples = [(extractor.features_from_tokens(doc).astype(np.float32), label)
+                       for doc, label in zip(docs, labels)]
+
+        held_out_patterns = {(sample["tag"], sample["pattern"]) for sample in data["corpus"] if sample.get("held_out")}
+        held_out = [pattern in held_out_patterns for pattern in patterns]
+        temperature = self.__fine_tune(model=model, samples=samples, held_out=held_out, sparse=sparse,
+                                       learning_rate=self.__learning_rate or data["learning_rate"],
+                                       batch_size=self.__batch_size or data["batch_size"],
+                                       temperature=data.get("temperature", DEFAULT_TEMPERATURE))
+
+        manifest = {key: value for key, value in data.items()
+                    if key not in ["model_state", "vocab", "idf", "corpus", "format_version"]}
+        manifest.update({"input_size": input_size, "output_size": len(tags), "tags": tags,
+                         "temperature": temperature})
+        corpus = [{"tag": tag, "pattern": pattern, "tokens": doc, "held_out": is_held_out}
+                  for (tag, pattern), doc, is_held_out in zip(patterns, docs, held_out)]
+        ModelArtifact.save(model_name=self.__model_name, model_state=model.state_dict(), manifest=manifest,
+                           vocab=vocab, idf=idf, corpus=corpus)
+
+        changes["duration"] = time.time() - start
+        print(f"{len(changes['added_patterns'])} patterns added and {len(changes['removed_patterns'])} removed, "
+              f"model {self.__model_name} updated in {changes['duration']:.2f} sec.")
+        return changes
+
+    def __fine_tune(self, model: nn.Module, samples: list, held_out: list, sparse: bool, learning_rate: float,
+                    batch_size: int, temperature: float) -> float:
+        """
+        Fine-tunes the extended network on all the patterns but the ones held out of the training of the model,
+        so every added pattern is learned, then fits the temperature of its probabilities on the held out patterns,
+        which the network never saw.
+
+        Parameters:
+            model (nn.Module): The extended network.
+            samples (list): The (features, label) pair of every pattern.
+            held_out (list): Whether every pattern was held out of the training of the model.
+            sparse (bool): Whether the features are in sparse form, for a SparseNeuralNet.
+            learning_rate (float): The learning rate of the optimizer.
+            batch_size (int): The number of patterns of a batch.
+            temperature (float): The temperature of the model, kept when no pattern is held out.
+
+        Returns:
+            float: The fitted temperature, or the given one when no pattern is held out.
+        """
+        calibration_indices = [index for index, is_held_out in enumerate(held_out) if is_held_out]
+        training_indices = [index for index, is_held_out in enumerate(held_out) if not is_held_out]
+        collate_fn = collate_sparse if sparse else None
+        loader = DataLoader(dataset=[samples[index] for index in training_indices], batch_size=batch_size,
+                            shuffle=True, collate_fn=collate_fn)
+        criterion = nn.CrossEntropyLoss()
+        optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+
+        model.train()
+        for _ in range(self.__num_epochs):
+            for features, labels in loader:
+                outputs = model(*features) if sparse else model(features)
+                loss = criterion(outputs, labels.long())
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+
+        model.eval()
+        if not calibration_indices:
+            return temperature
+        features, labels = (collate_sparse if sparse else _collate_dense)([samples[index]
+                                                                           for index in calibration_indices])
+        with torch.no_grad():
+            logits = model(*features) if sparse else model(features)
+        return IntentScorer.fit_temperature(logits=logits, labels=labels)
+
+
+def _collate_dense(batch: list) -> tuple:
+    """
+    Merges dense (features, label) samples into the tensor of their features and the tensor of their labels.
+    """
+    return torch.from_numpy(np.stack([features for features, _ in batch])), torch.tensor([label for _, label in batch])
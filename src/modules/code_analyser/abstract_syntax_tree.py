@@ -18,7 +18,7 @@ class AbstractSyntaxTree:
         __languages (dict): A dictionary mapping language names to tree_sitter Language objects.
 
     Methods:
-        parse(source_code, language): Parses the source code in the specified language into an AST.
+        parse(source_code, language, timeout_micros): Parses the source code in the specified language into an AST.
     """
 
     def __init__(self):
@@ -31,19 +31,30 @@ class AbstractSyntaxTree:
         for language in AVAILABLE_LANGUAGE:
             self.__languages[language] = Language(path_or_ptr=OUTPUT_PATH, name=language)
 
-    def parse(self, source_code: str, language: str) -> Tree:
+    def parse(self, source_code: str, language: str, timeout_micros: int = 0) -> Tree:
         """
         Parses the given source code into an abstract syntax tree.
 
         Parameters:
             source_code (str): The source code to parse.
             language (str): The programming language of the source code. Must be one of the supported languages.
+            timeout_micros (int, optional): The duration in microseconds after which the parsing is halted, 0 for no
+                                            limit. Defaults to 0.
 
         Returns:
             Tree: An abstract syntax tree of the parsed source code.
+
+        Raises:
+            TimeoutError: If the parsing took longer than timeout_micros.
         """
         self.__parser.set_language(self.__languages[language])
-        tree = self.__parser.parse(bytes(source_code, "utf-8"))
+        self.__parser.set_timeout_micros(timeout_micros)
+        try:
+            tree = self.__parser.parse(bytes(source_code, "utf-8"))
+        except ValueError:
+            # A halted parser resumes its parse on the next call unless it is reset
+            self.__parser.reset()
+            raise TimeoutError(f"Parsing the {language} code took more than {timeout_micros} microseconds")
         return tree
 
     def __initialize_library(self) -> None:
@@ -1,10 +1,13 @@
 import re
+from collections import deque
 from typing import Tuple
 
 from tree_sitter import Tree, Node
 
+TRUNCATION_NOTICE = "I stopped after {} recommendations, there may be more."
 
-def describe_clean_code_problems(syntax_tree: Tree, language: str) -> list | str:
+
+def describe_clean_code_problems(syntax_tree: Tree, language: str, max_findings: int = None) -> list | str:
     """
     Analyzes a syntax tree for common clean code issues such as naming conventions,
     function length, and other coding best practices based on the specified programming language.
@@ -12,58 +15,64 @@ def describe_clean_code_problems(syntax_tree: Tree, language: str) -> list | str
     Parameters:
         syntax_tree (Tree): A tree_sitter Tree object representing the syntax tree of the source code.
         language (str): The programming language of the source code (e.g., 'Python', 'Java', 'C').
+        max_findings (int, optional): The number of issues after which the walk of the tree stops, None for no
+                                      limit. When it is reached, the descriptions end with a truncation notice.
+                                      Defaults to None.
     Returns:
         list | str: A list of descriptions detailing each identified issue or a string indicating no issues found.
     """
     descriptions = set()
-    todo = [syntax_tree.root_node]
-    while todo:
-        node = todo.pop(0)
+    truncated = False
+    todo = deque([syntax_tree.root_node])
+    while todo and not truncated:
+        node = todo.popleft()
         for child in node.named_children:
+            new_descriptions = []
 
             if (child.type == "function_declarator"):
                 new_descriptions = [
                     __function_namming_convention(node=child.child_by_field_name("declarator"),
                                                   language=language),
-                    __function_length(node=child.parent),
+                    __function_length(node=node),
                     __function_parameter_count(node=child.child_by_field_name("parameters"))]
-                for new_description in new_descriptions:
-                    if new_description != "":
-                        descriptions.add(new_description)
 
             elif (child.type in ["identifier", "field_identifier"]):
-                if (child.parent.type not in ["call_expression", "function_declarator", "field_expression",
-                                              "argument_list"]):
+                # node is the parent of child, which tree-sitter would look up from the root for child.parent
+                if (node.type not in ["call_expression", "function_declarator", "field_expression",
+                                      "argument_list"]):
                     new_descriptions = [
                         __variable_namming_convention(node=child, language=language),
                         __namming_length(node=child)]
-                    for new_description in new_descriptions:
-                        if new_description != "":
-                            descriptions.add(new_description)
 
             elif (child.type == "class_declaration"):
                 new_descriptions = [__class_namming_convention(node=child.child_by_field_name("name")),
                                     __namming_length(node=child.child_by_field_name("name"))]
-                for new_description in new_descriptions:
-                    if new_description != "":
-                        descriptions.add(new_description)
 
             elif (child.type == "struct_specifier"):
                 new_descriptions = [
                     __struct_namming_convention(node=child.child_by_field_name("name")),
                     __namming_length(node=child.child_by_field_name("name"))]
-                for new_description in new_descriptions:
-                    if new_description != "":
-                        descriptions.add(new_description)
+
+            for new_description in new_descriptions:
+                if new_description != "" and new_description not in descriptions:
+                    # A new issue beyond the limit: the rest of the tree is not walked
+                    if max_findings is not None and len(descriptions) >= max_findings:
+                        truncated = True
+                        break
+                    descriptions.add(new_description)
+            if truncated:
+                break
 
             todo.append(child)
 
-    if descriptions == set():
+    if descriptions == set() and not truncated:
         return "I have not recommendation to give for the clean code"
 
     sorted_tuples = sorted(descriptions, key=lambda x: x[0])
 
     sorted_texts = [text for _, text in sorted_tuples]
+    if truncated:
+        sorted_texts.append(TRUNCATION_NOTICE.format(max_findings))
     return ["Here is all the recommendation for the clean code", list(sorted_texts)]
 
 
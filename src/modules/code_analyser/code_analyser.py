@@ -1,9 +1,14 @@
 from typing import List
 
-from modules.code_analyser.abstract_syntax_tree import AbstractSyntaxTree
+from modules.code_analyser.abstract_syntax_tree import AbstractSyntaxTree, AVAILABLE_LANGUAGE
 from modules.code_analyser.clean_code_analyser import describe_clean_code_problems
+from modules.code_analyser.language_detector import LanguageDetector
 from modules.code_analyser.syntax_analyser import find_syntax_problem
 
+# The limits keep the analysis of a huge or pathological paste from stalling the thread serving the request
+MAX_CODE_BYTES = 100_000
+PARSE_TIMEOUT_MICROS = 500_000
+MAX_FINDINGS = 50
 
 class CodeAnalyser:
     """
@@ -11,16 +16,37 @@ class CodeAnalyser:
 
     Attributes:
         syntax_tree (AbstractSyntaxTree): An instance of AbstractSyntaxTree used for parsing code into a syntax tree.
+        language_detector (LanguageDetector): Guesses the language of the code when the user did not specify it.
+        max_code_bytes (int): The size of the code in UTF-8 bytes above which it is not analysed.
+        parse_timeout_micros (int): The duration in microseconds after which the parsing of the code is halted, 0
+                                    for no limit.
+        max_findings (int): The number of problems reported at most by each analysis, None for no limit.
 
     Methods:
         analyse(code, language, mode): Analyzes the given code in the specified language and mode.
     """
 
-    def __init__(self):
+    def __init__(self, max_code_bytes: int = MAX_CODE_BYTES, parse_timeout_micros: int = PARSE_TIMEOUT_MICROS,
+                 max_findings: int = MAX_FINDINGS):
         """
         Initializes the CodeAnalyser class by creating an instance of AbstractSyntaxTree.
+
+        Parameters:
+            max_code_bytes (int, optional): The size of the code in UTF-8 bytes above which it is not analysed.
+                                            Defaults to MAX_CODE_BYTES.
+            parse_timeout_micros (int, optional): The duration in microseconds after which the parsing of the code,
+                                                  with each grammar tried to detect its language too, is halted, 0
+                                                  for no limit. Defaults to PARSE_TIMEOUT_MICROS.
+            max_findings (int, optional): The number of problems reported at most by the syntax analysis and by the
+                                          clean code analysis, which stop walking the tree once it is reached, None
+                                          for no limit. Defaults to MAX_FINDINGS.
         """
         self.syntax_tree = AbstractSyntaxTree()
+        self.language_detector = LanguageDetector(syntax_tree=self.syntax_tree,
+                                                  parse_timeout_micros=parse_timeout_micros)
+        self.max_code_bytes = max_code_bytes
+        self.parse_timeout_micros = parse_timeout_micros
+        self.max_findings = max_findings
 
     def analyse(self, code: str, language: str, mode: str = "both") -> str | list[str]:
         """
@@ -29,25 +55,42 @@ class CodeAnalyser:
         Parameters:
             code (str): The source code to analyze.
             language (str): The programming language of the source code. Currently supported languages are 'java', 'python', and 'c'.
+                            If empty or None, the language is detected automatically from the code.
             mode (str, optional): The mode of analysis to perform. Can be 'both' for both syntax and clean code analysis,
                                   'S' for only syntax analysis, or 'C' for only clean code analysis. Defaults to 'both'.
 
         Returns:
             list: A list containing results from the analysis. Each element can be a detailed description of problems found,
-                  or a message indicating unrecognized language or other errors.
+                  or a message indicating unrecognized language or other errors. The descriptions end with a notice
+                  when they were truncated to max_findings, and with a message instead when the parsing timed out.
+            str: A message indicating that the code is too long or the language unrecognized.
         """
+        if code and len(code.encode("utf-8")) > self.max_code_bytes:
+            return (f"I'm really sorry but your code is too long for me, i can only analyse up to "
+                    f"{self.max_code_bytes // 1000} kB of code")
+
         descriptions = []
-        if language in ["java", "python", "c"]:
-            tree = self.syntax_tree.parse(code, language)
+        if not language:
+            language = self.language_detector.detect(code=code)
+            if language is not None:
+                descriptions.append(f"You did not tell me the language, it looks like {language} code.")
+
+        if language in AVAILABLE_LANGUAGE:
+            try:
+                tree = self.syntax_tree.parse(code, language, timeout_micros=self.parse_timeout_micros)
+            except TimeoutError:
+                descriptions.append("I'm really sorry but your code took me too long to read, try to send me a "
+                                    "smaller part of it")
+                return descriptions
             if (mode == "both" or mode == "S"):
-                output = find_syntax_problem(tree, describe_problem=True)
+                output = find_syntax_problem(tree, describe_problem=True, max_findings=self.max_findings)
                 if (isinstance(output, str)):
                     descriptions.append(output)
                 else:
                     descriptions.append(output)
 
             if (mode == "both" or mode == "C"):
-                output = describe_clean_code_problems(tree, language)
+                output = describe_clean_code_problems(tree, language, max_findings=self.max_findings)
                 if (isinstance(output, str)):
                     descriptions.append(output)
                 else:
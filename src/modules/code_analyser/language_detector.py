@@ -0,0 +1,132 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from tree_sitter import Tree
+
+from modules.code_analyser.abstract_syntax_tree import AbstractSyntaxTree, AVAILABLE_LANGUAGE
+
+CACHE_SIZE = 256
+
+
+class LanguageDetector:
+    """
+    A class that guesses the programming language of a code snippet by parsing it with every loaded tree-sitter
+    grammar and keeping the grammar that produces the lowest density of ERROR and MISSING nodes. The grammars are
+    tried one after the other: tree-sitter holds the GIL while parsing, so a thread pool would only add overhead.
+
+    The verdicts are cached per code hash at the class level, because a new CodeAnalyser (and thus a new detector)
+    is created for every chatbot request.
+
+    Attributes:
+        __syntax_tree (AbstractSyntaxTree): The parser wrapper holding the loaded tree-sitter grammars.
+        __parse_timeout_micros (int): The duration in microseconds after which the parsing with a grammar is halted,
+                                      0 for no limit.
+        __cache (OrderedDict): A bounded mapping of code hashes to their detected language, shared by all instances.
+        __cache_lock (threading.Lock): A lock protecting the cache against concurrent Flask threads.
+
+    Methods:
+        detect(code): Returns the most likely language of the given code, or None if the code is empty.
+    """
+
+    __cache = OrderedDict()
+    __cache_lock = threading.Lock()
+
+    def __init__(self, syntax_tree: AbstractSyntaxTree, parse_timeout_micros: int = 0):
+        """
+        Initializes the LanguageDetector with the parser wrapper to use.
+
+        Parameters:
+            syntax_tree (AbstractSyntaxTree): The parser wrapper holding the loaded tree-sitter grammars.
+            parse_timeout_micros (int, optional): The duration in microseconds after which the parsing with a grammar
+                                                  is halted, 0 for no limit. Defaults to 0.
+        """
+        self.__syntax_tree = syntax_tree
+        self.__parse_timeout_micros = parse_timeout_micros
+
+    def detect(self, code: str) -> str | None:
+        """
+        Detects the programming language of the given code, using the cached verdict when the same code was
+        already analysed.
+
+        Parameters:
+            code (str): The source code whose language must be detected.
+
+        Returns:
+            str | None: One of the available languages, or None if the code is empty.
+        """
+        if code is None or code.strip() == "":
+            return None
+
+        code_hash = hashlib.sha1(code.encode("utf-8")).hexdigest()
+        with LanguageDetector.__cache_lock:
+            if code_hash in LanguageDetector.__cache:
+                LanguageDetector.__cache.move_to_end(code_hash)
+                return LanguageDetector.__cache[code_hash]
+
+        language = self.__detect(code=code)
+
+        with LanguageDetector.__cache_lock:
+            LanguageDetector.__cache[code_hash] = language
+            if len(LanguageDetector.__cache) > CACHE_SIZE:
+                LanguageDetector.__cache.popitem(last=False)
+        return language
+
+    def __detect(self, code: str) -> str:
+        """
+        Parses the code with each available grammar and keeps the one with the lowest problem density. A grammar
+        that parses the code without any problem is returned immediately since it cannot be beaten, and a grammar
+        whose parsing times out is skipped.
+
+        Parameters:
+            code (str): The source code whose language must be detected.
+
+        Returns:
+            str: The language whose grammar fits the code best.
+        """
+        best_language = AVAILABLE_LANGUAGE[0]
+        best_density = float("inf")
+        for language in AVAILABLE_LANGUAGE:
+            try:
+                tree = self.__syntax_tree.parse(source_code=code, language=language,
+                                                timeout_micros=self.__parse_timeout_micros)
+            except TimeoutError:
+                continue
+            if not tree.root_node.has_error:
+                return language
+            density = self.__problem_density(syntax_tree=tree, best_density=best_density)
+            if density < best_density:
+                best_language = language
+                best_density = density
+        return best_language
+
+    @staticmethod
+    def __problem_density(syntax_tree: Tree, best_density: float) -> float:
+        """
+        Computes the number of MISSING nodes and of tokens left unattached inside ERROR nodes, divided by the number
+        of nodes of the tree. Counting the skipped tokens rather than the ERROR nodes themselves prevents a grammar
+        that wraps the whole snippet into a single ERROR node from looking better than it is. Only the subtrees
+        flagged with an error are visited, and the walk is aborted as soon as the density can no longer be lower
+        than the best one found so far.
+
+        Parameters:
+            syntax_tree (Tree): The syntax tree to score.
+            best_density (float): The lowest density obtained with the previous grammars.
+
+        Returns:
+            float: The problem density of the tree, or infinity if the walk was aborted.
+        """
+        node_count = syntax_tree.root_node.descendant_count
+        problem_limit = best_density * node_count
+        problems = 0
+        todo = [syntax_tree.root_node]
+        while todo:
+            node = todo.pop()
+            if node.is_missing:
+                problems += 1
+            elif node.type == "ERROR":
+                problems += sum(1 for child in node.children if child.child_count == 0)
+            if problems >= problem_limit:
+                return float("inf")
+            todo.extend(child for child in node.children if child.has_error)
+        return problems / node_count
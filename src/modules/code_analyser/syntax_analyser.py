@@ -1,6 +1,12 @@
+from collections import deque
+
 from tree_sitter import Tree
 
-def find_syntax_problem(syntax_tree: Tree, describe_problem: bool = False) -> tuple | list | str:
+TRUNCATION_NOTICE = "I stopped after {} syntax problems, there may be more."
+
+
+def find_syntax_problem(syntax_tree: Tree, describe_problem: bool = False,
+                        max_findings: int = None) -> tuple | list | str:
     """
     Scans a syntax tree for syntax errors or missing tokens and optionally provides a description of each problem.
 
@@ -8,6 +14,9 @@ def find_syntax_problem(syntax_tree: Tree, describe_problem: bool = False) -> tu
         syntax_tree (Tree): A tree_sitter Tree object representing the syntax tree of the source code.
         describe_problem (bool, optional): If True, returns a descriptive list of all syntax problems.
                                            If False, returns sets of errors and missing tokens. Defaults to False.
+        max_findings (int, optional): The number of problems after which the walk of the tree stops, None for no
+                                      limit. When it is reached, the descriptions end with a truncation notice.
+                                      Defaults to None.
 
     Returns:
         tuple | list | str: Depending on the value of describe_problem:
@@ -20,31 +29,42 @@ def find_syntax_problem(syntax_tree: Tree, describe_problem: bool = False) -> tu
     errors = set()
     missings = set()
     descriptions = set()
-    todo = [syntax_tree.root_node]
+    truncated = False
+    todo = deque([syntax_tree.root_node])
 
-    while todo:
-        node = todo.pop(0)
+    while todo and not truncated:
+        node = todo.popleft()
         for child in node.children:
+            line = child.start_point[0] + 1
+            found = None
             if child.type == "ERROR":
                 if describe_problem:
-                    descriptions.add((child.start_point[0] + 1, f"There is an error at line {child.start_point[0] + 1}."))
+                    found, problem = descriptions, (line, f"There is an error at line {line}.")
                 else:
-                    errors.add(child.start_point[0] + 1)
+                    found, problem = errors, line
             elif child.is_missing:
                 if describe_problem:
-                    descriptions.add((child.start_point[0] + 1, f"There is a {child.type} missing at line {child.start_point[0] + 1}."))
+                    found, problem = descriptions, (line, f"There is a {child.type} missing at line {line}.")
                 else:
-                    missings.add((child.start_point[0] + 1, child.type))
+                    found, problem = missings, (line, child.type)
+            if found is not None and problem not in found:
+                # A new problem beyond the limit: the rest of the tree is not walked
+                if max_findings is not None and len(descriptions) + len(errors) + len(missings) >= max_findings:
+                    truncated = True
+                    break
+                found.add(problem)
             todo.append(child)
 
     if describe_problem:
-        if not descriptions:
+        if not descriptions and not truncated:
             return "I didn't detect syntax errors in your code."
         else:
             # Sort descriptions by line number (the first element of each tuple)
             sorted_descriptions = sorted(descriptions, key=lambda x: x[0])
             # Extract only the second element of each tuple, which is the description
             description_messages = [desc[1] for desc in sorted_descriptions]
+            if truncated:
+                description_messages.append(TRUNCATION_NOTICE.format(max_findings))
             return ["Here are all the syntax problems I detected:", description_messages]
 
     # Sort the errors and missing tokens based on the line number (first element of each tuple)
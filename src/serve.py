@@ -0,0 +1,25 @@
+import sys
+
+from modules.NLP.modeling.pretrained_resolver import PretrainedResolver
+
+# Before anything imports the Hugging Face libraries, which read the offline flags on import
+PretrainedResolver.enable_offline_mode()
+
+from modules.code_analyser.abstract_syntax_tree import AbstractSyntaxTree  # noqa: E402
+from user_interface.gui import ChatInterface  # noqa: E402
+from user_interface.prefork_server import PreforkServer, DEFAULT_PORT  # noqa: E402
+
+if __name__ == '__main__':
+    # Usage: python serve.py [workers] [port] [model]
+    # The production entry point: the models and the tree-sitter grammars are loaded once, then shared by the
+    # forked workers. main.py still starts the development server, with its reloader and debugger.
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_PORT
+    model_file = sys.argv[3] if len(sys.argv) > 3 else "bow_lemmatizer.pth"
+
+    interface = ChatInterface(run=False, model_file=model_file)
+    AbstractSyntaxTree()
+    if PreforkServer.is_available():
+        PreforkServer(app=interface.app, port=port, workers=workers).serve()
+    else:
+        interface.app.run(port=port, threaded=True)
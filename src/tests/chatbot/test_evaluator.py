@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.evaluator import Evaluator, ResultStore, NO_INTENT, SUMMARY_FIELDS
+
+
+class TestEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.results_path = os.path.join(self.directory.name, "results.jsonl")
+        self.legacy_path = os.path.join(self.directory.name, "legacy.json")
+        with open(self.legacy_path, "w", encoding="utf-8") as file:
+            json.dump({"tests": [{field: "legacy" for field in SUMMARY_FIELDS}]}, file)
+        self.store = ResultStore(path=self.results_path, legacy_path=self.legacy_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_predict_tags_matches_predict_tag(self):
+        sentences = ["Hello, how are you?", "Can you analyse my python code please", "zzz unknown words", "Bye"]
+        for model_file in ["bow_stemmer.pth", "tfidf_stemmer_ws.pth"]:
+            chatbot = ChatBot(model_file=model_file)
+            self.assertEqual(chatbot.predict_tags(sentences, batch_size=3),
+                             [chatbot.predict_tag(sentence) for sentence in sentences])
+        self.assertEqual(chatbot.predict_tags([]), [])
+
+    def test_compute_metrics(self):
+        metrics = Evaluator.compute_metrics(expected=["A", "A", "B", "B"], predicted=["A", "B", "B", ""])
+        self.assertEqual(metrics["accuracy"], 0.5)
+        self.assertEqual(metrics["intents"]["A"], {"precision": 1.0, "recall": 0.5, "f1": 0.6667, "support": 2})
+        self.assertEqual(metrics["intents"]["B"], {"precision": 0.5, "recall": 0.5, "f1": 0.5, "support": 2})
+        self.assertNotIn(NO_INTENT, metrics["intents"])
+        self.assertEqual(metrics["confusion_matrix"], {"labels": ["A", "B", NO_INTENT],
+                                                       "matrix": [[1, 1, 0], [0, 1, 1], [0, 0, 0]]})
+
+    def test_compute_latency(self):
+        latency = Evaluator.compute_latency([0.001, 0.002, 0.003])
+        self.assertEqual(latency["count"], 3)
+        self.assertEqual(latency["p50_ms"], 2.0)
+        self.assertEqual(latency["max_ms"], 3.0)
+        self.assertEqual(Evaluator.compute_latency([]), {"count": 0})
+
+    def test_concurrent_appends(self):
+        threads = [threading.Thread(target=lambda index=index: [self.store.append({"test": index, "run": run})
+                                                                 for run in range(20)]) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results = self.store.load()
+        self.assertEqual(len(results), 8 * 20 + 1)
+        self.assertEqual(results[-1]["modeling"], "legacy")
+
+    def test_evaluate(self):
+        result = Evaluator(store=self.store, latency_samples=5).evaluate(model_file="bow_stemmer.pth")
+        self.assertTrue(result["score_known_data"].endswith(" %"))
+        self.assertEqual(result["latency"]["count"], 5)
+        self.assertEqual(sum(map(sum, result["metrics"]["confusion_matrix"]["matrix"])), 240)
+
+        summaries = self.store.load_summaries()
+        self.assertEqual(len(summaries), 2)
+        self.assertEqual(list(summaries[0]), SUMMARY_FIELDS)
+        self.assertEqual(summaries[0]["score_known_data"], result["score_known_data"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+
+import torch
+from torch.utils.data import DataLoader
+
+from modules.chatbot.trainer.chat_bot_trainer import ChatBotTrainer
+from modules.chatbot.trainer.incremental_trainer import IncrementalTrainer
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from user_interface.gui import ChatInterface
+from utilities.path_finder import PathFinder
+
+
+class TestIncrementalTrainer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_name = "test_incremental"
+        ChatBotTrainer(extractor_name="BagOfWords", preprocessor_name="Stemmer", remove_stopwords=True,
+                       modeling_name="NeuralNet", model_name=cls.model_name, num_epochs=5, batch_size=8,
+                       learning_rate=0.001, hidden_size=8).start_training()
+        cls.trained = ModelArtifact.load(model_name=cls.model_name, device=torch.device("cpu"))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(ModelArtifact.get_path(cls.model_name), ignore_errors=True)
+
+    def setUp(self):
+        self.intents_file = "ressources/json_files/test_incremental_intents.json"
+        with open(PathFinder.get_complet_path("ressources/json_files/intents.json"), "r", encoding="utf-8") as file:
+            self.intents_data = json.load(file)
+
+    def tearDown(self):
+        if os.path.isfile(PathFinder.get_complet_path(self.intents_file)):
+            os.remove(PathFinder.get_complet_path(self.intents_file))
+
+    def write_intents(self):
+        with open(PathFinder.get_complet_path(self.intents_file), "w", encoding="utf-8") as file:
+            json.dump(self.intents_data, file)
+
+    def test_corpus_snapshot(self):
+        patterns = [(intent["tag"], pattern) for intent in self.intents_data["intents"]
+                    for pattern in intent["patterns"]]
+        self.assertEqual([(sample["tag"], sample["pattern"]) for sample in self.trained["corpus"]], patterns)
+        self.assertEqual(IncrementalTrainer.diff(corpus=self.trained["corpus"], intents_data=self.intents_data),
+                         {"added_intents": [], "removed_intents": [], "added_patterns": [], "removed_patterns": []})
+
+    def test_grow_state(self):
+        new_state = {"l1.weight": torch.randn(8, self.trained["input_size"] + 2), "l1.bias": torch.randn(8),
+                     "l2.weight": torch.randn(8, 8), "l2.bias": torch.randn(8),
+                     "l3.weight": torch.randn(3, 8), "l3.bias": torch.randn(3)}
+        state = IncrementalTrainer.grow_state(model_state=self.trained["model_state"],
+                                              input_size=self.trained["input_size"], tag_positions=[1, None, 0],
+                                              new_state=new_state)
+        old_state = self.trained["model_state"]
+        self.assertTrue(torch.equal(state["l1.weight"][:, :-2], old_state["l1.weight"]))
+        self.assertTrue(torch.equal(state["l1.weight"][:, -2:], torch.zeros(8, 2)))
+        self.assertTrue(torch.equal(state["l3.weight"][0], old_state["l3.weight"][1]))
+        self.assertTrue(torch.equal(state["l3.weight"][1], new_state["l3.weight"][1]))
+        self.assertTrue(torch.equal(state["l3.bias"][2], old_state["l3.bias"][0]))
+
+    def test_add_intent(self):
+        self.intents_data["intents"].append({**self.intents_data["intents"][0], "tag": "Weather",
+                                             "patterns": ["What is the weather like", "Is it raining outside",
+                                                          "Will it be sunny tomorrow"]})
+        removed_pattern = self.intents_data["intents"][0]["patterns"].pop()
+        self.write_intents()
+
+        changes = IncrementalTrainer(model_name=self.model_name, num_epochs=2,
+                                     intents_file=self.intents_file).train()
+        self.assertEqual(changes["added_intents"], ["Weather"])
+        self.assertEqual(len(changes["added_patterns"]), 3)
+        self.assertEqual(changes["removed_patterns"], [(self.intents_data["intents"][0]["tag"], removed_pattern)])
+
+        updated = ModelArtifact.load(model_name=self.model_name, device=torch.device("cpu"))
+        self.assertEqual(updated["tags"][-1], "Weather")
+        self.assertEqual(updated["output_size"], len(self.trained["tags"]) + 1)
+        self.assertEqual(updated["vocab"][:len(self.trained["vocab"])], self.trained["vocab"])
+        self.assertGreater(updated["input_size"], self.trained["input_size"])
+        self.assertEqual(tuple(updated["model_state"]["l1.weight"].shape), (8, updated["input_size"]))
+        self.assertEqual(len(updated["corpus"]), len(self.trained["corpus"]) + 2)
+
+        unchanged = IncrementalTrainer(model_name=self.model_name, intents_file=self.intents_file).train()
+        self.assertFalse(any(value for key, value in unchanged.items() if key != "duration"))
+
+    def test_added_patterns_are_fine_tuned(self):
+        self.intents_data["intents"].append({**self.intents_data["intents"][0], "tag": "Holidays",
+                                             "patterns": ["When are the holidays", "Is the school closed today",
+                                                          "How long is the summer break"]})
+        self.write_intents()
+
+        with mock.patch("modules.chatbot.trainer.incremental_trainer.DataLoader", wraps=DataLoader) as loader:
+            IncrementalTrainer(model_name=self.model_name, num_epochs=1, intents_file=self.intents_file).train()
+        labels = [label for _, label in loader.call_args.kwargs["dataset"]]
+        self.assertEqual(labels.count(len(self.intents_data["intents"]) - 1), 3)
+        # Nothing was held out of the training, so the temperature is kept rather than fitted on learned patterns
+        self.assertEqual(len(labels), sum(len(intent["patterns"]) for intent in self.intents_data["intents"]))
+        updated = ModelArtifact.load(model_name=self.model_name, device=torch.device("cpu"))
+        self.assertEqual(updated["temperature"], self.trained["temperature"])
+
+    def test_held_out_patterns_stay_held_out(self):
+        model_name = "test_incremental_calibrated"
+        self.addCleanup(shutil.rmtree, ModelArtifact.get_path(model_name), ignore_errors=True)
+        ChatBotTrainer(extractor_name="BagOfWords", preprocessor_name="Stemmer", remove_stopwords=True,
+                       modeling_name="NeuralNet", model_name=model_name, num_epochs=5, batch_size=8,
+                       learning_rate=0.001, hidden_size=8, calibration_split=0.2).start_training()
+        trained = ModelArtifact.load(model_name=model_name, device=torch.device("cpu"))
+        held_out = [(sample["tag"], sample["pattern"]) for sample in trained["corpus"] if sample["held_out"]]
+        self.assertTrue(held_out)
+
+        self.intents_data["intents"].append({**self.intents_data["intents"][0], "tag": "Sports",
+                                             "patterns": ["Who won the match", "What is the football score"]})
+        self.write_intents()
+        with mock.patch("modules.chatbot.trainer.incremental_trainer.DataLoader", wraps=DataLoader) as loader:
+            IncrementalTrainer(model_name=model_name, num_epochs=1, intents_file=self.intents_file).train()
+        labels = [label for _, label in loader.call_args.kwargs["dataset"]]
+        self.assertEqual(labels.count(len(self.intents_data["intents"]) - 1), 2)
+        self.assertEqual(len(labels), len(trained["corpus"]) + 2 - len(held_out))
+
+        updated = ModelArtifact.load(model_name=model_name, device=torch.device("cpu"))
+        self.assertEqual([(sample["tag"], sample["pattern"]) for sample in updated["corpus"] if sample["held_out"]],
+                         held_out)
+
+    def test_update_keeps_the_served_model(self):
+        client = ChatInterface(run=False, model_file="bow_stemmer.pth").app.test_client()
+        with mock.patch("user_interface.gui.ChatBot") as chatbot:
+            response = client.post("/update_model", data={"filename": self.model_name})
+        self.assertEqual(response.status_code, 200)
+        chatbot.assert_not_called()
+
+        client = ChatInterface(run=False, model_file=self.model_name).app.test_client()
+        with mock.patch("user_interface.gui.ChatBot") as chatbot:
+            client.post("/update_model", data={"filename": f"{self.model_name}.pth"})
+        chatbot.assert_called_once_with(self.model_name)
+
+    def test_legacy_model(self):
+        with self.assertRaises(ValueError):
+            IncrementalTrainer(model_name="bow_stemmer.pth").train()
+
+
+if __name__ == '__main__':
+    unittest.main()
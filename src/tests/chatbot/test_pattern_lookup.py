@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.pattern_lookup import PatternLookup, normalize_text, LOOKUP_METRIC_NAME
+from modules.NLP.preprocessing.preprocessor import Preprocessor
+
+
+class TestPatternLookup(unittest.TestCase):
+    def setUp(self):
+        self.intents_data = {"intents": [{"tag": "Greeting", "patterns": ["Hello", "Hi there"]},
+                                         {"tag": "Thanks", "patterns": ["Thanks!", "Thank you very much"]},
+                                         {"tag": "Courtesy", "patterns": ["Hi there", "How are you?"]},
+                                         {"tag": "Unknown", "patterns": ["Who are you?"]}]}
+        self.tags = ["Greeting", "Thanks", "Courtesy"]
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  Thanks!! "), "thanks")
+        self.assertEqual(normalize_text("HOW are\tyou ?"), "how are you")
+
+    def test_text_lookup(self):
+        lookup = PatternLookup(intents_data=self.intents_data, tags=self.tags)
+        tags, token_lists = lookup.lookup(["hello", "THANKS", "Hi there", "Who are you?", "How are you doing?"])
+        # "Hi there" is a pattern of two intents, and "Unknown" is not an intent of the model
+        self.assertEqual(tags, ["Greeting", "Thanks", None, None, None])
+        self.assertEqual(token_lists, [None] * 5)
+        self.assertAlmostEqual(lookup.hit_ratio, 2 / 5)
+        self.assertIn(f"{LOOKUP_METRIC_NAME}_hits_total 2", lookup.export_prometheus())
+
+    def test_tokens_lookup(self):
+        lookup = PatternLookup(intents_data=self.intents_data, tags=self.tags,
+                               preprocessor=Preprocessor(preprocessor_name="Stemmer", remove_stopwords=True))
+        tags, token_lists = lookup.lookup(["Thank!", "Tell me a joke", "Hello"])
+        self.assertEqual(tags, ["Thanks", None, "Greeting"])
+        self.assertIsNotNone(token_lists[1])
+        self.assertIsNone(token_lists[2])
+
+
+class TestChatBotPatternLookup(unittest.TestCase):
+    def test_hits_skip_the_model(self):
+        chatbot = ChatBot(model_file="bow_stemmer.pth")
+        without_lookup = ChatBot(model_file="bow_stemmer.pth", pattern_lookup=False)
+        sentences = ["hello", "Could you tell me something funny about computers"]
+        self.assertEqual(chatbot.predict_tags(sentences), without_lookup.predict_tags(sentences))
+
+        with mock.patch.object(Preprocessor, "preprocess_corpus") as preprocess_corpus:
+            self.assertEqual(chatbot.predict_tag("HELLO!"), "Greeting")
+        preprocess_corpus.assert_not_called()
+        self.assertIn(f"{LOOKUP_METRIC_NAME}_hits_total 2", chatbot.export_metrics())
+        self.assertNotIn(LOOKUP_METRIC_NAME, without_lookup.export_metrics())
+
+    def test_rebuilt_for_a_new_model(self):
+        chatbot = ChatBot(model_file="bow_stemmer.pth")
+        self.assertEqual(chatbot.predict_tag("hello"), "Greeting")
+        chatbot.load_essential("tfidf_stemmer.pth")
+        self.assertIn(f"{LOOKUP_METRIC_NAME}_total 0", chatbot.export_metrics())
+        self.assertEqual(chatbot.predict_tag("hello"), "Greeting")
+        self.assertIn(f"{LOOKUP_METRIC_NAME}_hits_total 1", chatbot.export_metrics())
+
+
+if __name__ == '__main__':
+    unittest.main()
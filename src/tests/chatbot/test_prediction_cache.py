@@ -0,0 +1,64 @@
+import threading
+import unittest
+from unittest import mock
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.prediction_cache import PredictionCache, CACHE_METRIC_NAME
+from modules.NLP.modeling.intent_scorer import IntentScorer
+
+
+class TestPredictionCache(unittest.TestCase):
+    def test_least_recently_used_is_evicted(self):
+        cache = PredictionCache(max_size=2)
+        cache.put(("model", ("hello",)), ("Greeting", 0.9))
+        cache.put(("model", ("joke",)), ("Jokes", 0.8))
+        self.assertEqual(cache.get(("model", ("hello",))), ("Greeting", 0.9))
+        cache.put(("model", ("bye",)), ("Goodbye", 0.7))
+
+        self.assertIsNone(cache.get(("model", ("joke",))))
+        self.assertEqual(cache.get(("model", ("hello",))), ("Greeting", 0.9))
+        self.assertEqual(cache.size, 2)
+        self.assertAlmostEqual(cache.hit_ratio, 2 / 3)
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+        self.assertIn(f"{CACHE_METRIC_NAME}_hits_total 2", cache.export_prometheus())
+
+    def test_concurrent_access(self):
+        cache = PredictionCache(max_size=50)
+
+        def worker(offset: int):
+            for index in range(1000):
+                key = ("model", (str((index + offset) % 100),))
+                if cache.get(key) is None:
+                    cache.put(key, ("tag", 1.0))
+
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.size, 50)
+
+
+class TestChatBotPredictionCache(unittest.TestCase):
+    def test_same_tokens_skip_the_model(self):
+        chatbot = ChatBot(model_file="bow_stemmer.pth", pattern_lookup=False)
+        tags = chatbot.predict_tags(["Could you tell me a joke?", "could you TELL me jokes"])
+        self.assertEqual(tags[0], tags[1])
+
+        with mock.patch.object(IntentScorer, "predict_with_probability") as predict:
+            self.assertEqual(chatbot.predict_tag("Could you tell me a joke"), tags[0])
+        predict.assert_not_called()
+        self.assertIn(f"{CACHE_METRIC_NAME}_size 1", chatbot.export_metrics())
+
+        chatbot.load_essential("bow_stemmer.pth")
+        self.assertIn(f"{CACHE_METRIC_NAME}_size 0", chatbot.export_metrics())
+
+    def test_disabled_cache(self):
+        chatbot = ChatBot(model_file="bow_stemmer.pth", pattern_lookup=False, cache_size=0)
+        chatbot.predict_tags(["Could you tell me a joke?", "Could you tell me a joke?"])
+        self.assertEqual(chatbot.export_metrics(), "")
+
+
+if __name__ == '__main__':
+    unittest.main()
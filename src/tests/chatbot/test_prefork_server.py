@@ -0,0 +1,49 @@
+import http.client
+import re
+import signal
+import subprocess
+import sys
+import textwrap
+import unittest
+
+from user_interface.prefork_server import PreforkServer
+from utilities.path_finder import PathFinder
+
+SERVER_SCRIPT = textwrap.dedent("""
+    import os
+    from flask import Flask
+    from user_interface.prefork_server import PreforkServer
+
+    app = Flask(__name__)
+    app.add_url_rule("/pid", "pid", lambda: str(os.getpid()))
+    PreforkServer(app=app, port=0, workers=2).serve()
+""")
+
+
+@unittest.skipUnless(PreforkServer.is_available(), "the platform cannot fork")
+class TestPreforkServer(unittest.TestCase):
+    def test_workers_serve_the_shared_socket(self):
+        server = subprocess.Popen([sys.executable, "-u", "-c", SERVER_SCRIPT], cwd=PathFinder.get_complet_path("."),
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            banner = server.stdout.readline()
+            self.assertIn("2 workers", banner)
+            port = int(re.search(r":(\d+) ", banner).group(1))
+
+            pids = set()
+            for _ in range(10):
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+                connection.request("GET", "/pid")
+                response = connection.getresponse()
+                self.assertEqual(response.status, 200)
+                pids.add(int(response.read()))
+                connection.close()
+            self.assertNotIn(server.pid, pids)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            self.assertEqual(server.wait(timeout=30), 0)
+            server.stdout.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
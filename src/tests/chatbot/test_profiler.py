@@ -0,0 +1,52 @@
+import os
+import threading
+import unittest
+
+from modules.NLP.preprocessing.preprocessor import Preprocessor
+from utilities.profiler import SamplingProfiler
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def setUp(self):
+        self.path = None
+        self.stop = threading.Event()
+        self.preprocessor = Preprocessor(preprocessor_name="Stemmer")
+
+    def tearDown(self):
+        self.stop.set()
+        if self.path is not None and os.path.isfile(self.path):
+            os.remove(self.path)
+            if not os.listdir(os.path.dirname(self.path)):
+                os.rmdir(os.path.dirname(self.path))
+
+    def preprocess_forever(self):
+        while not self.stop.is_set():
+            self.preprocessor.preprocess_text("Can you analyse the syntax of my python code please")
+
+    def test_profile_busy_thread(self):
+        threading.Thread(target=self.preprocess_forever, name="busy worker", daemon=True).start()
+        profiler = SamplingProfiler(interval=0.001)
+        self.path = profiler.profile_to_file(seconds=0.3, name="test_profile.collapsed")
+
+        with open(self.path, "r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertGreater(profiler.samples, 10)
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+        busy_lines = [line for line in lines if line.startswith("busy_worker;")]
+        self.assertTrue(busy_lines)
+        self.assertTrue(any("Preprocessor.preprocess_text (preprocessor.py)" in line for line in busy_lines))
+
+    def test_single_profile_at_a_time(self):
+        thread = threading.Thread(target=SamplingProfiler().profile, args=(0.3,))
+        thread.start()
+        threading.Event().wait(0.05)
+        with self.assertRaises(RuntimeError):
+            SamplingProfiler().profile(seconds=0.1)
+        thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
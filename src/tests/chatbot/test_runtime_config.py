@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import torch
+
+from utilities.runtime_config import RuntimeConfig
+
+
+class TestRuntimeConfig(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "runtime.json")
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump({"serving": {"intra_op_threads": 2, "models": {"BERT": {"intra_op_threads": 4}}},
+                       "training": {"gensim_workers": 3}}, file)
+        self.environ = mock.patch.dict(os.environ, {"CHATBOT_RUNTIME_CONFIG": self.path})
+        self.environ.start()
+        RuntimeConfig.reset()
+
+    def tearDown(self):
+        self.environ.stop()
+        RuntimeConfig.reset()
+        self.directory.cleanup()
+
+    def test_file_settings(self):
+        self.assertEqual(RuntimeConfig.get("serving")["intra_op_threads"], 2)
+        self.assertEqual(RuntimeConfig.get("serving", "BERT")["intra_op_threads"], 4)
+        self.assertEqual(RuntimeConfig.get("training")["gensim_workers"], 3)
+        self.assertEqual(RuntimeConfig.get("training")["intra_op_threads"], os.cpu_count())
+
+    def test_environment_overrides_file(self):
+        with mock.patch.dict(os.environ, {"CHATBOT_SERVING_INTRA_OP_THREADS": "5"}):
+            RuntimeConfig.reset()
+            self.assertEqual(RuntimeConfig.get("serving")["intra_op_threads"], 5)
+            self.assertEqual(RuntimeConfig.get("serving", "BERT")["intra_op_threads"], 5)
+
+    def test_override_and_limit(self):
+        RuntimeConfig.override("serving", intra_op_threads=3)
+        self.assertEqual(RuntimeConfig.get("serving", "BERT")["intra_op_threads"], 3)
+        RuntimeConfig.limit(max_threads=1)
+        self.assertEqual(RuntimeConfig.get("serving", "BERT")["intra_op_threads"], 1)
+        self.assertEqual(RuntimeConfig.get("training")["intra_op_threads"], 1)
+
+    def test_use_sets_the_calling_thread(self):
+        threads = {}
+
+        def serve():
+            RuntimeConfig.use("serving", "BERT")
+            threads["serving"] = torch.get_num_threads()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        thread.join()
+        self.assertEqual(threads["serving"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from contextlib import nullcontext
+
+from modules.chatbot.chatbot import ChatBot
+from utilities.tracing import Histogram, Tracer, METRIC_NAME
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        Tracer.reset()
+
+    def tearDown(self):
+        Tracer.enable(False)
+        Tracer.reset()
+
+    def test_disabled_spans_are_no_ops(self):
+        Tracer.enable(False)
+        self.assertIsInstance(Tracer.span("preprocessing"), nullcontext)
+        with Tracer.trace_request() as breakdown:
+            ChatBot(model_file="bow_stemmer.pth").get_response("Hello. Tell me a joke")
+        self.assertEqual(breakdown, [])
+        self.assertNotIn("_bucket", Tracer.export_prometheus())
+
+    def test_request_breakdown(self):
+        chatbot = ChatBot(model_file="bow_stemmer.pth")
+        Tracer.enable()
+        with Tracer.trace_request() as breakdown:
+            with Tracer.span("request"):
+                chatbot.get_response("Hello my friend. Could you tell me a joke please")
+
+        stages = [span["stage"] for span in breakdown]
+        for stage in ["segmentation", "preprocessing", "feature_extraction", "model_forward"]:
+            self.assertIn(stage, stages)
+        self.assertEqual(breakdown[-1]["stage"], "request")
+        self.assertEqual(breakdown[-1]["depth"], 0)
+        self.assertTrue(all(span["depth"] > 0 for span in breakdown[:-1]))
+        self.assertTrue(all(span["duration_ms"] <= breakdown[-1]["duration_ms"] for span in breakdown))
+
+    def test_prometheus_export(self):
+        histogram = Histogram()
+        for duration in [0.00005, 0.003, 0.003, 20.0]:
+            histogram.observe(duration)
+        lines = histogram.export(name=METRIC_NAME, stage="model_forward")
+        self.assertIn(f'{METRIC_NAME}_bucket{{stage="model_forward",le="0.0001"}} 1', lines)
+        self.assertIn(f'{METRIC_NAME}_bucket{{stage="model_forward",le="0.005"}} 3', lines)
+        self.assertIn(f'{METRIC_NAME}_bucket{{stage="model_forward",le="10.0"}} 3', lines)
+        self.assertIn(f'{METRIC_NAME}_bucket{{stage="model_forward",le="+Inf"}} 4', lines)
+        self.assertIn(f'{METRIC_NAME}_count{{stage="model_forward"}} 4', lines)
+
+        Tracer.enable()
+        with Tracer.span("segmentation"):
+            pass
+        exposition = Tracer.export_prometheus()
+        self.assertIn(f"# TYPE {METRIC_NAME} histogram", exposition)
+        self.assertIn(f'{METRIC_NAME}_count{{stage="segmentation"}} 1', exposition)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from modules.code_analyser.code_analyser import CodeAnalyser
+from utilities.path_finder import PathFinder
+
+# Unclosed brackets on every line, so every line is a syntax problem
+HOSTILE_CODE = "def function(value:\n    return [value +\n" * 2000
+
+
+class TestCodeAnalyserLimits(unittest.TestCase):
+    def setUp(self):
+        self.language = "python"
+        filename = PathFinder().get_complet_path(path_to_file=f'ressources/{self.language}_files/code_with_errors.txt')
+        with open(filename, "r") as file:
+            self.code = file.read()
+
+    def test_code_too_long(self):
+        code_analyser = CodeAnalyser(max_code_bytes=len(self.code.encode("utf-8")) - 1)
+        output = code_analyser.analyse(code=self.code, language=self.language)
+        self.assertIsInstance(output, str)
+        self.assertIn("too long", output)
+
+    def test_parse_timeout(self):
+        code_analyser = CodeAnalyser(parse_timeout_micros=1)
+        output = code_analyser.analyse(code=HOSTILE_CODE, language=self.language)
+        self.assertEqual(len(output), 1)
+        self.assertIn("too long to read", output[0])
+
+        # The halted parse is not resumed by the next one
+        code_analyser.parse_timeout_micros = 0
+        output = code_analyser.analyse(code=self.code, language=self.language, mode="S")
+        self.assertEqual(output[0][1][0], "There is an error at line 1.")
+
+    def test_findings_truncated(self):
+        code_analyser = CodeAnalyser(max_findings=2)
+        syntax_output, clean_code_output = code_analyser.analyse(code=self.code, language=self.language)
+        self.assertEqual(len(syntax_output[1]), 3)
+        self.assertIn("I stopped after 2 syntax problems", syntax_output[1][-1])
+        self.assertEqual(len(clean_code_output[1]), 3)
+        self.assertIn("I stopped after 2 recommendations", clean_code_output[1][-1])
+
+    def test_findings_not_truncated(self):
+        code_analyser = CodeAnalyser(max_findings=6)
+        syntax_output = code_analyser.analyse(code=self.code, language=self.language, mode="S")[0]
+        self.assertEqual(len(syntax_output[1]), 6)
+        self.assertNotIn("I stopped", syntax_output[1][-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from modules.code_analyser.abstract_syntax_tree import AbstractSyntaxTree
+from modules.code_analyser.language_detector import LanguageDetector
+from modules.NLP.preprocessing.sentence_segmenter import segment_sentences
+from utilities.path_finder import PathFinder
+
+
+class TestLanguageDetector(unittest.TestCase):
+    def setUp(self):
+        self.language_detector = LanguageDetector(syntax_tree=AbstractSyntaxTree())
+
+    def test_python_code(self):
+        filename = PathFinder().get_complet_path(path_to_file='ressources/python_files/code_without_errors.txt')
+        with open(filename, "r") as file:
+            self.assertEqual("python", self.language_detector.detect(code=file.read()))
+
+    def test_java_code(self):
+        filename = PathFinder().get_complet_path(path_to_file='ressources/java_files/code_with_errors.txt')
+        with open(filename, "r") as file:
+            self.assertEqual("java", self.language_detector.detect(code=file.read()))
+
+    def test_c_code(self):
+        filename = PathFinder().get_complet_path(path_to_file='ressources/c_files/code_without_errors.txt')
+        with open(filename, "r") as file:
+            self.assertEqual("c", self.language_detector.detect(code=file.read()))
+
+    def test_code_without_language(self):
+        filename = PathFinder().get_complet_path(
+            path_to_file='ressources/dialog_files/dialog_with_code_without_language.txt')
+        with open(filename, "r") as file:
+            segmented_input = segment_sentences(user_input=file.read())
+        self.assertEqual("python", self.language_detector.detect(code=segmented_input["code"]))
+        self.assertEqual("python", self.language_detector.detect(code=segmented_input["code"]))
+
+    def test_empty_code(self):
+        self.assertIsNone(self.language_detector.detect(code=""))
+        self.assertIsNone(self.language_detector.detect(code=None))
+
+
+if __name__ == '__main__':
+    unittest.main()
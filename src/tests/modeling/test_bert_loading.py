@@ -0,0 +1,59 @@
+import json
+import shutil
+import unittest
+
+from transformers import BertConfig, BertForSequenceClassification
+
+from modules.NLP.modeling.BERT import BertIntentClassifier
+from utilities.path_finder import PathFinder
+
+
+class TestBertLoading(unittest.TestCase):
+    def setUp(self):
+        self.model_name = "test_tiny_bert_loading"
+        self.model_path = PathFinder.get_complet_path(f"ressources/models/{self.model_name}")
+        self.tokenizer_path = PathFinder.get_complet_path(f"ressources/tokenizers/{self.model_name}_T")
+        shutil.copytree(PathFinder.get_complet_path("ressources/tokenizers/bert_intent_classificator_T"),
+                        self.tokenizer_path)
+        with open(PathFinder.get_complet_path("ressources/json_files/intents.json"), "r", encoding="utf-8") as file:
+            self.tags = [intent["tag"] for intent in json.load(file)["intents"]]
+
+    def tearDown(self):
+        shutil.rmtree(self.model_path, ignore_errors=True)
+        shutil.rmtree(self.tokenizer_path, ignore_errors=True)
+
+    def save_model(self, labels: list = None, **config_attributes):
+        config = BertConfig(vocab_size=30522, hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                            intermediate_size=64, num_labels=len(self.tags), **config_attributes)
+        if labels is not None:
+            config.id2label = dict(enumerate(labels))
+            config.label2id = {label: index for index, label in enumerate(labels)}
+        BertForSequenceClassification(config).save_pretrained(self.model_path)
+
+    def test_labels_from_config(self):
+        labels = list(reversed(self.tags))
+        self.save_model(labels=labels)
+        classifier = BertIntentClassifier(model_name=self.model_name)
+        classifier.load_model()
+        self.assertEqual(classifier.intents, labels)
+        self.assertIn(classifier.predict("Hello there"), labels + [""])
+        self.assertEqual(classifier.predict_logits(["Hi", "Tell me a joke please"]).shape, (2, len(labels)))
+
+    def test_calibration_from_config(self):
+        self.save_model(labels=self.tags, calibration_temperature=2.5, intent_threshold=0.4)
+        classifier = BertIntentClassifier(model_name=self.model_name)
+        classifier.load_model()
+        self.assertEqual(classifier.scorer.temperature, 2.5)
+        self.assertEqual(classifier.scorer.threshold, 0.4)
+        self.assertEqual(classifier.scorer.tags, self.tags)
+
+    def test_labels_fallback(self):
+        self.save_model()
+        classifier = BertIntentClassifier(model_name=self.model_name)
+        classifier.load_model()
+        self.assertEqual(classifier.intents, self.tags)
+        self.assertEqual(classifier.scorer.temperature, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+import torch
+from transformers import BertTokenizer
+
+from modules.NLP.modeling.BERT import IntentDataset, PaddingCollator
+from utilities.path_finder import PathFinder
+
+
+class TestBertPadding(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = BertTokenizer.from_pretrained(
+            PathFinder.get_complet_path("ressources/tokenizers/bert_intent_classificator_T"))
+        self.texts = ["Hi", "Can you analyse my code please", "Tell me a joke about programmers and their bugs"]
+        self.dataset = IntentDataset(self.tokenizer(self.texts)["input_ids"], [0, 1, 2])
+        self.collator = PaddingCollator(pad_token_id=self.tokenizer.pad_token_id)
+
+    def test_dataset(self):
+        self.assertEqual(len(self.dataset), 3)
+        self.assertEqual(self.dataset[0]["input_ids"].dtype, np.int32)
+        self.assertEqual(self.dataset[0]["labels"], 0)
+        self.assertLess(len(self.dataset[0]["input_ids"]), len(self.dataset[2]["input_ids"]))
+
+    def test_collator_matches_tokenizer_padding(self):
+        batch = self.collator([self.dataset[index] for index in range(3)])
+        expected = self.tokenizer(self.texts, padding=True, return_tensors="pt")
+        length = expected["input_ids"].shape[1]
+
+        self.assertEqual(batch["input_ids"].shape[1] % 8, 0)
+        self.assertGreaterEqual(batch["input_ids"].shape[1], length)
+        for name in ["input_ids", "attention_mask", "token_type_ids"]:
+            self.assertTrue(torch.equal(batch[name][:, :length], expected[name]))
+            self.assertTrue(torch.all(batch[name][:, length:] == 0))
+        self.assertTrue(torch.equal(batch["labels"], torch.tensor([0, 1, 2])))
+
+    def test_collator_pads_per_batch(self):
+        batch = self.collator([self.dataset[0]])
+        self.assertEqual(batch["input_ids"].shape, (1, 8))
+        self.assertEqual(int(batch["attention_mask"].sum()), len(self.dataset[0]["input_ids"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import shutil
+import unittest
+
+import torch
+from transformers import BertConfig, BertForSequenceClassification
+
+from modules.NLP.modeling.BERT import BertIntentClassifier, QUANTIZED_FILE
+from utilities.path_finder import PathFinder
+
+
+class TestBertQuantization(unittest.TestCase):
+    def setUp(self):
+        self.model_name = "test_tiny_bert"
+        self.model_path = PathFinder.get_complet_path(f"ressources/models/{self.model_name}")
+        config = BertConfig(vocab_size=100, hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+                            intermediate_size=128, num_labels=5)
+        torch.manual_seed(0)
+        self.model = BertForSequenceClassification(config).eval()
+        self.model.save_pretrained(self.model_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.model_path, ignore_errors=True)
+
+    def test_quantize(self):
+        quantized_path = BertIntentClassifier.quantize(model_name=self.model_name)
+        self.assertEqual(quantized_path, os.path.join(self.model_path, QUANTIZED_FILE))
+        self.assertLess(os.path.getsize(quantized_path),
+                        os.path.getsize(os.path.join(self.model_path, "model.safetensors")))
+
+        quantized_model = BertIntentClassifier.load_quantized(model_name=self.model_name)
+        self.assertIsInstance(quantized_model.classifier, torch.ao.nn.quantized.dynamic.Linear)
+
+        input_ids = torch.randint(0, 100, (4, 9))
+        reference_model = torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        with torch.no_grad():
+            expected = self.model(input_ids=input_ids).logits
+            logits = quantized_model(input_ids=input_ids).logits
+            torch.testing.assert_close(logits, reference_model(input_ids=input_ids).logits)
+        torch.testing.assert_close(logits, expected, rtol=0.05, atol=0.05)
+        self.assertTrue(torch.equal(logits.argmax(dim=1), expected.argmax(dim=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
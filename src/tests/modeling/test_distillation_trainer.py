@@ -0,0 +1,76 @@
+import json
+import shutil
+import unittest
+
+import numpy as np
+import torch
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.trainer.distillation_trainer import DistillationTrainer, paraphrase
+from modules.NLP.modeling.intent_scorer import DEFAULT_TEMPERATURE, DEFAULT_THRESHOLD
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from utilities.path_finder import PathFinder
+
+
+class KeywordTeacher:
+    """
+    A teacher which is confident in the true tag of the patterns it knows and uncertain about the other texts.
+    """
+
+    def __init__(self):
+        with open(PathFinder.get_complet_path("ressources/json_files/intents.json"), "r", encoding="utf-8") as file:
+            intents = json.load(file)["intents"]
+        self.intents = [intent["tag"] for intent in reversed(intents)]
+        self.tags = {pattern: intent["tag"] for intent in intents for pattern in intent["patterns"]}
+
+    def predict_logits(self, texts):
+        logits = np.zeros((len(texts), len(self.intents)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            if text in self.tags:
+                logits[row, self.intents.index(self.tags[text])] = 10
+        return logits
+
+
+class TestDistillationTrainer(unittest.TestCase):
+    def setUp(self):
+        self.model_name = "test_distilled"
+
+    def tearDown(self):
+        shutil.rmtree(ModelArtifact.get_path(self.model_name), ignore_errors=True)
+
+    def test_paraphrase(self):
+        sentence = "Can you analyse my code, please?"
+        paraphrases = paraphrase(sentence, count=4)
+        self.assertEqual(paraphrases, paraphrase(sentence, count=4))
+        self.assertLessEqual(len(paraphrases), 4)
+        self.assertEqual(len(set(paraphrases)), len(paraphrases))
+        self.assertNotIn(sentence, paraphrases)
+        self.assertEqual(paraphrase("", count=4), [])
+
+    def test_distillation(self):
+        for modeling_name in ["NeuralNet", "SparseNeuralNet"]:
+            DistillationTrainer(model_name=self.model_name, extractor_name="BagOfWords", modeling_name=modeling_name,
+                                num_epochs=30, hidden_size=32, num_paraphrases=2,
+                                teacher=KeywordTeacher()).start_training()
+            self.assertTrue(ModelArtifact.exists(self.model_name))
+
+            parameters = ModelArtifact.load_parameters(model_file=self.model_name)
+            self.assertEqual(parameters["modeling"], modeling_name)
+            data = ModelArtifact.load(model_name=self.model_name, device=torch.device("cpu"))
+            self.assertGreater(data["temperature"], 0)
+            self.assertNotEqual(data["temperature"], DEFAULT_TEMPERATURE)
+            self.assertEqual(data["threshold"], DEFAULT_THRESHOLD)
+            self.assertEqual(ChatBot(model_file=self.model_name).predict_tag("Hello there"), "Greeting")
+
+    def test_distillation_without_calibration(self):
+        DistillationTrainer(model_name=self.model_name, extractor_name="BagOfWords", num_epochs=5, hidden_size=32,
+                            num_paraphrases=1, threshold=0.5, calibration_split=0,
+                            teacher=KeywordTeacher()).start_training()
+
+        data = ModelArtifact.load(model_name=self.model_name, device=torch.device("cpu"))
+        self.assertEqual(data["temperature"], DEFAULT_TEMPERATURE)
+        self.assertEqual(data["threshold"], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
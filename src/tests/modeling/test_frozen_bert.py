@@ -0,0 +1,104 @@
+import glob
+import json
+import os
+import shutil
+import unittest
+from unittest import mock
+
+import torch
+from transformers import BertConfig, BertModel, BertTokenizerFast
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.trainer.chat_bot_trainer import ChatBotTrainer
+from modules.NLP.modeling.frozen_bert import FrozenBertClassifier, FrozenEncoder, EMBEDDINGS_DIRECTORY
+from modules.NLP.modeling.intent_scorer import IntentScorer
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.pretrained_resolver import PretrainedResolver
+from utilities.path_finder import PathFinder
+
+
+class TestFrozenBert(unittest.TestCase):
+    def setUp(self):
+        self.base_model = "test_tiny_frozen_encoder"
+        self.model_name = "test_frozen_bert"
+        self.encoder_path = PretrainedResolver.get_snapshot_path(self.base_model)
+        torch.manual_seed(0)
+        config = BertConfig(vocab_size=30522, hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+                            intermediate_size=64)
+        BertModel(config).save_pretrained(self.encoder_path)
+        BertTokenizerFast.from_pretrained(
+            PathFinder.get_complet_path("ressources/tokenizers/bert_intent_classificator_T")
+        ).save_pretrained(self.encoder_path)
+        with open(PathFinder.get_complet_path("ressources/json_files/intents.json"), "r", encoding="utf-8") as file:
+            self.tags = [intent["tag"] for intent in json.load(file)["intents"]]
+
+    def tearDown(self):
+        shutil.rmtree(self.encoder_path, ignore_errors=True)
+        shutil.rmtree(ModelArtifact.get_path(self.model_name), ignore_errors=True)
+        for path in glob.glob(PathFinder.get_complet_path(f"{EMBEDDINGS_DIRECTORY}/{self.base_model}-*")):
+            os.remove(path)
+        for directory in [PathFinder.get_complet_path(EMBEDDINGS_DIRECTORY),
+                          PathFinder.get_complet_path("ressources/pretrained")]:
+            if os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+
+    def test_encode_cached_only_encodes_new_texts(self):
+        encoder = FrozenEncoder.get(self.base_model)
+        embeddings = encoder.encode_cached(["Hello there", "Tell me a joke"])
+        self.assertEqual(tuple(embeddings.shape), (2, 32))
+
+        with mock.patch.object(encoder, "encode", wraps=encoder.encode) as encode:
+            cached = encoder.encode_cached(["Tell me a joke", "Hello there", "What time is it?"])
+        encode.assert_called_once()
+        self.assertEqual(encode.call_args.args[0], ["What time is it?"])
+        torch.testing.assert_close(cached[:2], embeddings[[1, 0]])
+        torch.testing.assert_close(cached[2:], encoder.encode(["What time is it?"]))
+
+    def test_encode_ignores_padding(self):
+        encoder = FrozenEncoder.get(self.base_model)
+        alone = encoder.encode(["Hi"])
+        batched = encoder.encode(["Hi", "Could you tell me the weather in Paris tomorrow morning?"])
+        torch.testing.assert_close(batched[:1], alone, rtol=1e-4, atol=1e-5)
+
+    def test_train_and_load(self):
+        classifier = FrozenBertClassifier(model_name=self.model_name, num_epochs=5, base_model=self.base_model,
+                                          calibration_split=0.2)
+        classifier.train()
+
+        with open(os.path.join(ModelArtifact.get_path(self.model_name), "manifest.json"), "r") as file:
+            manifest = json.load(file)
+        self.assertEqual(manifest["modeling_name"], "FrozenBERT")
+        self.assertEqual(manifest["encoder_revision"], FrozenEncoder.get(self.base_model).revision)
+        self.assertEqual(ModelArtifact.load_parameters(self.model_name)["modeling"], "FrozenBERT")
+
+        loaded = FrozenBertClassifier(model_name=self.model_name)
+        loaded.load_model()
+        self.assertEqual(loaded.intents, self.tags)
+        self.assertEqual(loaded.scorer.temperature, classifier.scorer.temperature)
+        # The temperature calibrates the saved head, over the patterns it was not trained on
+        with open(PathFinder.get_complet_path("ressources/json_files/intents.json"), "r", encoding="utf-8") as file:
+            intents = json.load(file)["intents"]
+        texts = [text for intent in intents for text in intent["patterns"]]
+        labels = [self.tags.index(intent["tag"]) for intent in intents for _ in intent["patterns"]]
+        _, calibration = IntentScorer.split_calibration(labels=labels, fraction=0.2)
+        temperature = IntentScorer.fit_temperature(
+            logits=torch.from_numpy(loaded.predict_logits([texts[index] for index in calibration])),
+            labels=torch.tensor([labels[index] for index in calibration]))
+        self.assertAlmostEqual(loaded.scorer.temperature, temperature, places=3)
+        self.assertEqual(loaded.predict_logits(["Hi", "Tell me a joke please"]).shape, (2, len(self.tags)))
+        self.assertIn(loaded.predict("Hello there"), self.tags + [""])
+
+    def test_retrieval_refuses_another_encoder_revision(self):
+        encoder = FrozenEncoder.get(self.base_model)
+        with mock.patch.object(FrozenEncoder, "get", return_value=encoder):
+            ChatBotTrainer(extractor_name="BERT", modeling_name="Retrieval",
+                           model_name=self.model_name).start_training()
+            self.assertEqual(ChatBot(model_file=self.model_name).predict_tag("Hello"), "Greeting")
+
+            with mock.patch.object(FrozenEncoder, "revision", new_callable=mock.PropertyMock, return_value="other"):
+                with self.assertRaises(ValueError):
+                    ChatBot(model_file=self.model_name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import shutil
+import unittest
+from unittest import mock
+
+import torch
+from torch.utils.data import Subset
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.trainer.chat_bot_trainer import ChatBotTrainer
+from modules.NLP.modeling.intent_scorer import IntentScorer, DEFAULT_TEMPERATURE, DEFAULT_THRESHOLD
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.modeling import Modeling
+
+
+class TestIntentScorer(unittest.TestCase):
+    def setUp(self):
+        self.model_name = "test_calibrated_bow"
+
+    def tearDown(self):
+        shutil.rmtree(ModelArtifact.get_path(self.model_name), ignore_errors=True)
+
+    def test_score_and_predict_agree(self):
+        scorer = IntentScorer(tags=["A", "B", "C"], temperature=2.0, threshold=0.5)
+        logits = torch.tensor([[4.0, 0.0, 0.0], [1.0, 1.2, 0.0], [0.0, 0.0, 9.0]])
+        scores = scorer.score(logits, k=2)
+        self.assertEqual([score["tag"] for score in scores], scorer.predict(logits))
+        self.assertEqual(scorer.predict(logits), ["A", "", "C"])
+        self.assertEqual([tag for tag, _ in scores[1]["candidates"]], ["B", "A"])
+        probabilities = [probability for _, probability in scores[0]["candidates"]]
+        self.assertAlmostEqual(probabilities[0], torch.softmax(logits[0] / 2.0, dim=0)[0].item(), places=6)
+        self.assertEqual(len(scorer.score(logits, k=10)[0]["candidates"]), 3)
+
+    def test_fit_temperature(self):
+        generator = torch.Generator().manual_seed(0)
+        calibrated_logits = torch.randn(2000, 5, generator=generator) * 2
+        labels = torch.multinomial(torch.softmax(calibrated_logits, dim=1), 1, generator=generator).squeeze(1)
+        temperature = IntentScorer.fit_temperature(logits=calibrated_logits * 3, labels=labels)
+        self.assertAlmostEqual(temperature, 3.0, delta=0.3)
+        self.assertEqual(IntentScorer.fit_temperature(logits=torch.zeros(0, 5), labels=torch.zeros(0)), 1.0)
+
+    def test_split_calibration(self):
+        labels = ["A"] * 10 + ["B"] * 4 + ["C"]
+        training, calibration = IntentScorer.split_calibration(labels=labels, fraction=0.2)
+        self.assertEqual(sorted(training + calibration), list(range(len(labels))))
+        self.assertEqual([labels[index] for index in calibration].count("A"), 2)
+        self.assertEqual([labels[index] for index in calibration].count("B"), 1)
+        self.assertIn(14, training)
+        self.assertEqual(IntentScorer.split_calibration(labels=labels, fraction=0)[1], [])
+
+    def test_trainer_saves_calibration(self):
+        ChatBotTrainer(extractor_name="BagOfWords", preprocessor_name="Stemmer", remove_stopwords=False,
+                       modeling_name="NeuralNet", model_name=self.model_name, num_epochs=30, batch_size=16,
+                       learning_rate=0.01, hidden_size=8, threshold=0.5, calibration_split=0.2).start_training()
+        data = ModelArtifact.load(model_name=self.model_name, device=torch.device("cpu"))
+        self.assertGreater(data["temperature"], 0)
+        self.assertEqual(data["threshold"], 0.5)
+
+        chatbot = ChatBot(model_file=self.model_name)
+        sentences = ["Hello there", "Tell me a joke", "zzz"]
+        scores = chatbot.score_intents(sentences, k=3)
+        self.assertEqual([score["tag"] for score in scores], chatbot.predict_tags(sentences))
+        for score in scores:
+            self.assertEqual(len(score["candidates"]), 3)
+            self.assertLessEqual(sum(probability for _, probability in score["candidates"]), 1 + 1e-6)
+
+    def test_trainer_trains_on_all_patterns(self):
+        with mock.patch("modules.chatbot.trainer.chat_bot_trainer.Subset", wraps=Subset) as subset:
+            trainer = ChatBotTrainer(extractor_name="BagOfWords", preprocessor_name="Stemmer",
+                                     remove_stopwords=False, modeling_name="NeuralNet", model_name=self.model_name,
+                                     num_epochs=2, batch_size=16, learning_rate=0.01, hidden_size=8)
+            trainer.start_training()
+        subset.assert_called_once()
+        self.assertEqual(subset.call_args.args[1], list(range(len(trainer.dataset))))
+        data = ModelArtifact.load(model_name=self.model_name, device=torch.device("cpu"))
+        self.assertEqual(data["temperature"], DEFAULT_TEMPERATURE)
+
+    def test_trainer_calibrates_the_saved_model(self):
+        with mock.patch("modules.chatbot.trainer.chat_bot_trainer.Subset", wraps=Subset) as subset:
+            trainer = ChatBotTrainer(extractor_name="BagOfWords", preprocessor_name="Stemmer",
+                                     remove_stopwords=False, modeling_name="NeuralNet", model_name=self.model_name,
+                                     num_epochs=20, batch_size=16, learning_rate=0.01, hidden_size=8,
+                                     calibration_split=0.2)
+            trainer.start_training()
+        training, calibration = IntentScorer.split_calibration(labels=trainer.dataset.y_train.tolist(), fraction=0.2)
+        subset.assert_called_once()
+        self.assertEqual(subset.call_args.args[1], training)
+
+        # The saved temperature is the one fitted on the held out patterns for the saved weights
+        data = ModelArtifact.load(model_name=self.model_name, device=torch.device("cpu"))
+        model = Modeling.select_model(modeling_name="NeuralNet", input_size=data["input_size"],
+                                      hidden_size=data["hidden_size"], num_classes=data["output_size"],
+                                      device=torch.device("cpu"))
+        model.load_state_dict(data["model_state"])
+        model.eval()
+        with torch.no_grad():
+            logits = model(torch.tensor(trainer.dataset.x_train[calibration], dtype=torch.float))
+        temperature = IntentScorer.fit_temperature(logits=logits,
+                                                   labels=torch.tensor(trainer.dataset.y_train[calibration]))
+        self.assertAlmostEqual(data["temperature"], temperature, places=5)
+
+    def test_legacy_model_defaults(self):
+        chatbot = ChatBot(model_file="bow_stemmer.pth")
+        score = chatbot.score_intents(["Hello there"], k=1)[0]
+        self.assertEqual(score["tag"], score["candidates"][0][0] if score["candidates"][0][1] > DEFAULT_THRESHOLD
+                         else "")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import shutil
+import unittest
+
+import numpy as np
+import torch
+
+from modules.NLP.features_extractor.tf_idf import TFIDF
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from utilities.path_finder import PathFinder
+
+
+class TestModelArtifact(unittest.TestCase):
+    def setUp(self):
+        self.model_file = "tfidf_stemmer.pth"
+        self.legacy_data = torch.load(PathFinder().get_complet_path(f"ressources/models/{self.model_file}"),
+                                      map_location="cpu")
+
+    def tearDown(self):
+        shutil.rmtree(ModelArtifact.get_path(self.model_file), ignore_errors=True)
+        shutil.rmtree(ModelArtifact.get_path("test_not_a_model"), ignore_errors=True)
+
+    def test_convert(self):
+        self.assertFalse(ModelArtifact.exists(self.model_file))
+        ModelArtifact.convert(model_file=self.model_file)
+        self.assertTrue(ModelArtifact.exists(self.model_file))
+
+        data = ModelArtifact.load(model_name=self.model_file, device=torch.device("cpu"))
+        self.assertEqual(data["vocab"], self.legacy_data["vocab"])
+        self.assertEqual(data["tags"], self.legacy_data["tags"])
+        self.assertNotIn("docs", data)
+        np.testing.assert_array_almost_equal(data["idf"], TFIDF.compute_idf(vocab=self.legacy_data["vocab"],
+                                                                            docs=self.legacy_data["docs"]))
+        for name, tensor in self.legacy_data["model_state"].items():
+            self.assertTrue(torch.equal(data["model_state"][name], tensor))
+
+    def test_load_parameters(self):
+        expected_output = ModelArtifact.load_parameters(model_file=self.model_file)
+        ModelArtifact.convert(model_file=self.model_file)
+        self.assertEqual(ModelArtifact.load_parameters(model_file=self.model_file), expected_output)
+        self.assertEqual(expected_output["extractor"], "TFIDF")
+
+    def test_list_models(self):
+        os.makedirs(ModelArtifact.get_path("test_not_a_model"))
+        self.assertIn(self.model_file, ModelArtifact.list_models())
+        ModelArtifact.convert(model_file=self.model_file)
+        models = ModelArtifact.list_models()
+        self.assertIn(self.model_file.removesuffix(".pth"), models)
+        self.assertNotIn(self.model_file, models)
+        self.assertNotIn("test_not_a_model", models)
+        for model in models:
+            ModelArtifact.load_parameters(model_file=model)
+
+
+if __name__ == '__main__':
+    unittest.main()
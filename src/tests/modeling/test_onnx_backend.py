@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import torch
+from transformers import BertConfig, BertForSequenceClassification
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.trainer.chat_bot_trainer import ChatBotTrainer
+from modules.NLP.modeling.model_artifact import ModelArtifact, ONNX_FILE
+from modules.NLP.modeling import onnx_backend
+from modules.NLP.modeling.onnx_backend import OnnxExporter, OnnxPredictor, onnxruntime
+from utilities.runtime_config import RuntimeConfig
+
+
+@unittest.skipUnless(onnxruntime is not None, "onnxruntime is not installed")
+class TestOnnxBackend(unittest.TestCase):
+    def setUp(self):
+        self.model_file = "bow_stemmer.pth"
+        self.retrieval_name = "test_onnx_retrieval"
+        self.sentences = ["Hello, how are you?", "Can you analyse my python code please", "zzz unknown words",
+                          "Tell me a joke", "thanks, goodbye"]
+
+    def tearDown(self):
+        RuntimeConfig.reset()
+        shutil.rmtree(ModelArtifact.get_path(self.model_file), ignore_errors=True)
+        shutil.rmtree(ModelArtifact.get_path(self.retrieval_name), ignore_errors=True)
+
+    def test_neural_net_parity(self):
+        torch_chatbot = ChatBot(model_file=self.model_file)
+        OnnxExporter.export_neural_net(model_file=self.model_file)
+        self.assertTrue(OnnxPredictor.is_available(ModelArtifact.get_path(self.model_file)))
+
+        onnx_chatbot = ChatBot(model_file=self.model_file)
+        for sentence in self.sentences:
+            self.assertEqual(onnx_chatbot.predict_tag(sentence), torch_chatbot.predict_tag(sentence))
+
+    def test_neural_net_batch(self):
+        OnnxExporter.export_neural_net(model_file=self.model_file)
+        data = ModelArtifact.load(model_name=self.model_file, device=torch.device("cpu"))
+        features = np.random.default_rng(0).random((7, data["input_size"]), dtype=np.float32)
+
+        logits = OnnxPredictor(model_path=ModelArtifact.get_path(self.model_file)).run(features=features)
+        state = data["model_state"]
+        expected = torch.from_numpy(features)
+        for layer in ["l1", "l2", "l3"]:
+            expected = expected @ state[f"{layer}.weight"].T + state[f"{layer}.bias"]
+            expected = torch.relu(expected) if layer != "l3" else expected
+        np.testing.assert_allclose(logits, expected.numpy(), rtol=1e-4, atol=1e-5)
+
+    def test_session_created_by_the_running_process(self):
+        OnnxExporter.export_neural_net(model_file=self.model_file)
+        data = ModelArtifact.load(model_name=self.model_file, device=torch.device("cpu"))
+        features = np.zeros((1, data["input_size"]), dtype=np.float32)
+
+        with mock.patch.object(onnxruntime, "InferenceSession", wraps=onnxruntime.InferenceSession) as session:
+            predictor = OnnxPredictor(model_path=ModelArtifact.get_path(self.model_file), modeling_name="NeuralNet")
+            session.assert_not_called()
+            RuntimeConfig.override("serving", intra_op_threads=2)
+            expected = predictor.run(features=features)
+            predictor.run(features=features)
+            session.assert_called_once()
+            self.assertEqual(session.call_args.kwargs["sess_options"].intra_op_num_threads, 2)
+
+            # A forked worker creates its own session, within its thread limit
+            RuntimeConfig.limit(max_threads=1)
+            with mock.patch.object(onnx_backend.os, "getpid", return_value=os.getpid() + 1):
+                np.testing.assert_allclose(predictor.run(features=features), expected)
+            self.assertEqual(session.call_count, 2)
+            self.assertEqual(session.call_args.kwargs["sess_options"].intra_op_num_threads, 1)
+
+    def test_export_model_skips_retrieval(self):
+        ChatBotTrainer(extractor_name="TFIDF", preprocessor_name="Stemmer", remove_stopwords=True,
+                       modeling_name="Retrieval", model_name=self.retrieval_name).start_training()
+
+        self.assertIsNone(OnnxExporter.export_model(model_file=self.retrieval_name))
+        self.assertFalse(os.path.exists(os.path.join(ModelArtifact.get_path(self.retrieval_name), ONNX_FILE)))
+        self.assertEqual(OnnxExporter.export_model(model_file=self.model_file),
+                         os.path.join(ModelArtifact.get_path(self.model_file), ONNX_FILE))
+
+    def test_bert_parity(self):
+        config = BertConfig(vocab_size=100, hidden_size=32, num_hidden_layers=2, num_attention_heads=2,
+                            intermediate_size=64, num_labels=5)
+        model = BertForSequenceClassification(config).eval()
+        model_name = os.path.basename(tempfile.mkdtemp(dir=ModelArtifact.get_path("")))
+        try:
+            model.save_pretrained(ModelArtifact.get_path(model_name))
+            OnnxExporter.export_bert(model_name=model_name)
+            predictor = OnnxPredictor(model_path=ModelArtifact.get_path(model_name))
+
+            for batch, sequence in [(1, 5), (3, 12)]:
+                inputs = {"input_ids": torch.randint(0, 100, (batch, sequence)),
+                          "attention_mask": torch.ones(batch, sequence, dtype=torch.long),
+                          "token_type_ids": torch.zeros(batch, sequence, dtype=torch.long)}
+                with torch.no_grad():
+                    expected = model(**inputs).logits.numpy()
+                logits = predictor.run(**{name: tensor.numpy() for name, tensor in inputs.items()})
+                np.testing.assert_allclose(logits, expected, rtol=1e-3, atol=1e-4)
+        finally:
+            shutil.rmtree(ModelArtifact.get_path(model_name), ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
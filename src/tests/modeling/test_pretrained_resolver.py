@@ -0,0 +1,47 @@
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from modules.NLP.modeling.pretrained_resolver import PretrainedResolver, OFFLINE_FLAGS
+from utilities.path_finder import PathFinder
+
+
+class TestPretrainedResolver(unittest.TestCase):
+    def setUp(self):
+        self.name = "test-org/test-tiny-model"
+        self.snapshot_path = PretrainedResolver.get_snapshot_path(self.name)
+
+    def tearDown(self):
+        shutil.rmtree(self.snapshot_path, ignore_errors=True)
+        if os.path.isdir(os.path.dirname(self.snapshot_path)) and not os.listdir(os.path.dirname(self.snapshot_path)):
+            os.rmdir(os.path.dirname(self.snapshot_path))
+
+    def test_directory(self):
+        path = PathFinder.get_complet_path("ressources/models/bert_intent_classificator")
+        self.assertEqual(PretrainedResolver.resolve(path), path)
+
+    def test_snapshot(self):
+        self.assertTrue(self.snapshot_path.endswith(os.path.join("pretrained", "test-org--test-tiny-model")))
+        os.makedirs(self.snapshot_path)
+        with open(os.path.join(self.snapshot_path, "config.json"), "w") as file:
+            file.write("{}")
+        self.assertEqual(PretrainedResolver.resolve(self.name), self.snapshot_path)
+
+    def test_missing(self):
+        with self.assertRaises(FileNotFoundError) as context:
+            PretrainedResolver.resolve(self.name)
+        self.assertIn("utilities.download_pretrained test-org/test-tiny-model", str(context.exception))
+
+    def test_enable_offline_mode(self):
+        with mock.patch.dict(os.environ, {"HF_HUB_OFFLINE": "0"}):
+            os.environ.pop("TRANSFORMERS_OFFLINE", None)
+            PretrainedResolver.enable_offline_mode()
+            self.assertEqual(os.environ["HF_HUB_OFFLINE"], "0")
+            self.assertEqual(os.environ["TRANSFORMERS_OFFLINE"], "1")
+            for flag in OFFLINE_FLAGS:
+                self.assertIn(flag, os.environ)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import shutil
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from modules.chatbot.chatbot import ChatBot
+from modules.chatbot.trainer.chat_bot_trainer import ChatBotTrainer
+from modules.NLP.modeling import retrieval_classifier
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.retrieval_classifier import RetrievalClassifier, ExactIndex, HnswIndex
+
+
+class TestRetrievalClassifier(unittest.TestCase):
+    def setUp(self):
+        self.tags = ["greeting", "goodbye", "joke"]
+        self.vectors = np.array([[1, 0, 0, 0], [0.9, 0.1, 0, 0], [0, 1, 0, 0], [0, 0.8, 0.2, 0], [0, 0, 1, 0]],
+                                dtype=np.float32)
+        self.labels = [0, 0, 1, 1, 2]
+
+    def test_vote(self):
+        classifier = RetrievalClassifier(tags=self.tags, k=3, min_similarity=0.5)
+        classifier.add(vectors=self.vectors, labels=self.labels)
+        votes = classifier.vote(np.array([[2, 0, 0, 0], [0, 1, 0.1, 0]], dtype=np.float32))
+        self.assertEqual(votes.argmax(axis=1).tolist(), [0, 1])
+        np.testing.assert_allclose(votes.sum(axis=1), [1.0, 1.0], rtol=1e-6)
+
+    def test_no_similar_pattern(self):
+        classifier = RetrievalClassifier(tags=self.tags, min_similarity=0.5)
+        classifier.add(vectors=self.vectors, labels=self.labels)
+        votes = classifier.vote(np.array([[0, 0, 0, 1], [0, 0, 0, 0]], dtype=np.float32))
+        np.testing.assert_array_equal(votes, np.zeros((2, len(self.tags))))
+        logits = classifier.logits(np.array([[0, 0, 0, 1]], dtype=np.float32))
+        self.assertTrue(np.allclose(logits.numpy(), logits.numpy()[0, 0]))
+
+    def test_add_patterns(self):
+        classifier = RetrievalClassifier(tags=self.tags, k=1)
+        classifier.add(vectors=self.vectors, labels=self.labels)
+        query = np.array([[0, 0, 0, 1]], dtype=np.float32)
+        self.assertEqual(classifier.vote(query).sum(), 0)
+        for _ in range(retrieval_classifier.INITIAL_CAPACITY + 1):
+            classifier.add(vectors=query, labels=[2])
+        self.assertEqual(classifier.vote(query).argmax(), 2)
+        self.assertEqual(len(classifier.labels), len(self.labels) + retrieval_classifier.INITIAL_CAPACITY + 1)
+        self.assertEqual(classifier.vectors.shape, (len(classifier.labels), 4))
+
+    def test_exact_index_search(self):
+        index = ExactIndex(dimension=4)
+        index.add(retrieval_classifier.normalize(self.vectors))
+        similarities, positions = index.search(retrieval_classifier.normalize(self.vectors[:1]), k=2)
+        self.assertEqual(positions.tolist(), [[0, 1]])
+        self.assertAlmostEqual(float(similarities[0, 0]), 1.0, places=5)
+
+    @unittest.skipUnless(HnswIndex.is_available(), "hnswlib is not installed")
+    def test_approximate_index(self):
+        generator = np.random.default_rng(0)
+        vectors = generator.normal(size=(500, 16)).astype(np.float32)
+        labels = generator.integers(0, len(self.tags), size=500)
+        exact = RetrievalClassifier(tags=self.tags)
+        exact.add(vectors=vectors, labels=labels)
+        with mock.patch.object(retrieval_classifier, "APPROXIMATE_MIN_VALUES", 100 * 16):
+            approximate = RetrievalClassifier(tags=self.tags)
+            approximate.add(vectors=vectors[:50], labels=labels[:50])
+            approximate.add(vectors=vectors[50:], labels=labels[50:])
+        np.testing.assert_allclose(approximate.vectors, retrieval_classifier.normalize(vectors), atol=1e-6)
+        np.testing.assert_allclose(approximate.vote(vectors[:20]), exact.vote(vectors[:20]), atol=1e-4)
+
+
+class TestRetrievalChatBot(unittest.TestCase):
+    def setUp(self):
+        self.model_name = "test_retrieval"
+
+    def tearDown(self):
+        shutil.rmtree(ModelArtifact.get_path(self.model_name), ignore_errors=True)
+
+    def test_index_and_predict(self):
+        ChatBotTrainer(extractor_name="TFIDF", preprocessor_name="Stemmer", remove_stopwords=True,
+                       modeling_name="Retrieval", model_name=self.model_name).start_training()
+        self.assertEqual(ModelArtifact.load_parameters(self.model_name)["modeling"], "Retrieval")
+
+        chatbot = ChatBot(model_file=self.model_name)
+        self.assertEqual(chatbot.predict_tag("Hello"), "Greeting")
+        self.assertEqual(chatbot.predict_tag("zzzz qqqq"), "")
+        self.assertNotEqual(chatbot.predict_tag("my computer is broken"), "Greeting")
+
+        chatbot.add_patterns(tag="Greeting", patterns=["my computer is broken", "is my computer broken",
+                                                    "my broken computer"])
+        self.assertEqual(chatbot.predict_tag("my computer is broken"), "Greeting")
+        # The added patterns are looked up like those of the intents file, by a lookup counting from zero
+        self.assertEqual(chatbot.predict_tag("My broken computer!"), "Greeting")
+        self.assertIn("chatbot_pattern_lookup_hits_total 2", chatbot.export_metrics())
+        with self.assertRaises(ValueError):
+            chatbot.add_patterns(tag="unknown intent", patterns=["hello"])
+
+
+if __name__ == '__main__':
+    unittest.main()
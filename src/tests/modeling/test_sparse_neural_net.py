@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+import torch
+
+from modules.chatbot.trainer.chat_bot_trainer import ChatBotTrainer
+from modules.NLP.features_extractor.extractor import Extractor
+from modules.NLP.modeling.modeling import Modeling
+from modules.NLP.preprocessing.preprocessor import Preprocessor
+from utilities.path_finder import PathFinder
+
+
+class TestSparseNeuralNet(unittest.TestCase):
+    def setUp(self):
+        self.device = torch.device("cpu")
+        self.sentences = ["Hello, how are you?", "Can you analyse my python code please", "zzz unknown words"]
+
+    def load(self, model_file):
+        data = torch.load(PathFinder.get_complet_path(f"ressources/models/{model_file}"), map_location="cpu")
+        models = []
+        for modeling_name in ["NeuralNet", "SparseNeuralNet"]:
+            model = Modeling.select_model(modeling_name=modeling_name, input_size=data["input_size"],
+                                          hidden_size=data["hidden_size"], num_classes=data["output_size"],
+                                          device=self.device)
+            model.load_state_dict(data["model_state"])
+            models.append(model.eval())
+        extractor = Extractor(preprocessor=Preprocessor(preprocessor_name=data["preprocessor"],
+                                                        remove_stopwords=data["remove_stopwords"]),
+                              extractor_name=data["extractor"], vocab=data["vocab"], docs=data["docs"],
+                              tags=data["tags"])
+        return data, models, extractor
+
+    def assert_equivalent(self, model_file):
+        data, (dense_model, sparse_model), extractor = self.load(model_file)
+        for sentence in self.sentences:
+            dense_features = extractor.extract_features(sentence)
+            indices, weights = extractor.extract_sparse_features(sentence)
+            np.testing.assert_array_almost_equal(dense_features[indices], weights)
+            self.assertEqual(np.count_nonzero(dense_features), np.count_nonzero(weights))
+
+            with torch.no_grad():
+                dense_output = dense_model(torch.from_numpy(dense_features).to(dtype=torch.float).unsqueeze(0))
+                sparse_output = sparse_model(torch.from_numpy(indices), torch.zeros(1, dtype=torch.long),
+                                             torch.from_numpy(weights))
+            torch.testing.assert_close(sparse_output, dense_output, rtol=1e-5, atol=1e-5)
+
+    def test_bag_of_words_equivalence(self):
+        self.assert_equivalent("bow_stemmer.pth")
+
+    def test_tf_idf_equivalence(self):
+        self.assert_equivalent("tfidf_stemmer.pth")
+
+    def test_state_dict_layout(self):
+        data, (dense_model, sparse_model), _ = self.load("bow_stemmer.pth")
+        for name, tensor in dense_model.state_dict().items():
+            self.assertTrue(torch.equal(sparse_model.state_dict()[name], tensor))
+
+    def test_batch_forward(self):
+        data, (dense_model, sparse_model), extractor = self.load("bow_stemmer.pth")
+        sparse_features = [extractor.extract_sparse_features(sentence) for sentence in self.sentences]
+        lengths = [len(indices) for indices, _ in sparse_features]
+        offsets = torch.tensor([0] + lengths[:-1]).cumsum(dim=0)
+        with torch.no_grad():
+            batch_output = sparse_model(torch.from_numpy(np.concatenate([i for i, _ in sparse_features])), offsets,
+                                        torch.from_numpy(np.concatenate([w for _, w in sparse_features])))
+            dense_output = dense_model(torch.from_numpy(extractor.extract_batch_features(self.sentences))
+                                       .to(dtype=torch.float))
+        torch.testing.assert_close(batch_output, dense_output, rtol=1e-5, atol=1e-5)
+
+    def test_word2vec_rejected(self):
+        with self.assertRaises(ValueError):
+            ChatBotTrainer(extractor_name="Word2Vec_CBOW", preprocessor_name="Stemmer", remove_stopwords=True,
+                           modeling_name="SparseNeuralNet", model_name="test_sparse_word2vec")
+        ChatBotTrainer.check_configuration(modeling_name="SparseNeuralNet", extractor_name="TFIDF")
+        ChatBotTrainer.check_configuration(modeling_name="NeuralNet", extractor_name="Word2Vec_CBOW")
+
+
+if __name__ == '__main__':
+    unittest.main()
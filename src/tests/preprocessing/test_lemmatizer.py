@@ -49,6 +49,14 @@ class TestLemmatizer(unittest.TestCase):
         expected_output = ["cat"]
         actual_output = self.lemmatizer.preprocess_text(tokens=input)
         self.assertEqual(actual_output, expected_output)
+
+    def test_preprocess_corpus(self):
+        """
+        Tests that lemmatizing several token lists at once gives the same lemmas as lemmatizing them one by one.
+        """
+        token_lists = [["the", "cats", "are", "running"], [], ["running", "is", "better"], ["cats"]]
+        self.assertEqual(self.lemmatizer.preprocess_corpus(token_lists=token_lists),
+                         [self.lemmatizer.preprocess_text(tokens=tokens) for tokens in token_lists])
         
 
 if __name__ == '__main__':
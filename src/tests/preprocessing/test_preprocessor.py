@@ -0,0 +1,25 @@
+import unittest
+
+from modules.NLP.preprocessing.preprocessor import Preprocessor, PARALLEL_MIN_TEXTS
+
+
+class TestPreprocessor(unittest.TestCase):
+    def setUp(self):
+        self.preprocessor = Preprocessor(preprocessor_name="Stemmer", remove_stopwords=True)
+        self.texts = ["Hello, how are you?", "Can you analyse my python code please", "", "Thanks a lot!",
+                      "I am analysing the syntax of the code"]
+
+    def test_preprocess_corpus(self):
+        self.assertEqual(self.preprocessor.preprocess_corpus(texts=self.texts),
+                         [self.preprocessor.preprocess_text(text=text) for text in self.texts])
+        self.assertEqual(self.preprocessor.preprocess_corpus(texts=[]), [])
+
+    def test_preprocess_corpus_in_processes(self):
+        texts = [f"{text} number {index}" for index in range(PARALLEL_MIN_TEXTS // len(self.texts) + 1)
+                 for text in self.texts]
+        self.assertEqual(self.preprocessor.preprocess_corpus(texts=texts, processes=2),
+                         self.preprocessor.preprocess_corpus(texts=texts))
+
+
+if __name__ == '__main__':
+    unittest.main()
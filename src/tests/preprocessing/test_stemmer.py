@@ -116,5 +116,10 @@ class TestStemmer(unittest.TestCase):
         self.assertEqual(self.stemmer._Stemmer__step_5_b(word="controll"), "control")
         self.assertEqual(self.stemmer._Stemmer__step_5_b(word="roll"), "roll")
 
+    def test_preprocess_corpus(self):
+        token_lists = [["caresses", "ponies", "relational"], [], ["ponies", "controlling", "caresses"]]
+        self.assertEqual(self.stemmer.preprocess_corpus(token_lists=token_lists),
+                         [self.stemmer.preprocess_text(tokens=tokens) for tokens in token_lists])
+
 if __name__ == '__main__':
     unittest.main()
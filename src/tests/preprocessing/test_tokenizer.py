@@ -45,6 +45,23 @@ class TestTokenizer(unittest.TestCase):
         actual_output = self.tokenizer_with_stopwords.tokenize_and_filter_sentence(sentence=input)
         self.assertEqual(actual_output, expected_output)
 
-        
+    def test_shared_stop_words(self):
+        # Test the stop words are loaded once and shared
+        stop_words = self.tokenizer_without_stopwords._Tokenizer__stop_words
+        self.assertIsInstance(stop_words, frozenset)
+        self.assertIs(stop_words, Tokenizer()._Tokenizer__stop_words)
+
+    def test_fused_tokenization(self):
+        # Test the fused tokenization gives the same tokens as the separate steps
+        sentences = ["It's $3.50, isn't it?!", "Café au lait… naïve résumé", "tabs\tand\nnew lines",
+                     "snake_case and CamelCase", "ab\x00cd €5 «quoted» — dash", ""]
+        for sentence in sentences:
+            tokens = self.tokenizer_with_stopwords._Tokenizer__tokenize(
+                sentence=self.tokenizer_with_stopwords._Tokenizer__remove_punctuation(sentence=sentence))
+            self.assertEqual(self.tokenizer_with_stopwords.tokenize_and_filter_sentence(sentence), tokens)
+            self.assertEqual(self.tokenizer_without_stopwords.tokenize_and_filter_sentence(sentence),
+                             self.tokenizer_without_stopwords._Tokenizer__remove_stop_words(tokens=tokens))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
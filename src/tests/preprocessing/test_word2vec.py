@@ -1,8 +1,10 @@
+import os
 import unittest
 import numpy as np
 
 from modules.NLP.features_extractor.word2vec import Word2Vec
 from modules.NLP.preprocessing.preprocessor import Preprocessor
+from utilities.path_finder import PathFinder
 
 
 class TestWord2Vec(unittest.TestCase):
@@ -43,6 +45,31 @@ class TestWord2Vec(unittest.TestCase):
         result_vector = self.word2vec.extract_features(sentence)
         np.testing.assert_array_almost_equal(result_vector, expected_vector)
 
+    def test_extract_batch_features(self):
+        sentences = ["rain", "It is raining", "goodbye", ""]
+        expected_vectors = np.array([self.word2vec.extract_features(sentence) for sentence in sentences])
+        result_vectors = self.word2vec.extract_batch_features(sentences)
+        np.testing.assert_array_almost_equal(result_vectors, expected_vectors)
+
+    def test_load_legacy_model_read_only(self):
+        Word2Vec(self.preprocessor, docs=self.docs, vector_size=2).train("test_legacy")
+        extractor_path = PathFinder.get_complet_path("ressources/extractors/test_legacy_E.pth")
+        vectors_path = PathFinder.get_complet_path("ressources/extractors/test_legacy_E.kv")
+        for path in [vectors_path, vectors_path + ".vectors.npy"]:
+            os.remove(path)
+        self.addCleanup(os.remove, extractor_path)
+
+        legacy = Word2Vec(self.preprocessor, docs=[])
+        legacy.load_model("test_legacy")
+        self.assertFalse(os.path.exists(vectors_path))
+
+        self.assertEqual(Word2Vec.convert_model("test_legacy_E.pth"), vectors_path)
+        self.assertIsNone(Word2Vec.convert_model("test_legacy_E.pth"))
+        self.addCleanup(os.remove, vectors_path)
+        self.addCleanup(os.remove, vectors_path + ".vectors.npy")
+        converted = Word2Vec(self.preprocessor, docs=[])
+        converted.load_model("test_legacy")
+        np.testing.assert_array_almost_equal(converted.extract_features("rain"), legacy.extract_features("rain"))
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,14 +1,17 @@
 import json
-import os
 import threading
 
-import torch
 from flask import Flask, render_template, request, jsonify, Response
 
 from modules.chatbot.chatbot import ChatBot
 from modules.chatbot.trainer.chat_bot_trainer import ChatBotTrainer
+from modules.chatbot.trainer.incremental_trainer import IncrementalTrainer
 from modules.chatbot.chatbot_test import test_chatbot
+from modules.chatbot.evaluator import ResultStore
+from modules.NLP.modeling.model_artifact import ModelArtifact
 from utilities.path_finder import PathFinder
+from utilities.profiler import SamplingProfiler
+from utilities.tracing import Tracer
 
 
 class ChatInterface:
@@ -26,21 +29,37 @@ class ChatInterface:
         outside of the class context.
     """
 
-    def __init__(self, **configs: dict):
+    def __init__(self, run: bool = True, model_file: str = "bow_lemmatizer.pth", **configs: dict):
         """
         Initializes the ChatInterface, sets up the Flask application, and loads necessary resources.
 
         Parameters:
-            **configs (dict): A dictionary of configuration options for the Flask application.
+            run (bool): Whether to start the Flask development server. Defaults to True; a production server
+                        serves the `app` instead.
+            model_file (str): The model the chatbot starts with. Defaults to "bow_lemmatizer.pth".
+            **configs (dict): A dictionary of configuration options for the Flask application. The `tracing`
+                              option (True by default) times the stages of the chatbot for the /metrics endpoint,
+                              and the `profiling` option (False by default) enables the /debug/profile endpoint.
         """
         template = PathFinder().get_complet_path('user_interface/templates/')
         static = PathFinder().get_complet_path('user_interface/static/')
-        file = ("bow_lemmatizer.pth")
-        self.__chatbot = ChatBot(file)
+        self.__chatbot = ChatBot(model_file)
         self.__app = Flask(__name__, template_folder=template, static_folder=static)
         self.__configs(**configs)
+        Tracer.enable(self.__app.config.get("TRACING", True))
         self.__create_endpoints()
-        self.__run()
+        if run:
+            self.__run()
+
+    @property
+    def app(self) -> Flask:
+        """
+        Accesses the Flask application, e.g. to serve it with a production server.
+
+        Returns:
+            Flask: The application, with its endpoints and its chatbot loaded.
+        """
+        return self.__app
 
     def __create_endpoints(self) -> None:
         """
@@ -55,11 +74,15 @@ class ChatInterface:
         self.__add_endpoint('/load_intents', 'load_intents', self.__load_intents)
         self.__add_endpoint('/load_models', 'load_models', self.__load_models)
         self.__add_endpoint('/train_model', 'train_model', self.__train_model, ['GET', 'POST'])
+        self.__add_endpoint('/update_model', 'update_model', self.__update_model, ['POST'])
         self.__add_endpoint("/load_models_filenames", "load_models_filenames", self.__load_models_filenames,
                             ['GET', 'POST'])
         self.__add_endpoint("/change_chatbot_model", "change_chatbot_model", self.__change_chatbot_model, ['GET', 'POST'])
         self.__add_endpoint("/load_tests", "load_tests", self.__load_tests, ['GET', 'POST'])
         self.__add_endpoint("/test_chatbot", "__test_chatbot", self.__test_chatbot, ['GET', 'POST'])
+        self.__add_endpoint("/metrics", "metrics", self.__metrics)
+        if self.__app.config.get("PROFILING", False):
+            self.__add_endpoint("/debug/profile", "debug_profile", self.__debug_profile)
 
     def __configs(self, **configs: dict) -> None:
         """
@@ -70,7 +93,7 @@ class ChatInterface:
             **configs (dict): A dictionary of configuration options where the keys are configuration names
                               and the values are settings.
         """
-        for config, value in configs:
+        for config, value in configs.items():
             self.__app.config[config.upper()] = value
 
     def __add_endpoint(self, endpoint: str = None, endpoint_name: str = None, handler: callable = None,
@@ -97,14 +120,55 @@ class ChatInterface:
         """
         self.__app.run(debug=True, **kwargs)
 
-    def __get_response(self) -> list:
+    def __get_response(self) -> list | dict:
         """
-        Processes a chat message through the chatbot and returns a response.
+        Processes a chat message through the chatbot and returns a response. When the request has a `trace` value,
+        the time spent in each stage of the chatbot is returned along with the responses.
 
         Returns:
-            list: A list containing responses from the chatbot based on the input message.
+            list | dict: A list containing responses from the chatbot based on the input message, or a dictionary
+                         with these "responses" and the "trace" of the stages.
+        """
+        with Tracer.trace_request() as breakdown:
+            with Tracer.span("request"):
+                responses = self.__chatbot.get_response(request.form["msg"])
+        if request.values.get("trace"):
+            return {"responses": responses, "trace": breakdown}
+        return responses
+
+    def __metrics(self) -> Response:
+        """
+        Returns the histograms of the time spent in each stage of the chatbot and the counters of the chatbot, such
+        as the hit ratio of its pattern lookup, in the Prometheus text format.
+
+        Returns:
+            Response: The plain text exposition of the metrics.
+        """
+        return Response(Tracer.export_prometheus() + self.__chatbot.export_metrics(),
+                        mimetype="text/plain; version=0.0.4")
+
+    def __debug_profile(self) -> tuple:
         """
-        return self.__chatbot.get_response(request.form["msg"])
+        Samples the stacks of the serving threads for the number of seconds given by the `seconds` query parameter
+        (10 by default, at most 300) and saves them as a collapsed-stack file in ressources/profiles, to be drawn as
+        a flame graph. The request returns when the profile is over.
+
+        Returns:
+            Tuple[Response, int]: The path of the file and the number of samplings, with a HTTP status code.
+        """
+        try:
+            seconds = float(request.args.get("seconds", 10))
+        except ValueError:
+            return jsonify({"error": "seconds must be a number"}), 400
+        if not 0 < seconds <= 300:
+            return jsonify({"error": "seconds must be between 0 and 300"}), 400
+
+        profiler = SamplingProfiler()
+        try:
+            path = profiler.profile_to_file(seconds=seconds)
+        except RuntimeError as error:
+            return jsonify({"error": str(error)}), 409
+        return jsonify({"path": path, "samples": profiler.samples}), 200
 
     def __load_intents(self) -> str:
         """
@@ -126,42 +190,12 @@ class ChatInterface:
             str: JSON formatted string listing all models and their parameters.
         """
         json_data = {'models': []}
-        path = PathFinder.get_complet_path("ressources/models/")
-        # Traverse the directory and find all .pth files
-        for file in os.listdir(path):
-            if file.endswith(".pth"):
-                data = torch.load(path + file)
-                model_item = {
-                    'name': file.removesuffix(".pth"),
-                    'parameters': {
-                        'modeling': data["modeling_name"],
-                        'preprocessing': data["preprocessor"],
-                        'extractor': data["extractor"],
-                        'stopword': data["remove_stopwords"],
-                        'epochs': data["num_epochs"],
-                        'batch_size': data["batch_size"],
-                        'learning_rate': data["learning_rate"],
-                        'hidden_size': data["hidden_size"]
-                    }
-                }
-            else:
-                config_path = path+file+"/config.json"
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-
-                    model_item = {
-                        'name': file,
-                        'parameters': {
-                            'modeling': config["model_type"],
-                            'preprocessing': "None",
-                            'extractor': "BERT",
-                            'stopword': "None",
-                            'epochs': config["num_epochs"],
-                            'batch_size': config["batch_size"],
-                            'learning_rate': config["learning_rate"],
-                            'hidden_size': "None"
-                        }
-                    }
+        # Read the configuration of every model
+        for file in ModelArtifact.list_models():
+            model_item = {
+                'name': file.removesuffix(".pth"),
+                'parameters': ModelArtifact.load_parameters(model_file=file)
+            }
             json_data['models'].append(model_item)
 
         # Convert the Python dictionary to a JSON string
@@ -174,21 +208,16 @@ class ChatInterface:
         Returns:
             Response: A Flask JSON response containing a list of model filenames.
         """
-        directory = PathFinder.get_complet_path("ressources/models/")  # Change this to your directory path
-        files = os.listdir(directory)
-        return jsonify(files)
+        return jsonify(ModelArtifact.list_models())
 
     def __load_tests(self) -> str:
         """
-        Retrieves and returns the chatbot tests from a JSON file.
+        Retrieves and returns the summaries of the chatbot tests, the most recent first.
 
         Returns:
             str: JSON formatted string containing tests.
         """
-        file_path = PathFinder.get_complet_path("ressources/json_files/chatbot_test_result.json")
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = file.read()
-        return data
+        return json.dumps({"tests": ResultStore().load_summaries()})
 
     def __change_chatbot_model(self) -> str:
         """
@@ -215,13 +244,21 @@ class ChatInterface:
         Starts a new thread to train a model with specified parameters from the form data provided in the request.
 
         Returns:
-            Tuple[str, int]: A response message indicating that training has started, with a HTTP status code.
+            Tuple[str, int]: A response message indicating that training has started, or the reason the model
+                             cannot be trained, with a HTTP status code.
         """
         form = json.loads(request.form["data_forms"])
         data = {}
         for dictio in form:
             data[dictio["name"]] = dictio["value"]
 
+        # The training thread cannot report an error to the user, so the configuration is checked beforehand
+        try:
+            ChatBotTrainer.check_configuration(modeling_name=data["modeling"],
+                                               extractor_name=data["features_extractor"])
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+
         # Create a Thread to run the training in the background
         training_thread = threading.Thread(target=self.__training,
                                            args=(data["features_extractor"], data["preprocessor"],
@@ -237,6 +274,27 @@ class ChatInterface:
         # Optionally, return a response immediately to indicate training has started
         return "Training started in the background", 202
 
+    def __update_model(self) -> tuple:
+        """
+        Updates a trained model with the changes made to intents.json since it was trained, without training it
+        again from scratch. When it is the model served by the chatbot, it is loaded again so the changes are live
+        as soon as the request returns; the model served is never switched for another one.
+
+        Returns:
+            Tuple[Response, int]: The intents and patterns added and removed, and the duration of the update, or
+                                  the reason the model cannot be updated, with a HTTP status code.
+        """
+        model_file = request.form["filename"]
+        try:
+            changes = IncrementalTrainer(model_name=model_file).train()
+        except ValueError as error:
+            return jsonify({"error": str(error)}), 400
+        # The same model, with or without the legacy .pth extension
+        if ModelArtifact.get_path(model_file) == ModelArtifact.get_path(self.__chatbot.model_file):
+            # A new chatbot, so the responses of the new intents are loaded too
+            self.__chatbot = ChatBot(self.__chatbot.model_file)
+        return jsonify(changes), 200
+
     def __training(self, extractor_name: str, preprocessor_name: str, stopwords: bool, modeling_name: str,
                    model_name: str, num_epochs: int, batch_size: int, learning_rate: float, hidden_size: int) -> None:
         """
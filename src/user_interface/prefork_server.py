@@ -0,0 +1,167 @@
+import gc
+import os
+import signal
+import socket
+import threading
+import traceback
+
+from flask import Flask
+from werkzeug.serving import make_server
+
+from utilities.runtime_config import RuntimeConfig
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 5000
+LISTEN_BACKLOG = 128
+
+
+class PreforkServer:
+    """
+    A production server which forks several worker processes from a parent process in which the application, and
+    so the models of the chatbot, are already loaded. The workers share the memory of the parent copy-on-write, so
+    the weights of the models, the vocabularies and the tree-sitter grammars are loaded once for all the workers,
+    and every worker runs its own interpreter, so the predictions of the workers are not serialized by one GIL.
+
+    The parent binds the listening socket before forking and the workers accept the connections on it, each one
+    with a threaded Werkzeug server. The number of PyTorch threads of the serving pool of every worker is at most
+    the number of CPUs divided by the number of workers, so the workers do not oversubscribe the CPUs; the sessions
+    of the models exported to ONNX are created by every worker on its first prediction, within this limit, as the
+    thread pools of onnxruntime do not survive a fork. The parent restarts the workers which die, and stops them
+    all on SIGINT or SIGTERM.
+
+    The state of a worker is its own: a model loaded or updated through a request is loaded by the worker which
+    served it only, and the caches and metrics are per worker.
+
+    Attributes:
+        __app (Flask): The WSGI application, loaded before the fork.
+        __host (str): The address the server listens on.
+        __port (int): The port the server listens on.
+        __workers (int): The number of worker processes.
+        __threads_per_worker (int): The number of PyTorch threads of the serving pool of every worker, or None to
+                                    keep the one of the RuntimeConfig.
+        __max_threads (int): The number of PyTorch threads of every pool of a worker at most.
+        __socket (socket.socket): The listening socket, shared by the workers.
+        __children (set): The process ids of the running workers.
+        __stopping (bool): Whether the parent is stopping the workers.
+
+    Methods:
+        is_available(): Checks if the platform can fork processes.
+        serve(): Forks the workers and supervises them until the server is stopped.
+        port: The port the server listens on.
+    """
+
+    def __init__(self, app: Flask, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = None,
+                 threads_per_worker: int = None):
+        """
+        Initializes the PreforkServer and binds its listening socket.
+
+        Parameters:
+            app (Flask): The WSGI application, whose resources must be loaded before serve is called.
+            host (str): The address to listen on. Defaults to DEFAULT_HOST.
+            port (int): The port to listen on, 0 for a free port. Defaults to DEFAULT_PORT.
+            workers (int): The number of worker processes. Defaults to the number of CPUs.
+            threads_per_worker (int): The number of PyTorch threads of the serving pool of every worker. Defaults
+                                      to the intra-op threads of the serving pool of the RuntimeConfig. In any
+                                      case, a pool of a worker has at most the number of CPUs divided by the
+                                      number of workers, at least 1.
+        """
+        cpus = os.cpu_count() or 1
+        self.__app = app
+        self.__host = host
+        self.__workers = workers or cpus
+        self.__threads_per_worker = threads_per_worker
+        self.__max_threads = max(1, cpus // self.__workers)
+        self.__socket = socket.create_server((host, port), backlog=LISTEN_BACKLOG)
+        self.__port = self.__socket.getsockname()[1]
+        self.__children = set()
+        self.__stopping = False
+
+    @staticmethod
+    def is_available() -> bool:
+        """
+        Checks if the platform can fork processes, which Windows cannot.
+
+        Returns:
+            bool: True if the server can fork its workers, False otherwise.
+        """
+        return hasattr(os, "fork")
+
+    def serve(self) -> None:
+        """
+        Forks the workers and supervises them: a worker which dies is replaced, until the parent receives SIGINT or
+        SIGTERM, which it forwards to the workers before waiting for them to stop.
+        """
+        signal.signal(signal.SIGINT, self.__stop)
+        signal.signal(signal.SIGTERM, self.__stop)
+        # The objects loaded so far are never collected, so the garbage collector of the workers does not write
+        # to their pages, which stay shared with the parent
+        gc.freeze()
+        print(f"Serving on http://{self.__host}:{self.__port} with {self.__workers} workers of at most "
+              f"{self.__max_threads} threads")
+        for _ in range(self.__workers):
+            self.__spawn()
+
+        while self.__children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            self.__children.discard(pid)
+            if not self.__stopping:
+                print(f"Worker {pid} died, starting a new one")
+                self.__spawn()
+        self.__socket.close()
+
+    def __spawn(self) -> None:
+        """
+        Forks a worker, which serves on the shared socket until it receives SIGTERM.
+        """
+        pid = os.fork()
+        if pid != 0:
+            self.__children.add(pid)
+            return
+
+        code = 0
+        try:
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            # Every request thread applies them before running the model
+            RuntimeConfig.limit(max_threads=self.__max_threads)
+            if self.__threads_per_worker is not None:
+                RuntimeConfig.override("serving", intra_op_threads=self.__threads_per_worker)
+            server = make_server(self.__host, self.__port, self.__app, threaded=True, fd=self.__socket.fileno())
+            # shutdown waits for serve_forever to return, so it cannot run in the thread serving
+            signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown).start())
+            server.serve_forever()
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            # A worker never returns to the code of the parent nor runs its exit handlers
+            os._exit(code)
+
+    def __stop(self, signum: int, frame) -> None:
+        """
+        Stops the workers, on SIGINT or SIGTERM in the parent.
+
+        Parameters:
+            signum (int): The received signal.
+            frame (FrameType): The frame interrupted by the signal.
+        """
+        self.__stopping = True
+        for pid in list(self.__children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.__children.discard(pid)
+
+    @property
+    def port(self) -> int:
+        """
+        Accesses the port the server listens on, e.g. the free port chosen when 0 was given.
+
+        Returns:
+            int: The port.
+        """
+        return self.__port
@@ -9,6 +9,12 @@ $(document).ready(function() {
             $('#features_extractor').closest('.col').hide();
             $('#hidden_size').closest('.col').hide();
             $('#withoutstopwords').closest('.col').hide();
+        } else if (selectedModel === 'FrozenBERT') {
+            // Seule la tête de classification est entraînée, sa taille cachée reste paramétrable
+            $('#preprocessor').closest('.col').hide();
+            $('#features_extractor').closest('.col').hide();
+            $('#hidden_size').closest('.col').show();
+            $('#withoutstopwords').closest('.col').hide();
         } else {
             // Afficher tous les champs lorsque NeuralNet ou d'autres modèles sont sélectionnés
             $('#preprocessor').closest('.col').show();
@@ -16,13 +22,36 @@ $(document).ready(function() {
             $('#hidden_size').closest('.col').show();
             $('#withoutstopwords').closest('.col').show();
         }
+
+        // Le modèle Retrieval indexe les patterns sans entraînement, les paramètres d'entraînement sont inutiles
+        var isRetrieval = selectedModel === 'Retrieval';
+        $('#num_epochs').closest('.col').toggle(!isRetrieval);
+        $('#batch_size').closest('.col').toggle(!isRetrieval);
+        $('#learning_rate').closest('.col').toggle(!isRetrieval);
+        if (isRetrieval) {
+            $('#hidden_size').closest('.col').hide();
+        }
+    }
+
+    // Le SparseNeuralNet ne prend que les vecteurs creux du Bag of Words et du TF-IDF, pas ceux de Word2Vec
+    function toggleSparseOptions() {
+        var isWord2Vec = $('#features_extractor').val().startsWith('Word2Vec');
+        var isSparse = $('#modeling').val() === 'SparseNeuralNet';
+        $('#modeling option[value="SparseNeuralNet"]').prop('disabled', isWord2Vec).toggle(!isWord2Vec);
+        $('#features_extractor option[value^="Word2Vec"]').prop('disabled', isSparse).toggle(!isSparse);
     }
 
     // Appel initial pour configurer l'affichage correct à la charge de la page
     toggleModelSettings();
+    toggleSparseOptions();
 
     // Événement change lié au sélecteur de modèle
     $('#modeling').on('change', function() {
         toggleModelSettings();
+        toggleSparseOptions();
+    });
+
+    $('#features_extractor').on('change', function() {
+        toggleSparseOptions();
     });
 });
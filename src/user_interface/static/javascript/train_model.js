@@ -10,6 +10,8 @@ $(document).ready(function() {
             url: "/train_model",
         }).done(function(data) {
 
+        }).fail(function(xhr) {
+            alert(xhr.responseJSON ? xhr.responseJSON.error : xhr.responseText);
         });
     });
 });
\ No newline at end of file
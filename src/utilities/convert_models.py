@@ -0,0 +1,25 @@
+import os
+
+from modules.NLP.features_extractor.word2vec import Word2Vec
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from utilities.path_finder import PathFinder
+
+if __name__ == '__main__':
+    # Convert every legacy .pth model which has not been converted yet, the .pth files are kept
+    models_path = PathFinder.get_complet_path("ressources/models/")
+    for file in sorted(os.listdir(models_path)):
+        if file.endswith(".pth") and not ModelArtifact.exists(file):
+            print(f"{file} converted to {ModelArtifact.convert(model_file=file)}")
+
+    # Save the word vectors of every legacy Word2Vec extractor on their own, the full models are kept
+    extractors_path = PathFinder.get_complet_path("ressources/extractors/")
+    for file in sorted(os.listdir(extractors_path)):
+        if not file.endswith("_E.pth"):
+            continue
+        try:
+            vectors_path = Word2Vec.convert_model(file_name=file)
+        except Exception as error:
+            print(f"{file} skipped, it is not a Word2Vec extractor which can be loaded: {error}")
+            continue
+        if vectors_path is not None:
+            print(f"{file} converted to {vectors_path}")
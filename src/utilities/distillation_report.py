@@ -0,0 +1,73 @@
+import json
+import sys
+import time
+
+import numpy as np
+import torch
+
+from modules.chatbot.chatbot import ChatBot
+from utilities.path_finder import PathFinder
+
+
+def evaluate(model: str, predict_tag: callable, test_data: dict) -> dict:
+    """
+    Measures the accuracy and the CPU latency of the predictions of a model on the chatbot test set.
+
+    Parameters:
+        model (str): The name of the model, for the report.
+        predict_tag (callable): The function returning the tag predicted by the model for a sentence.
+        test_data (dict): The content of chatbot_intent_test.json.
+
+    Returns:
+        dict: The accuracy on the known and unknown data and the mean, median and 95th percentile latencies in ms.
+    """
+
+    report = {"model": model}
+    latencies = []
+    for data_set in ["known_data", "unknown_data"]:
+        correct = 0
+        for item in test_data[data_set]:
+            start = time.perf_counter()
+            predicted_tag = predict_tag(item["user_input"])
+            latencies.append((time.perf_counter() - start) * 1000)
+            correct += predicted_tag == item["tag"]
+        report[data_set] = round(correct / len(test_data[data_set]) * 100, 2)
+    report["mean_ms"] = round(float(np.mean(latencies)), 3)
+    report["p50_ms"] = round(float(np.percentile(latencies, 50)), 3)
+    report["p95_ms"] = round(float(np.percentile(latencies, 95)), 3)
+    return report
+
+
+def print_reports(reports: list) -> None:
+    """
+    Prints the reports of several models as a table.
+
+    Parameters:
+        reports (list): The reports returned by evaluate, with optional extra columns shared by all of them.
+    """
+
+    extra_columns = [key for key in reports[0] if key not in
+                     ["model", "known_data", "unknown_data", "mean_ms", "p50_ms", "p95_ms"]]
+    print(f"{'model':<30}{'known %':>10}{'unknown %':>12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}"
+          + "".join(f"{column:>12}" for column in extra_columns))
+    for report in reports:
+        print(f"{report['model']:<30}{report['known_data']:>10}{report['unknown_data']:>12}"
+              f"{report['mean_ms']:>10}{report['p50_ms']:>10}{report['p95_ms']:>10}"
+              + "".join(f"{report[column]:>12}" for column in extra_columns))
+
+
+if __name__ == '__main__':
+    # Usage: python -m utilities.distillation_report [teacher] [student]
+    teacher = sys.argv[1] if len(sys.argv) > 1 else "bert_intent_classificator"
+    student = sys.argv[2] if len(sys.argv) > 2 else "distilled_tfidf_stemmer"
+    torch.set_num_threads(1)
+
+    with open(PathFinder.get_complet_path("ressources/json_files/chatbot_intent_test.json"), "r",
+              encoding="utf-8") as file:
+        intent_test_data = json.load(file)
+
+    reports = [evaluate(model=model_file,
+                        predict_tag=ChatBot(model_file=model_file, pattern_lookup=False, cache_size=0).predict_tag,
+                        test_data=intent_test_data) for model_file in [teacher, student]]
+    print_reports(reports=reports)
+    print(f"student speed-up: {reports[0]['mean_ms'] / reports[1]['mean_ms']:.1f}x")
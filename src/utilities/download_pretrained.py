@@ -0,0 +1,14 @@
+import sys
+
+from huggingface_hub import snapshot_download
+
+from modules.NLP.modeling.pretrained_resolver import PretrainedResolver
+
+if __name__ == '__main__':
+    # Usage: python -m utilities.download_pretrained [model name]
+    # Saves a snapshot of a pretrained model of the hub in ressources/pretrained, where the BERT training finds it
+    # without any network access; this is the only script which needs the network
+    name = sys.argv[1] if len(sys.argv) > 1 else "bert-base-uncased"
+    path = snapshot_download(repo_id=name, local_dir=PretrainedResolver.get_snapshot_path(name),
+                             allow_patterns=["*.json", "*.txt", "*.safetensors"])
+    print(f"{name} saved to {path}")
@@ -0,0 +1,16 @@
+import sys
+
+from modules.chatbot.evaluator import Evaluator
+from modules.NLP.modeling.model_artifact import ModelArtifact
+
+
+if __name__ == '__main__':
+    # Usage: python -m utilities.evaluate_models [processes] [model ...]
+    # Tests the given models, or every model of ressources/models, in a pool of processes and appends their results
+    # to ressources/json_files/chatbot_test_results.jsonl
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    model_files = sys.argv[2:] or ModelArtifact.list_models()
+
+    for result in Evaluator().evaluate_all(model_files=model_files, processes=processes):
+        print(f"{result['model_file']:<30}{result['score_known_data']:>10}{result['score_unknown_data']:>10}"
+              f"{result['latency']['p50_ms']:>10} ms{result['latency']['batched_utterances_per_second']:>10} utt/s")
@@ -0,0 +1,10 @@
+from modules.NLP.modeling.model_artifact import ModelArtifact
+from modules.NLP.modeling.onnx_backend import OnnxExporter
+
+if __name__ == '__main__':
+    # Export every NeuralNet model and every BERT model whose weights are present, the chatbot then runs them
+    # with onnxruntime
+    for file in ModelArtifact.list_models():
+        onnx_path = OnnxExporter.export_model(model_file=file)
+        if onnx_path is not None:
+            print(f"{file} exported to {onnx_path}")
@@ -0,0 +1,144 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from utilities.path_finder import PathFinder
+
+PROFILES_DIRECTORY = "ressources/profiles"
+IDLE_MODULES = ("threading.py", "selectors.py", "socket.py", "socketserver.py", "queue.py")
+
+
+class SamplingProfiler:
+    """
+    A class that profiles a running process by sampling, at a fixed interval, the stack of every thread with
+    sys._current_frames. Contrary to cProfile, it does not slow down the profiled code nor requires to restart it,
+    so it can be run for a few seconds over a server under real traffic. The samples are saved as a collapsed-stack
+    file, one "root;...;leaf count" line per distinct stack, which flamegraph.pl and speedscope read as is.
+
+    Attributes:
+        __interval (float): The time between two samples, in seconds.
+        __ignore_idle (bool): Whether to skip the threads waiting in the threading, selectors, socket or queue
+                              modules, such as the idle threads of the server.
+        __stacks (Counter): The number of samples of every collapsed stack.
+        __samples (int): The number of samplings done.
+        __lock (threading.Lock): The lock preventing two profiles from running at the same time.
+
+    Methods:
+        profile(seconds): Samples the threads for a duration and returns the collapsed stacks.
+        save(stacks, name): Writes collapsed stacks to a file in ressources/profiles.
+        profile_to_file(seconds): Samples the threads for a duration and saves the collapsed stacks.
+    """
+
+    __lock = threading.Lock()
+
+    def __init__(self, interval: float = 0.005, ignore_idle: bool = True):
+        """
+        Initializes the SamplingProfiler.
+
+        Parameters:
+            interval (float): The time between two samples, in seconds. Defaults to 0.005.
+            ignore_idle (bool): Whether to skip the idle threads. Defaults to True.
+        """
+        self.__interval = interval
+        self.__ignore_idle = ignore_idle
+        self.__stacks = Counter()
+        self.__samples = 0
+
+    @property
+    def samples(self) -> int:
+        """
+        Accesses the number of samplings done by the last profile.
+
+        Returns:
+            int: The number of samplings.
+        """
+        return self.__samples
+
+    def profile(self, seconds: float) -> Counter:
+        """
+        Samples the stacks of every other thread for a duration. Only one profile runs at a time in the process.
+
+        Parameters:
+            seconds (float): The duration of the profile, in seconds.
+
+        Returns:
+            Counter: The number of samples of every collapsed stack.
+
+        Raises:
+            RuntimeError: If another profile is already running.
+        """
+        if not SamplingProfiler.__lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running.")
+
+        try:
+            self.__stacks = Counter()
+            self.__samples = 0
+            own_thread = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_thread:
+                        self.__sample(thread_names.get(thread_id, str(thread_id)), frame)
+                self.__samples += 1
+                time.sleep(self.__interval)
+            return self.__stacks
+        finally:
+            SamplingProfiler.__lock.release()
+
+    def __sample(self, thread_name: str, frame) -> None:
+        """
+        Counts the stack of a thread, from its root frame to the frame it is running.
+
+        Parameters:
+            thread_name (str): The name of the thread, used as the root of the stack.
+            frame (frame): The frame the thread is running.
+        """
+        if self.__ignore_idle and os.path.basename(frame.f_code.co_filename) in IDLE_MODULES:
+            return
+
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)})".replace(";", ":"))
+            frame = frame.f_back
+        names.append(thread_name.replace(";", ":").replace(" ", "_"))
+        self.__stacks[";".join(reversed(names))] += 1
+
+    @staticmethod
+    def save(stacks: Counter, name: str = None) -> str:
+        """
+        Writes collapsed stacks to a file in ressources/profiles, the most sampled stack first.
+
+        Parameters:
+            stacks (Counter): The number of samples of every collapsed stack.
+            name (str): The name of the file. Defaults to profile_<date>.collapsed.
+
+        Returns:
+            str: The path of the file.
+        """
+        directory = PathFinder.get_complet_path(PROFILES_DIRECTORY)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name or f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.collapsed")
+        with open(path, "w", encoding="utf-8") as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        return path
+
+    def profile_to_file(self, seconds: float, name: str = None) -> str:
+        """
+        Samples the stacks of every other thread for a duration and saves them to a file in ressources/profiles.
+
+        Parameters:
+            seconds (float): The duration of the profile, in seconds.
+            name (str): The name of the file. Defaults to profile_<date>.collapsed.
+
+        Returns:
+            str: The path of the file.
+
+        Raises:
+            RuntimeError: If another profile is already running.
+        """
+        return SamplingProfiler.save(self.profile(seconds=seconds), name=name)
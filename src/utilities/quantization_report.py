@@ -0,0 +1,37 @@
+import json
+import os
+import sys
+
+import torch
+
+from modules.NLP.modeling.BERT import BertIntentClassifier, QUANTIZED_FILE
+from utilities.distillation_report import evaluate, print_reports
+from utilities.path_finder import PathFinder
+
+if __name__ == '__main__':
+    # Usage: python -m utilities.quantization_report [bert model]
+    # Quantizes the model if it was not done yet, then compares the fp32 and int8 models on the chatbot test set
+    # (an ONNX export of the model would be used for both, remove it first)
+    model_name = sys.argv[1] if len(sys.argv) > 1 else "bert_intent_classificator"
+    model_path = PathFinder.get_complet_path(f"ressources/models/{model_name}")
+    torch.set_num_threads(1)
+
+    if not os.path.isfile(os.path.join(model_path, QUANTIZED_FILE)):
+        print(f"{model_name} quantized to {BertIntentClassifier.quantize(model_name=model_name)}")
+
+    with open(PathFinder.get_complet_path("ressources/json_files/chatbot_intent_test.json"), "r",
+              encoding="utf-8") as file:
+        intent_test_data = json.load(file)
+
+    reports = []
+    for quantized, weights_file in [(False, "model.safetensors"), (True, QUANTIZED_FILE)]:
+        classifier = BertIntentClassifier(model_name=model_name)
+        classifier.load_model(quantized=quantized)
+        report = evaluate(model=f"{model_name} ({'int8' if quantized else 'fp32'})", predict_tag=classifier.predict,
+                          test_data=intent_test_data)
+        report["size_mb"] = round(os.path.getsize(os.path.join(model_path, weights_file)) / 2 ** 20, 1)
+        reports.append(report)
+
+    print_reports(reports=reports)
+    print(f"int8 speed-up: {reports[0]['mean_ms'] / reports[1]['mean_ms']:.1f}x, "
+          f"size reduction: {reports[0]['size_mb'] / reports[1]['size_mb']:.1f}x")
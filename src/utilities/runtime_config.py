@@ -0,0 +1,185 @@
+import copy
+import json
+import os
+import threading
+
+import torch
+
+from utilities.path_finder import PathFinder
+
+CONFIG_FILE = "ressources/config/runtime.json"
+CONFIG_FILE_VARIABLE = "CHATBOT_RUNTIME_CONFIG"
+ENV_PREFIX = "CHATBOT_"
+POOLS = ["serving", "training"]
+DEFAULT_CONFIG = {
+    # PyTorch fixes the inter-op pool once per process, so it is shared by the serving and the training
+    "inter_op_threads": 1,
+    # The models of the chatbot run small matrix products, slowed down by the synchronization of many threads
+    "serving": {"intra_op_threads": 1, "models": {}},
+    # 0 stands for the number of CPUs
+    "training": {"intra_op_threads": 0, "gensim_workers": 4, "models": {}},
+}
+
+
+class RuntimeConfig:
+    """
+    A class that centralizes the thread counts of the process: the intra-op threads of PyTorch, separately for the
+    serving of the chatbot and for the training of models, the inter-op threads of PyTorch and the worker threads of
+    gensim. The settings are read from ressources/config/runtime.json, or the file named by the
+    CHATBOT_RUNTIME_CONFIG variable, and can be overridden by environment variables such as
+    CHATBOT_SERVING_INTRA_OP_THREADS, CHATBOT_TRAINING_GENSIM_WORKERS or CHATBOT_INTER_OP_THREADS. A pool can also
+    hold settings specific to a type of model, e.g. more threads to serve BERT, under its "models" key.
+
+    With the OpenMP builds of PyTorch, the intra-op thread count is a setting of every thread: the serving threads
+    and the training threads started by the interface use their own pools and do not fight for the CPUs.
+
+    Attributes:
+        __config (dict): The settings read from the file and the environment, loaded on first use.
+        __overrides (dict): The settings of every pool set by the process itself.
+        __max_threads (int): The number of intra-op threads of every pool at most, e.g. in a prefork worker, or
+                             None.
+        __resolved (dict): The settings of every pool and type of model, once resolved.
+        __inter_op_applied (bool): Whether the inter-op thread count of the process was set.
+        __lock (threading.Lock): The lock guarding the loading of the settings.
+        local (threading.local): The intra-op thread count set in each thread.
+
+    Methods:
+        load(path): Reads the settings from a file and the environment.
+        get(pool, modeling_name): Returns the settings of a pool for a type of model.
+        override(pool, **settings): Sets settings of a pool for the rest of the process.
+        limit(max_threads): Limits the intra-op threads of every pool for the rest of the process.
+        use(pool, modeling_name): Applies the thread counts of a pool to the calling thread.
+        reset(): Forgets the settings loaded and set.
+    """
+
+    __config = None
+    __overrides = {}
+    __max_threads = None
+    __resolved = {}
+    __inter_op_applied = False
+    __lock = threading.Lock()
+    local = threading.local()
+
+    @staticmethod
+    def load(path: str = None) -> dict:
+        """
+        Reads the settings from a configuration file, over the default ones, then from the environment variables.
+
+        Parameters:
+            path (str): The configuration file. Defaults to the file named by CHATBOT_RUNTIME_CONFIG, or
+                        CONFIG_FILE relative to the project. A missing file leaves the default settings.
+
+        Returns:
+            dict: The settings, in the layout of DEFAULT_CONFIG.
+        """
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        path = path or os.environ.get(CONFIG_FILE_VARIABLE) or PathFinder.get_complet_path(CONFIG_FILE)
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+            config["inter_op_threads"] = content.get("inter_op_threads", config["inter_op_threads"])
+            for pool in POOLS:
+                config[pool].update(content.get(pool, {}))
+
+        if f"{ENV_PREFIX}INTER_OP_THREADS" in os.environ:
+            config["inter_op_threads"] = int(os.environ[f"{ENV_PREFIX}INTER_OP_THREADS"])
+        for pool in POOLS:
+            for setting in DEFAULT_CONFIG[pool]:
+                variable = f"{ENV_PREFIX}{pool}_{setting}".upper()
+                if setting != "models" and variable in os.environ:
+                    # An environment variable is set for the whole pool, whatever the type of model
+                    config[pool][setting] = int(os.environ[variable])
+                    for model_settings in config[pool]["models"].values():
+                        model_settings.pop(setting, None)
+        return config
+
+    @staticmethod
+    def get(pool: str, modeling_name: str = None) -> dict:
+        """
+        Returns the settings of a pool: the settings of the pool, those of the type of model over them, and those
+        set by the process over all, within the limit of the process. A count of 0 stands for the number of CPUs.
+
+        Parameters:
+            pool (str): "serving" or "training".
+            modeling_name (str): The type of model, e.g. "SparseNeuralNet" or "BERT". Defaults to None.
+
+        Returns:
+            dict: The settings of the pool, such as "intra_op_threads", and "inter_op_threads".
+        """
+        settings = RuntimeConfig.__resolved.get((pool, modeling_name))
+        if settings is not None:
+            return settings
+
+        with RuntimeConfig.__lock:
+            if RuntimeConfig.__config is None:
+                RuntimeConfig.__config = RuntimeConfig.load()
+            config = RuntimeConfig.__config
+            settings = {key: value for key, value in config[pool].items() if key != "models"}
+            settings.update(config[pool]["models"].get(modeling_name, {}))
+            settings["inter_op_threads"] = config["inter_op_threads"]
+            settings.update(RuntimeConfig.__overrides.get(pool, {}))
+            settings = {key: value if value > 0 else os.cpu_count() or 1 for key, value in settings.items()}
+            if RuntimeConfig.__max_threads is not None:
+                settings["intra_op_threads"] = min(settings["intra_op_threads"], RuntimeConfig.__max_threads)
+            RuntimeConfig.__resolved[(pool, modeling_name)] = settings
+        return settings
+
+    @staticmethod
+    def override(pool: str, **settings: int) -> None:
+        """
+        Sets settings of a pool for the rest of the process, over the configuration and for every type of model.
+
+        Parameters:
+            pool (str): "serving" or "training".
+            **settings (int): The settings, e.g. intra_op_threads=2.
+        """
+        with RuntimeConfig.__lock:
+            RuntimeConfig.__overrides.setdefault(pool, {}).update(settings)
+            RuntimeConfig.__resolved = {}
+
+    @staticmethod
+    def limit(max_threads: int) -> None:
+        """
+        Limits the intra-op threads of every pool and type of model for the rest of the process, e.g. to share the
+        CPUs between the workers of a server.
+
+        Parameters:
+            max_threads (int): The number of intra-op threads of a pool at most.
+        """
+        with RuntimeConfig.__lock:
+            RuntimeConfig.__max_threads = max_threads
+            RuntimeConfig.__resolved = {}
+
+    @staticmethod
+    def use(pool: str, modeling_name: str = None) -> None:
+        """
+        Applies the intra-op thread count of a pool to the calling thread, and the inter-op thread count to the
+        process the first time. The calling thread keeps its count until it uses another pool, so calling this
+        before every prediction costs a dictionary lookup.
+
+        Parameters:
+            pool (str): "serving" or "training".
+            modeling_name (str): The type of model. Defaults to None.
+        """
+        settings = RuntimeConfig.get(pool, modeling_name)
+        if not RuntimeConfig.__inter_op_applied:
+            RuntimeConfig.__inter_op_applied = True
+            try:
+                torch.set_num_interop_threads(settings["inter_op_threads"])
+            except RuntimeError:
+                # The inter-op pool was already started, by a parallel operation or an earlier setting
+                pass
+        if getattr(RuntimeConfig.local, "intra_op_threads", None) != settings["intra_op_threads"]:
+            torch.set_num_threads(settings["intra_op_threads"])
+            RuntimeConfig.local.intra_op_threads = settings["intra_op_threads"]
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Forgets the settings loaded and set, so that they are read again on the next use.
+        """
+        with RuntimeConfig.__lock:
+            RuntimeConfig.__config = None
+            RuntimeConfig.__overrides = {}
+            RuntimeConfig.__max_threads = None
+            RuntimeConfig.__resolved = {}
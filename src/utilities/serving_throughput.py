@@ -0,0 +1,165 @@
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+import numpy as np
+
+from utilities.path_finder import PathFinder
+
+MESSAGES = ["Hello! How are you?", "Can you tell me a joke", "What is your name?", "Thanks, goodbye",
+            "Could you tell me something funny", "Who created you?"]
+
+
+def free_port() -> int:
+    """
+    Returns a free TCP port of the local host.
+
+    Returns:
+        int: The port.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port: int, timeout: float = 120.0) -> None:
+    """
+    Waits until the server answers its /metrics endpoint.
+
+    Parameters:
+        port (int): The port of the server.
+        timeout (float): The number of seconds to wait at most. Defaults to 120.
+
+    Raises:
+        TimeoutError: If the server is not ready in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/metrics")
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError(f"The server on port {port} did not start in {timeout} seconds")
+
+
+def memory_kb(pid: int) -> tuple:
+    """
+    Measures the memory of a server and of its workers, on Linux: the resident set counts the pages shared
+    copy-on-write once per process, the proportional set divides them between the processes sharing them.
+
+    Parameters:
+        pid (int): The process id of the server.
+
+    Returns:
+        tuple: The sum of the resident and of the proportional set sizes in kB, None when they cannot be read.
+    """
+    children_file = f"/proc/{pid}/task/{pid}/children"
+    if not os.path.exists(children_file):
+        return None, None
+    with open(children_file, "r") as file:
+        pids = [pid] + [int(child) for child in file.read().split()]
+    totals = {"Rss:": 0, "Pss:": 0}
+    for process in pids:
+        with open(f"/proc/{process}/smaps_rollup", "r") as file:
+            for line in file:
+                fields = line.split()
+                if fields[0] in totals:
+                    totals[fields[0]] += int(fields[1])
+    return totals["Rss:"], totals["Pss:"]
+
+
+def load(port: int, seconds: float, clients: int) -> list:
+    """
+    Sends chat messages to a server from several clients, each one waiting for a response before its next request.
+
+    Parameters:
+        port (int): The port of the server.
+        seconds (float): The duration of the load.
+        clients (int): The number of concurrent clients.
+
+    Returns:
+        list: The latency of every request, in seconds.
+    """
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def client(number: int) -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        own_latencies = []
+        request = number
+        while time.monotonic() < deadline:
+            body = urlencode({"msg": MESSAGES[request % len(MESSAGES)]})
+            start = time.perf_counter()
+            connection.request("POST", "/get_response", body=body,
+                               headers={"Content-Type": "application/x-www-form-urlencoded"})
+            connection.getresponse().read()
+            own_latencies.append(time.perf_counter() - start)
+            request += 1
+        with lock:
+            latencies.extend(own_latencies)
+
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def measure(workers: int, model_file: str, seconds: float, clients: int) -> dict:
+    """
+    Starts the production server with a number of workers and measures its throughput under load.
+
+    Parameters:
+        workers (int): The number of worker processes, 1 being the single process server.
+        model_file (str): The model of the chatbot.
+        seconds (float): The duration of the load.
+        clients (int): The number of concurrent clients.
+
+    Returns:
+        dict: The number of workers, the requests per second, the median and 95th percentile latencies in ms, and
+              the resident and proportional memory of the server in MB.
+    """
+    port = free_port()
+    server = subprocess.Popen([sys.executable, "serve.py", str(workers), str(port), model_file],
+                              cwd=PathFinder.get_complet_path("."), stdout=subprocess.DEVNULL,
+                              stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port)
+        load(port=port, seconds=1.0, clients=clients)
+        latencies = load(port=port, seconds=seconds, clients=clients)
+        rss, pss = memory_kb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+    return {"workers": workers, "requests_per_second": round(len(latencies) / seconds, 1),
+            "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+            "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+            "rss_mb": round(rss / 1024, 1) if rss is not None else None,
+            "pss_mb": round(pss / 1024, 1) if pss is not None else None}
+
+
+if __name__ == '__main__':
+    # Usage: python -m utilities.serving_throughput [seconds] [clients] [model] [workers ...]
+    # Compares the throughput of the single process server with the prefork server, by default with as many
+    # workers as CPUs. The proportional memory shows the model weights shared copy-on-write by the workers.
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    concurrent_clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    model = sys.argv[3] if len(sys.argv) > 3 else "bow_lemmatizer.pth"
+    worker_counts = [int(count) for count in sys.argv[4:]] or sorted({1, os.cpu_count() or 1})
+
+    print(f"{'workers':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'RSS MB':>10}{'PSS MB':>10}")
+    for count in worker_counts:
+        result = measure(workers=count, model_file=model, seconds=duration, clients=concurrent_clients)
+        print(f"{result['workers']:>8}{result['requests_per_second']:>10}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{str(result['rss_mb']):>10}{str(result['pss_mb']):>10}")
@@ -0,0 +1,224 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_NAME = "chatbot_stage_duration_seconds"
+
+
+class Histogram:
+    """
+    A class that counts durations in the cumulative buckets of a Prometheus histogram.
+
+    Attributes:
+        __counts (list): The number of durations falling in each bucket, the last one being +Inf.
+        __sum (float): The sum of the durations.
+        __count (int): The number of durations.
+        __lock (threading.Lock): The lock guarding the counters.
+
+    Methods:
+        observe(duration): Counts a duration.
+        export(name, stage): Returns the lines of the histogram in the Prometheus text format.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty Histogram.
+        """
+        self.__counts = [0] * (len(BUCKETS) + 1)
+        self.__sum = 0.0
+        self.__count = 0
+        self.__lock = threading.Lock()
+
+    def observe(self, duration: float) -> None:
+        """
+        Counts a duration.
+
+        Parameters:
+            duration (float): The duration, in seconds.
+        """
+        with self.__lock:
+            self.__counts[bisect.bisect_left(BUCKETS, duration)] += 1
+            self.__sum += duration
+            self.__count += 1
+
+    def export(self, name: str, stage: str) -> list:
+        """
+        Returns the lines of the histogram in the Prometheus text format.
+
+        Parameters:
+            name (str): The name of the metric.
+            stage (str): The value of the stage label.
+
+        Returns:
+            list: The bucket, sum and count lines.
+        """
+        with self.__lock:
+            counts, total, count = list(self.__counts), self.__sum, self.__count
+        lines = []
+        cumulated = 0
+        for bound, bucket_count in zip([*map(str, BUCKETS), "+Inf"], counts):
+            cumulated += bucket_count
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulated}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {total}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+        return lines
+
+
+class Span:
+    """
+    A context manager that times a stage with a monotonic clock, counts its duration in the histogram of the stage
+    and, when the thread is tracing a request, adds it to the breakdown of the request.
+
+    Attributes:
+        __stage (str): The name of the stage.
+        __start (int): The monotonic time the stage started at, in nanoseconds.
+    """
+
+    def __init__(self, stage: str):
+        self.__stage = stage
+        self.__start = 0
+
+    def __enter__(self) -> "Span":
+        self.__start = time.perf_counter_ns()
+        breakdown = getattr(Tracer.local, "breakdown", None)
+        if breakdown is not None:
+            Tracer.local.depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        duration = (time.perf_counter_ns() - self.__start) / 1e9
+        Tracer.get_histogram(self.__stage).observe(duration)
+        breakdown = getattr(Tracer.local, "breakdown", None)
+        if breakdown is not None:
+            Tracer.local.depth -= 1
+            breakdown.append({"stage": self.__stage, "depth": Tracer.local.depth,
+                              "start_ms": round((self.__start - Tracer.local.start) / 1e6, 3),
+                              "duration_ms": round(duration * 1000, 3)})
+
+
+class Tracer:
+    """
+    A class that traces the time spent in the stages of the chatbot, such as the segmentation, the preprocessing,
+    the feature extraction, the model forward and the intent handlers. The durations are counted in one histogram
+    per stage, exported in the Prometheus text format, and a request can also be traced to get the breakdown of
+    its stages.
+
+    The tracer is disabled by default: a span is then a shared no-op context manager, so the instrumented code
+    costs one function call per stage.
+
+    Attributes:
+        __enabled (bool): Whether the spans are timed.
+        __histograms (dict): The histogram of every stage, by name.
+        __lock (threading.Lock): The lock guarding the creation of the histograms.
+        local (threading.local): The breakdown of the request traced by each thread.
+
+    Methods:
+        enable(enabled): Enables or disables the tracer.
+        is_enabled(): Checks if the tracer is enabled.
+        span(stage): Returns the context manager timing a stage.
+        trace_request(): Returns a context manager collecting the breakdown of the stages of a request.
+        get_histogram(stage): Returns the histogram of a stage.
+        export_prometheus(): Returns the histograms in the Prometheus text format.
+        reset(): Forgets every duration counted.
+    """
+
+    __enabled = False
+    __histograms = {}
+    __lock = threading.Lock()
+    __disabled_span = nullcontext()
+    local = threading.local()
+
+    @staticmethod
+    def enable(enabled: bool = True) -> None:
+        """
+        Enables or disables the tracer.
+
+        Parameters:
+            enabled (bool): Whether the spans are timed. Defaults to True.
+        """
+        Tracer.__enabled = enabled
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """
+        Checks if the tracer is enabled.
+
+        Returns:
+            bool: True if the spans are timed, False otherwise.
+        """
+        return Tracer.__enabled
+
+    @staticmethod
+    def span(stage: str) -> Span | nullcontext:
+        """
+        Returns the context manager timing a stage, or a no-op one when the tracer is disabled.
+
+        Parameters:
+            stage (str): The name of the stage.
+
+        Returns:
+            Span | nullcontext: The context manager to wrap the stage in.
+        """
+        return Span(stage) if Tracer.__enabled else Tracer.__disabled_span
+
+    @staticmethod
+    @contextmanager
+    def trace_request():
+        """
+        Collects the breakdown of the stages run by the current thread inside the block. The breakdown is empty
+        when the tracer is disabled.
+
+        Yields:
+            list: The stages, each with its "stage" name, "depth" of nesting, "start_ms" from the start of the block
+                  and "duration_ms", in the order they complete.
+        """
+        breakdown = []
+        if not Tracer.__enabled:
+            yield breakdown
+            return
+
+        Tracer.local.breakdown, Tracer.local.depth, Tracer.local.start = breakdown, 0, time.perf_counter_ns()
+        try:
+            yield breakdown
+        finally:
+            Tracer.local.breakdown = None
+
+    @staticmethod
+    def get_histogram(stage: str) -> Histogram:
+        """
+        Returns the histogram of a stage, creating it the first time.
+
+        Parameters:
+            stage (str): The name of the stage.
+
+        Returns:
+            Histogram: The histogram of the stage.
+        """
+        histogram = Tracer.__histograms.get(stage)
+        if histogram is None:
+            with Tracer.__lock:
+                histogram = Tracer.__histograms.setdefault(stage, Histogram())
+        return histogram
+
+    @staticmethod
+    def export_prometheus() -> str:
+        """
+        Returns the histograms of every stage in the Prometheus text format.
+
+        Returns:
+            str: The exposition text.
+        """
+        lines = [f"# HELP {METRIC_NAME} Time spent in each stage of the chatbot.", f"# TYPE {METRIC_NAME} histogram"]
+        for stage, histogram in sorted(Tracer.__histograms.items()):
+            lines.extend(histogram.export(name=METRIC_NAME, stage=stage))
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Forgets every duration counted.
+        """
+        with Tracer.__lock:
+            Tracer.__histograms.clear()
@@ -0,0 +1,8 @@
+from modules.chatbot.trainer.distillation_trainer import DistillationTrainer
+
+if __name__ == '__main__':
+
+    DistillationTrainer(model_name="distilled_tfidf_stemmer", teacher_name="bert_intent_classificator",
+                        extractor_name="TFIDF", preprocessor_name="Stemmer", remove_stopwords=False,
+                        modeling_name="NeuralNet", num_epochs=200, batch_size=32, learning_rate=0.005,
+                        hidden_size=64, temperature=2.0, alpha=0.7, num_paraphrases=4).start_training()